@@ -0,0 +1,186 @@
+import random
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+import pack
+from pack import pack_document
+
+CONTENT_TYPES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+  <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+  <Default Extension="xml" ContentType="application/xml"/>
+  <Default Extension="png" ContentType="image/png"/>
+  <Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+</Types>
+"""
+
+RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+  <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>
+"""
+
+WORDS = "alpha beta gamma delta epsilon zeta eta theta kappa lambda".split()
+
+
+# Comments, whitespace in w:t, mixed content and escaping, which condensing must
+# treat alike in both engines
+SPECIAL_PARAGRAPHS = """    <!-- reviewer note -->
+    <w:p>
+      <w:r>
+        <w:t xml:space="preserve">  Caf\u00e9 &amp; "quotes" &lt;tag&gt;  </w:t>
+      </w:r>
+      <w:r>
+        <w:t><!-- kept -->x</w:t>
+      </w:r>
+    </w:p>
+    <w:p>
+      mixed
+      <w:r/>
+    </w:p>
+    <?pi data?>
+"""
+
+
+def write_unpacked(directory, paragraphs=400):
+    """Write a pretty-printed unpacked .docx with some varied text and an image."""
+    rng = random.Random(0)
+    body = "".join(
+        f'    <w:p w:rsidR="{rng.getrandbits(32):08X}">\n'
+        f"      <w:r>\n"
+        f"        <w:t>{' '.join(rng.choice(WORDS) for _ in range(8))}</w:t>\n"
+        f"      </w:r>\n"
+        f"    </w:p>\n"
+        for _ in range(paragraphs)
+    )
+    files = {
+        "[Content_Types].xml": CONTENT_TYPES_XML,
+        "_rels/.rels": RELS_XML,
+        "word/document.xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">\n'
+            f"  <w:body>\n{body}{SPECIAL_PARAGRAPHS}  </w:body>\n</w:document>\n"
+        ),
+        "word/styles.xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">\n'
+            '  <w:style w:styleId="Normal"/>\n</w:styles>\n'
+        ),
+        "word/media/image1.png": rng.randbytes(4096),
+    }
+    for name, content in files.items():
+        path = Path(directory) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            path.write_text(content, encoding="utf-8")
+
+
+def read_members(path):
+    """Return [(name, content)] of an archive's members, in archive order."""
+    with zipfile.ZipFile(path) as zf:
+        return [(info.filename, zf.read(info)) for info in zf.infolist()]
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestPackDocument(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.unpacked = self.root / "unpacked"
+        write_unpacked(self.unpacked)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def pack(self, name, **kwargs):
+        output = self.root / name
+        self.assertTrue(pack_document(self.unpacked, output, **kwargs))
+        return output
+
+    def test_compression_level_applies_to_condensed_parts(self):
+        """The deflate level changes the compressed size of condensed XML"""
+        sizes = {}
+        for level in (0, 1, 9):
+            output = self.pack(f"level{level}.docx", compression_level=level)
+            with zipfile.ZipFile(output) as zf:
+                sizes[level] = zf.getinfo("word/document.xml").compress_size
+        self.assertGreater(sizes[0], sizes[1])
+        self.assertGreater(sizes[1], sizes[9])
+
+    def test_engines_write_the_same_bytes(self):
+        """The streaming lxml condenser matches the minidom one"""
+        lxml_members = read_members(self.pack("lxml.docx", engine="lxml"))
+        minidom_members = read_members(self.pack("minidom.docx", engine="minidom"))
+        self.assertEqual(lxml_members, minidom_members)
+        document = dict(lxml_members)["word/document.xml"].decode("utf-8")
+        self.assertIn('"preserve">  Caf\u00e9 &amp; &quot;quotes&quot;', document)
+        self.assertIn("<w:t><!-- kept -->x</w:t>", document)
+        self.assertIn("</w:p><w:p><w:r>", document)
+        self.assertNotIn("reviewer note", document)
+
+    def test_parallel_pack_matches_serial(self):
+        """--jobs writes the same members in the same order"""
+        serial = read_members(self.pack("serial.docx"))
+        parallel = read_members(self.pack("parallel.docx", jobs=2))
+        self.assertEqual(parallel, serial)
+
+    def test_member_order_and_compression(self):
+        """[Content_Types].xml comes first and media is stored, not deflated"""
+        with zipfile.ZipFile(self.pack("output.docx")) as zf:
+            infos = zf.infolist()
+            self.assertEqual(infos[0].filename, "[Content_Types].xml")
+            types = {info.filename: info.compress_type for info in infos}
+        self.assertEqual(types["word/media/image1.png"], zipfile.ZIP_STORED)
+        self.assertEqual(types["word/document.xml"], zipfile.ZIP_DEFLATED)
+
+    def test_unchanged_members_are_copied_from_original(self):
+        """With original, only changed parts are condensed and compressed again"""
+        original = self.pack("original.docx", compression_level=1)
+        document = self.unpacked / "word/document.xml"
+        document.write_text(
+            document.read_text(encoding="utf-8").replace("alpha", "omega", 1),
+            encoding="utf-8",
+        )
+        output = self.pack("output.docx", compression_level=9, original=original)
+
+        with zipfile.ZipFile(original) as before, zipfile.ZipFile(output) as after:
+            self.assertIsNone(after.testzip())
+            for info in after.infolist():
+                old = before.getinfo(info.filename)
+                with self.subTest(info.filename):
+                    if info.filename == "word/document.xml":
+                        self.assertNotEqual(info.CRC, old.CRC)
+                        self.assertLess(info.compress_size, old.compress_size)
+                    else:
+                        self.assertEqual(info.compress_size, old.compress_size)
+                        self.assertEqual(after.read(info), before.read(old))
+
+    def test_unchanged_members_without_zipfile_internals(self):
+        """Without the zipfile internals, unchanged members are compressed again"""
+        original = self.pack("original.docx", compression_level=1)
+        raw = self.pack("raw.docx", original=original)
+        writestr = mock.patch.object(
+            zipfile.ZipFile,
+            "writestr",
+            autospec=True,
+            side_effect=zipfile.ZipFile.writestr,
+        )
+        with mock.patch.object(
+            pack, "_can_copy_raw", return_value=False
+        ) as can_copy_raw, writestr as writestr:
+            output = self.pack("output.docx", original=original)
+        can_copy_raw.assert_called()
+        self.assertEqual(writestr.call_count, can_copy_raw.call_count)
+
+        with zipfile.ZipFile(output) as zf:
+            self.assertIsNone(zf.testzip())
+        self.assertEqual(read_members(output), read_members(raw))
+
+
+if __name__ == "__main__":
+    unittest.main()
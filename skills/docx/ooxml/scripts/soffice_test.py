@@ -0,0 +1,255 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import soffice
+from soffice import OfficeService
+
+# Stands in for soffice --convert-to. The input file's content says what to do:
+# "ok", "slow", "hang", "fail", or "flaky" (fails the first time only). Each
+# successful run appends "<start> <end> <profile>" to calls.log next to the stub.
+# Recalculations "hang", or save the file and keep running if it says "saved".
+STUB_SOFFICE = """#!{python}
+import os, sys, time
+
+args = sys.argv[1:]
+profile = args[0].partition("=")[2]
+start = time.time()
+if "--terminate_after_init" in args:
+    sys.exit()
+input_path = args[-1]
+with open(input_path) as f:
+    action = f.read().strip()
+if args[-2].startswith("vnd.sun.star.script:"):
+    if action == "saved":
+        with open(input_path, "w") as f:
+            f.write("recalculated")
+    time.sleep(60)
+if action == "slow":
+    time.sleep(0.3)
+elif action == "hang":
+    time.sleep(60)
+elif action == "fail" or (action == "flaky" and not os.path.exists(input_path + ".seen")):
+    open(input_path + ".seen", "w").close()
+    sys.exit("soffice crashed")
+extension = args[args.index("--convert-to") + 1].partition(":")[0]
+output_dir = args[args.index("--outdir") + 1]
+stem = os.path.splitext(os.path.basename(input_path))[0]
+with open(os.path.join(output_dir, stem + "." + extension), "w") as f:
+    f.write("converted")
+with open(os.path.join(os.path.dirname(__file__), "calls.log"), "a") as f:
+    f.write(f"{{start}} {{time.time()}} {{profile}}\\n")
+"""
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestCliWorkers(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name)
+        bin_dir = self.root / "bin"
+        bin_dir.mkdir()
+        stub = bin_dir / "soffice"
+        stub.write_text(STUB_SOFFICE.format(python=sys.executable))
+        stub.chmod(0o755)
+        self.log = bin_dir / "calls.log"
+        path = f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+        patcher = mock.patch.dict(os.environ, {"PATH": path})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.output_dir = self.root / "out"
+        self.output_dir.mkdir()
+
+    def service(self, **kwargs):
+        service = OfficeService(
+            use_uno=False, profile_dir=self.root / "profiles", **kwargs
+        )
+        self.addCleanup(service.close)
+        return service
+
+    def document(self, name, action):
+        path = self.root / name
+        path.write_text(action)
+        return path
+
+    def calls(self):
+        """Return (start, end, profile) of each finished stub run."""
+        if not self.log.exists():
+            return []
+        return [
+            (float(start), float(end), profile)
+            for start, end, profile in (
+                line.split() for line in self.log.read_text().splitlines()
+            )
+        ]
+
+    def convert_all(self, service, paths):
+        """Convert paths from one thread each and return the results."""
+        results = {}
+
+        def convert(path):
+            results[path] = service.convert(path, self.output_dir, "pdf")
+
+        threads = [threading.Thread(target=convert, args=(p,)) for p in paths]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_convert(self):
+        """The converted file is returned and the profile is kept for reuse"""
+        service = self.service()
+        output = service.convert(self.document("a.docx", "ok"), self.output_dir, "pdf")
+        self.assertEqual(output, self.output_dir / "a.pdf")
+        self.assertEqual(output.read_text(), "converted")
+        ((_, _, profile),) = self.calls()
+        self.assertTrue(profile.endswith("/profiles/worker0"))
+
+    def test_conversions_queue_for_the_worker(self):
+        """With one worker, concurrent conversions run one after another"""
+        service = self.service(workers=1)
+        paths = [self.document(f"{i}.docx", "slow") for i in range(3)]
+        results = self.convert_all(service, paths)
+        self.assertEqual(len(results), 3)
+        calls = sorted(self.calls())
+        self.assertEqual(len(calls), 3)
+        for (_, end, _), (start, _, _) in zip(calls, calls[1:]):
+            self.assertLessEqual(end, start)
+
+    def test_workers_use_separate_profiles(self):
+        """Conversions running at the same time never share a profile"""
+        service = self.service(workers=2)
+        paths = [self.document(f"{i}.docx", "slow") for i in range(4)]
+        self.convert_all(service, paths)
+        calls = self.calls()
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(len({profile for _, _, profile in calls}), 2)
+        for a in calls:
+            for b in calls:
+                if a is not b and a[0] < b[1] and b[0] < a[1]:
+                    self.assertNotEqual(a[2], b[2])
+
+    def test_failed_conversion_is_retried(self):
+        """A conversion failing once succeeds on the retry"""
+        service = self.service(retries=1)
+        output = service.convert(self.document("a.docx", "flaky"), self.output_dir, "pdf")
+        self.assertEqual(output.read_text(), "converted")
+
+    def test_retries_are_limited(self):
+        """The error of the last attempt is raised"""
+        service = self.service(retries=0)
+        with self.assertRaisesRegex(RuntimeError, "soffice crashed"):
+            service.convert(self.document("a.docx", "flaky"), self.output_dir, "pdf")
+
+    def test_timeout(self):
+        """A conversion taking too long is killed and reported"""
+        service = self.service(retries=0)
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            service.convert(
+                self.document("a.docx", "hang"), self.output_dir, "pdf", timeout=0.5
+            )
+        self.assertLess(time.monotonic() - start, 30)
+        self.assertEqual(self.calls(), [])
+        # The worker is usable again
+        output = service.convert(self.document("b.docx", "ok"), self.output_dir, "pdf")
+        self.assertTrue(output.exists())
+
+    def test_recalculation_saved_before_timeout(self):
+        """soffice still running after saving the spreadsheet is not an error"""
+        service = self.service(retries=0)
+        path = self.document("a.xlsx", "saved")
+        service.recalculate(path, timeout=2)
+        self.assertEqual(path.read_text(), "recalculated")
+
+    def test_recalculation_timeout(self):
+        """A recalculation that did not save the spreadsheet in time is reported"""
+        service = self.service(retries=0)
+        path = self.document("a.xlsx", "hang")
+        with self.assertRaisesRegex(TimeoutError, "did not save a.xlsx"):
+            service.recalculate(path, timeout=0.5)
+        self.assertEqual(path.read_text(), "hang")
+
+    @unittest.skipIf(soffice.fcntl is None, "profile locks need fcntl")
+    def test_profiles_are_locked(self):
+        """A profile in use is skipped by other services until it is released"""
+        first = self.service()
+        second = self.service()
+        first.convert(self.document("a.docx", "ok"), self.output_dir, "pdf")
+        second.convert(self.document("b.docx", "ok"), self.output_dir, "pdf")
+        profiles = [Path(profile).name for _, _, profile in self.calls()]
+        self.assertEqual(profiles, ["worker0", "worker1"])
+        first.close()
+        third = self.service()
+        third.convert(self.document("c.docx", "ok"), self.output_dir, "pdf")
+        self.assertEqual(Path(self.calls()[-1][2]).name, "worker0")
+
+
+class TestGetService(unittest.TestCase):
+    def setUp(self):
+        for patcher in (
+            mock.patch.object(soffice, "_service", None),
+            mock.patch.object(soffice, "OfficeService"),
+            mock.patch.object(soffice.atexit, "register"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_workers(self):
+        """The worker count comes from the argument or SOFFICE_WORKERS"""
+        for variable, workers, expected in [(None, None, 1), ("3", None, 3), ("3", 2, 2)]:
+            with self.subTest(SOFFICE_WORKERS=variable, workers=workers):
+                soffice._service = None
+                with mock.patch.dict(os.environ):
+                    os.environ.pop("SOFFICE_WORKERS", None)
+                    if variable is not None:
+                        os.environ["SOFFICE_WORKERS"] = variable
+                    service = soffice.get_service(workers)
+                soffice.OfficeService.assert_called_with(workers=expected)
+                # Later calls return the same service, whatever they ask for
+                self.assertIs(soffice.get_service(4), service)
+
+    def test_invalid_environment(self):
+        """A SOFFICE_WORKERS that is not a number is rejected"""
+        with mock.patch.dict(os.environ, {"SOFFICE_WORKERS": "many"}):
+            with self.assertRaisesRegex(ValueError, "SOFFICE_WORKERS"):
+                soffice.get_service()
+
+
+class TestErrors(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.profile_dir = Path(temp_dir.name)
+
+    def test_value_error_is_not_retried(self):
+        """Argument errors reach the caller without a retry or restart"""
+        service = OfficeService(use_uno=False, retries=2, profile_dir=self.profile_dir)
+        self.addCleanup(service.close)
+        (worker,) = service._workers
+        job = mock.Mock(side_effect=ValueError("Name an export filter"))
+        with mock.patch.object(worker, "stop") as stop:
+            with self.assertRaises(ValueError):
+                service._run(job, None)
+        self.assertEqual(job.call_count, 1)
+        stop.assert_not_called()
+
+    def test_uno_worker_errors(self):
+        """UNO workers pass ValueError through and wrap other errors"""
+        worker = soffice._UnoWorker(self.profile_dir, None)
+        with mock.patch.object(worker, "_start"):
+            with self.assertRaisesRegex(ValueError, "export filter"):
+                worker._call(mock.Mock(side_effect=ValueError("export filter")), 5)
+            with self.assertRaisesRegex(RuntimeError, "LibreOffice failed"):
+                worker._call(mock.Mock(side_effect=KeyError("crash")), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,29 +1,354 @@
 #!/usr/bin/env python3
-"""Unpack and format XML contents of Office files (.docx, .pptx, .xlsx)"""
+"""
+Tool to unpack a .docx, .pptx, or .xlsx file and pretty-print its XML contents.
 
+Example usage:
+    python unpack.py <office_file> <output_directory> [--jobs N] [--pretty-print editable]
+
+Library usage:
+    from ooxml.scripts.unpack import unpack_document
+    unpack_document("report.docx", "unpacked", pretty_print="editable", jobs=4)
+"""
+
+import argparse
+import fnmatch
+import io
 import random
 import sys
-import defusedxml.minidom
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-# Get command line arguments
-assert len(sys.argv) == 3, "Usage: python unpack.py <office_file> <output_dir>"
-input_file, output_dir = sys.argv[1], sys.argv[2]
-
-# Extract and format
-output_path = Path(output_dir)
-output_path.mkdir(parents=True, exist_ok=True)
-zipfile.ZipFile(input_file).extractall(output_path)
-
-# Pretty print all XML files
-xml_files = list(output_path.rglob("*.xml")) + list(output_path.rglob("*.rels"))
-for xml_file in xml_files:
-    content = xml_file.read_text(encoding="utf-8")
-    dom = defusedxml.minidom.parseString(content)
-    xml_file.write_bytes(dom.toprettyxml(indent="  ", encoding="ascii"))
-
-# For .docx files, suggest an RSID for tracked changes
-if input_file.endswith(".docx"):
-    suggested_rsid = "".join(random.choices("0123456789ABCDEF", k=8))
-    print(f"Suggested RSID for edit session: {suggested_rsid}")
+import defusedxml.minidom
+import lxml.etree
+
+# Parts that are usually edited, pretty-printed with pretty_print="editable"
+EDITABLE_PARTS = (
+    "[[]Content_Types].xml",
+    # Word
+    "word/document.xml",
+    "word/_rels/document.xml.rels",
+    "word/comments*.xml",
+    "word/people.xml",
+    "word/footnotes.xml",
+    "word/endnotes.xml",
+    "word/header*.xml",
+    "word/footer*.xml",
+    # PowerPoint
+    "ppt/presentation.xml",
+    "ppt/_rels/presentation.xml.rels",
+    "ppt/slides/*.xml",
+    "ppt/slides/_rels/*.rels",
+    "ppt/notesSlides/*.xml",
+    "ppt/comments/*.xml",
+    # Excel
+    "xl/workbook.xml",
+    "xl/_rels/workbook.xml.rels",
+    "xl/worksheets/*.xml",
+    "xl/sharedStrings.xml",
+)
+
+_CHUNK_SIZE = 1 << 20
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Archive opened once per worker process by _open_archive
+_worker_archive = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Unpack an Office file and pretty-print its XML"
+    )
+    parser.add_argument("office_file", help="Office file (.docx/.pptx/.xlsx)")
+    parser.add_argument("output_directory", help="Directory to unpack into")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes pretty-printing parts in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--pretty-print",
+        choices=["all", "editable", "none"],
+        default="all",
+        help="Which parts to pretty-print; 'editable' only formats the parts "
+        "usually edited, such as word/document.xml and comments (default: all)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["lxml", "minidom"],
+        default="lxml",
+        help="Pretty-printer; both produce the same output (default: lxml)",
+    )
+    args = parser.parse_args()
+
+    try:
+        unpack_document(
+            args.office_file,
+            args.output_directory,
+            pretty_print=args.pretty_print,
+            jobs=args.jobs,
+            engine=args.engine,
+        )
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+
+    # For .docx files, suggest an RSID for tracked changes
+    if args.office_file.endswith(".docx"):
+        suggested_rsid = "".join(random.choices("0123456789ABCDEF", k=8))
+        print(f"Suggested RSID for edit session: {suggested_rsid}")
+
+
+def unpack_document(input_file, output_dir, pretty_print="all", jobs=1, engine="lxml"):
+    """Unpack an Office file (.docx/.pptx/.xlsx) and pretty-print its XML parts.
+
+    Parts that are not pretty-printed are extracted unchanged; pack.py accepts
+    both.
+
+    Args:
+        input_file: Path to the Office file
+        output_dir: Directory to unpack into (created if needed)
+        pretty_print: "all" for every *.xml/*.rels part, "editable" for the parts
+            in EDITABLE_PARTS, "none", or an iterable of glob patterns matched
+            against part names such as "word/document.xml" (default: "all")
+        jobs: Number of processes pretty-printing parts in parallel; 1 formats
+            them in this process (default: 1)
+        engine: "lxml" streams each part through an indenter without building a
+            tree; "minidom" parses each part into memory first. Both write the
+            same output as minidom's toprettyxml, except that lxml writes CDATA
+            sections as escaped text (default: "lxml")
+
+    Returns:
+        list[str]: Names of the pretty-printed parts
+
+    Raises:
+        ValueError: If the input is not an Office file or an option is invalid
+
+    Example:
+        unpack_document("deck.pptx", "unpacked", pretty_print="editable", jobs=4)
+    """
+    input_file = Path(input_file)
+    output_dir = Path(output_dir)
+
+    if not zipfile.is_zipfile(input_file):
+        raise ValueError(f"{input_file} is not a .docx, .pptx, or .xlsx file")
+    if jobs < 1:
+        raise ValueError(f"jobs must be at least 1, got {jobs}")
+    if engine not in _PRETTY_PRINTERS:
+        raise ValueError(f"Unknown engine {engine!r}; expected 'lxml' or 'minidom'")
+    patterns = _pretty_print_patterns(pretty_print)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(input_file) as zf:
+        members = [info for info in zf.infolist() if not info.is_dir()]
+        selected = [
+            info
+            for info in members
+            if info.filename.endswith((".xml", ".rels"))
+            and any(fnmatch.fnmatchcase(info.filename, p) for p in patterns)
+        ]
+        selected_names = {info.filename for info in selected}
+
+        # Extract everything else unchanged, then format the selected parts
+        for info in members:
+            if info.filename not in selected_names:
+                zf.extract(info, output_dir)
+
+        # Largest parts first so one big part does not finish the pool alone
+        selected.sort(key=lambda info: info.file_size, reverse=True)
+        names = [info.filename for info in selected]
+        if jobs == 1 or len(names) < 2:
+            for name in names:
+                _pretty_print_part(zf, name, output_dir, engine)
+            return names
+
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(names)),
+        initializer=_open_archive,
+        initargs=(str(input_file),),
+    ) as executor:
+        futures = [
+            executor.submit(_pretty_print_worker, name, str(output_dir), engine)
+            for name in names
+        ]
+        for future in futures:
+            future.result()
+    return names
+
+
+# ==================== Private: Part Selection ====================
+
+
+def _pretty_print_patterns(pretty_print):
+    """Return the glob patterns for a pretty_print setting."""
+    if pretty_print == "all":
+        return ("*",)
+    if pretty_print == "editable":
+        return EDITABLE_PARTS
+    if pretty_print == "none":
+        return ()
+    if isinstance(pretty_print, str):
+        raise ValueError(
+            f"Unknown pretty_print {pretty_print!r}; expected 'all', 'editable', "
+            "'none' or a list of patterns"
+        )
+    return tuple(pretty_print)
+
+
+def _member_path(output_dir, name):
+    """Return where a part is written, refusing names outside output_dir."""
+    output_dir = Path(output_dir).resolve()
+    path = (output_dir / name).resolve()
+    if output_dir not in path.parents:
+        raise ValueError(f"Part {name!r} would be written outside {output_dir}")
+    return path
+
+
+# ==================== Private: Pretty-Printing ====================
+
+
+def _open_archive(input_file):
+    """Open the archive once in each worker process."""
+    global _worker_archive
+    _worker_archive = zipfile.ZipFile(input_file)
+
+
+def _pretty_print_worker(name, output_dir, engine):
+    _pretty_print_part(_worker_archive, name, output_dir, engine)
+
+
+def _pretty_print_part(zf, name, output_dir, engine):
+    path = _member_path(output_dir, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _PRETTY_PRINTERS[engine](zf, name, path)
+
+
+def _pretty_print_minidom(zf, name, path):
+    dom = defusedxml.minidom.parseString(zf.read(name))
+    path.write_bytes(dom.toprettyxml(indent="  ", encoding="ascii"))
+
+
+def _pretty_print_lxml(zf, name, path):
+    with zf.open(name) as source, open(path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+        writer = io.TextIOWrapper(
+            f, encoding="ascii", errors="xmlcharrefreplace", newline="\n"
+        )
+        _write_pretty(source, writer)
+        writer.flush()
+        writer.detach()
+
+
+_PRETTY_PRINTERS = {"lxml": _pretty_print_lxml, "minidom": _pretty_print_minidom}
+_XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+
+def _write_pretty(source, writer):
+    """Write the layout of minidom's toprettyxml(indent="  ") while parsing source.
+
+    Every text node goes on its own indented line unless it is an element's only
+    child, as in minidom; CDATA sections are written as escaped text. The text
+    before a node is complete once the node's event arrives, so text is written
+    one event late, and finished siblings are dropped from the tree right away
+    so memory does not grow with the part.
+    """
+    out = ['<?xml version="1.0" encoding="ascii"?>\n']
+    # Open elements as [element, qualified name, indent, has child nodes]
+    stack = []
+    # In-scope {namespace: prefix} for attributes, one dict per open element
+    scopes = [{_XML_NAMESPACE: "xml"}]
+    declarations = []
+
+    for event, node in lxml.etree.iterparse(
+        source,
+        events=("start-ns", "start", "end", "comment", "pi"),
+        resolve_entities=False,
+        no_network=True,
+        load_dtd=False,
+    ):
+        if event == "start-ns":
+            declarations.append(node)
+            continue
+
+        if event == "end":
+            elem, name, indent, has_children = stack.pop()
+            scopes.pop()
+            text = elem[-1].tail if has_children else elem.text
+            if has_children:
+                if text:
+                    out.append(f"{indent}  {_escape(text)}\n")
+                out.append(f"{indent}</{name}>\n")
+            elif text:
+                out.append(f">{_escape(text)}</{name}>\n")
+            else:
+                out.append("/>\n")
+            elem.clear(keep_tail=True)
+            if len(out) > 4096:
+                writer.write("".join(out))
+                out.clear()
+            continue
+
+        # A start tag, comment or processing instruction is a new child node
+        # of the innermost open element; write the text before it first
+        if stack:
+            parent = stack[-1]
+            previous = node.getprevious()
+            if previous is None:
+                text = parent[0].text
+            else:
+                text = previous.tail
+                while node.getprevious() is not None:
+                    del parent[0][0]
+            if not parent[3]:
+                out.append(">\n")
+                parent[3] = True
+            if text:
+                out.append(f"{parent[2]}  {_escape(text)}\n")
+        indent = "  " * len(stack)
+
+        if event == "comment":
+            out.append(f"{indent}<!--{node.text}-->\n")
+        elif event == "pi":
+            out.append(f"{indent}<?{node.target} {node.text or ''}?>\n")
+        else:
+            tag = node.tag
+            name = tag[tag.index("}") + 1 :] if tag[0] == "{" else tag
+            if node.prefix:
+                name = f"{node.prefix}:{name}"
+            out.append(f"{indent}<{name}")
+
+            prefixes = scopes[-1]
+            if declarations:
+                prefixes = dict(prefixes)
+                for prefix, namespace in declarations:
+                    if prefix:
+                        prefixes[namespace] = prefix
+                        out.append(f' xmlns:{prefix}="{_escape(namespace)}"')
+                    else:
+                        out.append(f' xmlns="{_escape(namespace)}"')
+                declarations = []
+            scopes.append(prefixes)
+
+            for attr, value in node.items():
+                if attr[0] == "{":
+                    namespace, attr = attr[1:].split("}", 1)
+                    attr = f"{prefixes[namespace]}:{attr}"
+                out.append(f' {attr}="{_escape(value)}"')
+            stack.append([node, name, indent, False])
+
+    writer.write("".join(out))
+
+
+def _escape(data):
+    # Same escaping as minidom's writer, including quotes in text
+    if "&" in data or "<" in data or ">" in data or '"' in data:
+        data = (
+            data.replace("&", "&amp;")
+            .replace("<", "&lt;")
+            .replace('"', "&quot;")
+            .replace(">", "&gt;")
+        )
+    return data
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from unpack import unpack_document
+
+# Parts with the XML features the two pretty-printers must agree on: prefixed and
+# default namespaces, escaping, non-ASCII text, mixed content, comments and
+# processing instructions
+PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="xml" ContentType="application/xml"/></Types>'
+    ),
+    "word/document.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+        'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+        'xmlns:w14="http://schemas.microsoft.com/office/word/2010/wordml" mc:Ignorable="w14">'
+        "<w:body><!-- first paragraph -->"
+        '<w:p w14:paraId="0A1B2C3D"><w:r><w:t xml:space="preserve"> Café &amp; "quotes" &lt;tag&gt; – \U0001F600 </w:t></w:r></w:p>'
+        "<w:p>mixed <w:r><w:t>content</w:t></w:r> tail<w:r/></w:p>"
+        "<?pi some data?><w:p><w:r><w:t>a &lt; b</w:t></w:r></w:p>"
+        '<w:sectPr><inner xmlns="urn:example" attr="&#10;"><child/></inner></w:sectPr>'
+        "</w:body></w:document>"
+    ),
+    "word/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        '<w:style w:styleId="Normal"><w:name w:val="Normal"/></w:style></w:styles>'
+    ),
+    "word/_rels/document.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        "</Relationships>"
+    ),
+    "word/media/image1.png": b"\x89PNG\r\n\x1a\n" + bytes(range(256)),
+}
+
+
+def write_office_file(path, parts=PARTS):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, content in parts.items():
+            zf.writestr(name, content)
+
+
+def read_tree(directory):
+    """Return {relative path: bytes} of every file under directory."""
+    directory = Path(directory)
+    return {
+        str(path.relative_to(directory)): path.read_bytes()
+        for path in directory.rglob("*")
+        if path.is_file()
+    }
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestUnpackDocument(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name)
+        self.docx = self.root / "input.docx"
+        write_office_file(self.docx)
+
+    def unpack(self, name, **kwargs):
+        output = self.root / name
+        names = unpack_document(self.docx, output, **kwargs)
+        return sorted(names), read_tree(output)
+
+    def test_engines_write_the_same_bytes(self):
+        """The streaming lxml pretty-printer matches minidom's toprettyxml"""
+        lxml_names, lxml_tree = self.unpack("lxml", engine="lxml")
+        minidom_names, minidom_tree = self.unpack("minidom", engine="minidom")
+        self.assertEqual(lxml_names, minidom_names)
+        self.assertEqual(len(lxml_names), 4)
+        for name in lxml_tree:
+            with self.subTest(name):
+                self.assertEqual(lxml_tree[name], minidom_tree[name])
+        self.assertEqual(lxml_tree.keys(), minidom_tree.keys())
+
+    def test_cdata_is_written_as_text(self):
+        """The lxml engine escapes CDATA sections instead of keeping them"""
+        document = PARTS["word/document.xml"].replace("a &lt; b", "<![CDATA[a < b]]>")
+        write_office_file(self.docx, {**PARTS, "word/document.xml": document})
+        _, tree = self.unpack("cdata")
+        self.assertIn(b"<w:t>a &lt; b</w:t>", tree["word/document.xml"])
+
+    def test_parallel_unpack_matches_serial(self):
+        """--jobs writes the same files as a serial unpack"""
+        serial = self.unpack("serial")
+        parallel = self.unpack("parallel", jobs=2)
+        self.assertEqual(parallel, serial)
+
+    def test_editable_parts_only(self):
+        """Parts outside EDITABLE_PARTS are extracted unchanged"""
+        names, tree = self.unpack("editable", pretty_print="editable")
+        self.assertEqual(
+            names,
+            ["[Content_Types].xml", "word/_rels/document.xml.rels", "word/document.xml"],
+        )
+        self.assertEqual(tree["word/styles.xml"], PARTS["word/styles.xml"].encode())
+        self.assertEqual(tree["word/media/image1.png"], PARTS["word/media/image1.png"])
+        self.assertTrue(tree["word/document.xml"].startswith(b"<?xml"))
+        self.assertIn(b"\n  <w:body>\n", tree["word/document.xml"])
+
+    def test_parts_outside_output_dir_are_refused(self):
+        """A part name escaping the output directory is rejected"""
+        write_office_file(self.docx, {**PARTS, "../escaped.xml": "<a/>"})
+        with self.assertRaisesRegex(ValueError, "outside"):
+            unpack_document(self.docx, self.root / "out", jobs=1)
+        self.assertFalse((self.root / "escaped.xml").exists())
+
+    def test_invalid_arguments(self):
+        """Out-of-range jobs, unknown engines and modes are rejected"""
+        for kwargs in ({"jobs": 0}, {"engine": "sax"}, {"pretty_print": "some"}):
+            with self.subTest(**kwargs):
+                with self.assertRaises(ValueError):
+                    unpack_document(self.docx, self.root / "out", **kwargs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,251 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+import lxml.etree
+
+from validation import DOCXSchemaValidator
+from validation.base import SCHEMAS_DIR, load_schema
+
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+PARTS = {
+    "[Content_Types].xml": """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+  <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+  <Default Extension="xml" ContentType="application/xml"/>
+  <Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+  <Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>
+</Types>
+""",
+    "_rels/.rels": """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+  <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>
+""",
+    "word/_rels/document.xml.rels": """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+  <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>
+""",
+    "word/document.xml": f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="{W_NAMESPACE}">
+  <w:body>
+    <w:p>
+      <w:bookmarkStart w:id="1" w:name="first"/>
+      <w:r>
+        <w:t>Hello</w:t>
+      </w:r>
+      <w:bookmarkEnd w:id="1"/>
+    </w:p>
+    <w:p>
+      <w:bookmarkStart w:id="2" w:name="second"/>
+      <w:r>
+        <w:t>World</w:t>
+      </w:r>
+      <w:bookmarkEnd w:id="2"/>
+    </w:p>
+  </w:body>
+</w:document>
+""",
+    "word/styles.xml": f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="{W_NAMESPACE}">
+  <w:style w:type="paragraph" w:styleId="Normal">
+    <w:name w:val="Normal"/>
+  </w:style>
+</w:styles>
+""",
+}
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestDOCXSchemaValidator(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name)
+        self.unpacked = self.root / "unpacked"
+        self.original = self.root / "original.docx"
+        with zipfile.ZipFile(self.original, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, content in PARTS.items():
+                zf.writestr(name, content)
+                path = self.unpacked / name
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(content, encoding="utf-8")
+
+    def validator(self, **kwargs):
+        return DOCXSchemaValidator(self.unpacked, self.original, **kwargs)
+
+    def edit(self, name, old, new):
+        """Replace text in an unpacked part, keeping its modification time."""
+        path = self.unpacked / name
+        stat = path.stat()
+        content = path.read_text(encoding="utf-8")
+        self.assertIn(old, content)
+        path.write_text(content.replace(old, new), encoding="utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    def run_validate(self, validator):
+        """Return the result and printed report of validator.validate()."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            result = validator.validate()
+        return result, output.getvalue()
+
+    def test_valid_document(self):
+        """The unchanged document passes every check"""
+        result, report = self.run_validate(self.validator())
+        self.assertTrue(result, report)
+
+    def test_new_errors_are_reported(self):
+        """Each check reports the errors introduced since the original"""
+        self.edit("word/document.xml", 'w:id="2" w:name', 'w:id="1" w:name')
+        self.edit("word/styles.xml", "<w:name ", "<w:bogus ")
+        result, report = self.run_validate(self.validator())
+        self.assertFalse(result)
+        self.assertIn("Duplicate id='1' in <bookmarkstart>", report)
+        self.assertIn("word/styles.xml: 1 new error(s)", report)
+
+    def test_parts_are_parsed_once(self):
+        """All checks share one parsed tree per part"""
+        self.edit("word/styles.xml", 'w:val="Normal"', 'w:val="Body"')
+        parsed = []
+        parse = lxml.etree.parse
+
+        def recording_parse(source, *args, **kwargs):
+            parsed.append(kwargs.get("base_url"))
+            return parse(source, *args, **kwargs)
+
+        with mock.patch.object(lxml.etree, "parse", recording_parse):
+            result, report = self.run_validate(self.validator())
+        self.assertTrue(result, report)
+        parts = sorted(str(self.unpacked.resolve() / name) for name in PARTS)
+        self.assertEqual(sorted(p for p in parsed if p in parts), parts)
+
+    def test_errors_of_the_original_are_ignored(self):
+        """Original parts are read from the archive once, without extracting it"""
+        broken = {
+            name: PARTS[name].replace(old, new)
+            for name, old, new in [
+                ("word/document.xml", "<w:t>World</w:t>", "<w:x>World</w:x>"),
+                ("word/styles.xml", "<w:name ", "<w:bogus "),
+            ]
+        }
+        with zipfile.ZipFile(self.original, "w") as zf:
+            for name, content in {**PARTS, **broken}.items():
+                zf.writestr(name, content)
+        for name, content in broken.items():
+            # Changed, but with the same errors as the original
+            (self.unpacked / name).write_text(
+                content.replace("Normal", "Body").replace("Hello", "Hi"),
+                encoding="utf-8",
+            )
+
+        opened = []
+        open_zip = zipfile.ZipFile
+
+        def recording_zip_file(file, *args, **kwargs):
+            opened.append(Path(file))
+            return open_zip(file, *args, **kwargs)
+
+        validator = self.validator()
+        with mock.patch.object(zipfile, "ZipFile", recording_zip_file):
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertTrue(validator.validate_against_xsd())
+        # Once for the content keys, once for reading the parts
+        self.assertEqual(opened, [self.original, self.original])
+        self.assertIsNone(validator._original_zip)
+
+    def test_parallel_xsd_matches_serial(self):
+        """--jobs gives the same results, in the same order, as one process"""
+        self.edit("word/document.xml", "<w:t>Hello</w:t>", "<w:x>Hello</w:x>")
+        self.edit("word/styles.xml", "<w:name ", "<w:bogus ")
+        serial = self.validator()._validate_files_against_xsd()
+        parallel = self.validator(jobs=2)._validate_files_against_xsd()
+        self.assertEqual(parallel, serial)
+        self.assertEqual(sum(1 for valid, _ in serial if valid is False), 2)
+
+    def test_incremental_validation_matches_full(self):
+        """A shared cache gives the results of a fresh validator after each edit"""
+        cache = {}
+        edits = [
+            # Same size and modification time as before
+            ("word/document.xml", "<w:t>Hello</w:t>", "<w:x>Hello</w:x>"),
+            ("word/document.xml", 'w:id="2" w:name', 'w:id="1" w:name'),
+            ("word/styles.xml", "<w:name ", "<w:bogus "),
+            # Back to the original content
+            ("word/document.xml", "<w:x>Hello</w:x>", "<w:t>Hello</w:t>"),
+            ("word/document.xml", 'w:id="1" w:name="second"', 'w:id="2" w:name="second"'),
+            ("word/styles.xml", "<w:bogus ", "<w:name "),
+        ]
+        self.assertEqual(
+            self.run_validate(self.validator(cache=cache)),
+            self.run_validate(self.validator()),
+        )
+        for name, old, new in edits:
+            with self.subTest(f"{name}: {new}"):
+                self.edit(name, old, new)
+                incremental = self.run_validate(self.validator(cache=cache))
+                self.assertEqual(incremental, self.run_validate(self.validator()))
+        self.assertTrue(incremental[0], incremental[1])
+
+    def test_only_changed_parts_are_checked_again(self):
+        """With a warm cache, an edit re-validates only the edited part"""
+        cache = {}
+        self.run_validate(self.validator(cache=cache))
+        self.edit("word/styles.xml", 'w:val="Normal"', 'w:val="Body"')
+
+        with mock.patch.object(
+            DOCXSchemaValidator,
+            "_validate_single_file_xsd",
+            autospec=True,
+            side_effect=DOCXSchemaValidator._validate_single_file_xsd,
+        ) as validate_xsd:
+            result, report = self.run_validate(self.validator(cache=cache))
+        self.assertTrue(result, report)
+        validated = [call.args[1].name for call in validate_xsd.call_args_list]
+        self.assertEqual(validated, ["styles.xml"])
+
+    def test_parts_identical_to_original_skip_xsd(self):
+        """A fresh validator does not validate parts that match the original"""
+        with mock.patch.object(
+            DOCXSchemaValidator, "_validate_single_file_xsd"
+        ) as validate_xsd:
+            result, report = self.run_validate(self.validator())
+        self.assertTrue(result, report)
+        validate_xsd.assert_not_called()
+
+
+class TestXsdPreparation(unittest.TestCase):
+    def test_schema_is_compiled_once(self):
+        """Schemas are compiled once per process and then shared"""
+        schema_path = SCHEMAS_DIR / DOCXSchemaValidator.SCHEMA_MAPPINGS[".rels"]
+        self.assertIs(load_schema(schema_path), load_schema(schema_path))
+
+    def test_prepare_for_xsd(self):
+        """Template tags, mc:Ignorable and foreign markup are removed in one pass"""
+        root = lxml.etree.fromstring(
+            f'<w:document xmlns:w="{W_NAMESPACE}" '
+            'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+            'xmlns:x="urn:extra" mc:Ignorable="x" x:flag="1">'
+            '<w:body>{{intro}}<w:p x:id="7"><w:r><w:t>{{name}}</w:t></w:r>'
+            "<x:extra><w:p/></x:extra></w:p>{{outro}}</w:body></w:document>"
+        )
+        validator = DOCXSchemaValidator.__new__(DOCXSchemaValidator)
+        validator._prepare_for_xsd(root, clean_namespaces=True)
+        self.assertEqual(
+            lxml.etree.tostring(root, encoding="unicode"),
+            f'<w:document xmlns:w="{W_NAMESPACE}" '
+            'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+            'xmlns:x="urn:extra">'
+            "<w:body><w:p><w:r><w:t>{{name}}</w:t></w:r></w:p></w:body></w:document>",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
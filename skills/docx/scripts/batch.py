@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Apply edit scripts to many .docx files in parallel.
+
+Each manifest entry pairs a .docx with a Python edit script. Entries run in worker
+processes (several at a time), each with its own temporary directory and time
+limit: the script edits a Document opened on the .docx, and the result is
+validated and saved by the worker. A failing, hanging or crashing document only
+affects its own entry. One JSON line per document is appended to the result log as
+documents finish.
+
+Manifest (JSON lines; relative paths are relative to the manifest file):
+    {"docx": "in/contract-001.docx", "script": "edits/rename_parties.py"}
+    {"docx": "in/contract-002.docx", "script": "edits/rename_parties.py", "output": "out/002.docx"}
+
+Edit script (must define edit(doc); the return value is logged if not None):
+    def edit(doc):
+        return doc["word/document.xml"].replace_text("Seller", "Vendor")
+
+Usage:
+    PYTHONPATH=/mnt/skills/docx python -m scripts.batch manifest.jsonl \\
+        --output-dir out --jobs 8 --timeout 300 --log results.jsonl
+
+Result log entries:
+    {"docx": "...", "script": "...", "output": "...", "status": "ok", "seconds": 1.82, "result": 12}
+    {"docx": "...", "status": "error", "error": "ValueError: Schema validation failed", "log": "..."}
+
+Status is "ok", "error" (the script raised or validation failed), "timeout" or
+"crashed" (the worker process died).
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from collections import Counter, deque
+from dataclasses import dataclass
+from pathlib import Path
+
+from .document import Document
+
+# Characters of captured worker output kept in the log for failed documents
+LOG_TAIL = 4000
+
+
+@dataclass
+class BatchTask:
+    """One document of a batch."""
+
+    docx: Path  # .docx to edit
+    script: Path  # Python file defining edit(doc)
+    output: Path  # where the edited .docx is written
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Apply edit scripts to many .docx files in parallel"
+    )
+    parser.add_argument("manifest", help="JSON lines file of docx/script(/output) entries")
+    parser.add_argument(
+        "--output-dir", help="Directory for outputs of entries without an output path"
+    )
+    parser.add_argument(
+        "--log", default="batch_results.jsonl", help="Result log (JSON lines, appended)"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=None, help="Parallel workers (default: CPU count)"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=None, help="Seconds allowed per document"
+    )
+    parser.add_argument("--author", default="Claude", help="Author of tracked changes")
+    parser.add_argument("--initials", default="C", help="Author initials")
+    parser.add_argument(
+        "--engine", default="minidom", choices=["minidom", "lxml"], help="XML backend"
+    )
+    parser.add_argument(
+        "--no-validate", action="store_true", help="Skip validation (debugging only)"
+    )
+    args = parser.parse_args()
+
+    try:
+        tasks = load_manifest(args.manifest, args.output_dir)
+        counts = run_batch(
+            tasks,
+            args.log,
+            jobs=args.jobs,
+            timeout=args.timeout,
+            validate=not args.no_validate,
+            author=args.author,
+            initials=args.initials,
+            engine=args.engine,
+        )
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"Processed {len(tasks)} documents: {summary}. Results in {args.log}")
+    sys.exit(0 if counts["ok"] == len(tasks) else 1)
+
+
+def load_manifest(manifest_path, output_dir=None):
+    """Read batch tasks from a JSON lines manifest.
+
+    Args:
+        manifest_path: Path to the manifest; relative paths in it are resolved
+            against its directory
+        output_dir: Directory for entries without an "output" path, which are
+            written under the name of their .docx
+
+    Returns:
+        list[BatchTask]: Tasks in manifest order
+
+    Raises:
+        ValueError: If an entry is malformed, a file is missing, or two entries
+            would write the same output
+    """
+    manifest_path = Path(manifest_path)
+    base = manifest_path.parent
+    tasks = []
+    outputs = set()
+    with open(manifest_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                docx = base / entry["docx"]
+                script = base / entry["script"]
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                raise ValueError(
+                    f"{manifest_path}:{line_number}: expected an object with "
+                    f'"docx" and "script" ({e})'
+                )
+            if "output" in entry:
+                output = base / entry["output"]
+            elif output_dir is not None:
+                output = Path(output_dir) / docx.name
+            else:
+                raise ValueError(
+                    f"{manifest_path}:{line_number}: no output path and no output directory"
+                )
+
+            for path in (docx, script):
+                if not path.is_file():
+                    raise ValueError(f"{manifest_path}:{line_number}: {path} not found")
+            if output.resolve() in outputs:
+                raise ValueError(
+                    f"{manifest_path}:{line_number}: {output} is written by another entry"
+                )
+            outputs.add(output.resolve())
+            tasks.append(BatchTask(docx, script, output))
+    return tasks
+
+
+def run_batch(
+    tasks,
+    log_path,
+    jobs=None,
+    timeout=None,
+    validate=True,
+    author="Claude",
+    initials="C",
+    engine="minidom",
+):
+    """Run batch tasks in parallel worker processes.
+
+    Each task runs in a fresh worker process with its own temporary directory,
+    which is removed when the task ends, whatever the outcome. Workers exceeding
+    the timeout are killed.
+
+    Args:
+        tasks: BatchTask list, e.g. from load_manifest()
+        log_path: JSON lines result log; one entry per task is appended as it ends
+        jobs: Number of tasks run at the same time (default: CPU count)
+        timeout: Seconds allowed per task, or None for no limit
+        validate: Validate each document before saving it (default: True)
+        author: Author name for tracked changes and comments (default: "Claude")
+        initials: Author initials (default: "C")
+        engine: XML backend for Document, "minidom" or "lxml" (default: "minidom")
+
+    Returns:
+        Counter: Number of tasks per status ("ok", "error", "timeout", "crashed")
+
+    Raises:
+        ValueError: If jobs is less than 1
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    elif jobs < 1:
+        raise ValueError(f"jobs must be at least 1, got {jobs}")
+    options = {
+        "validate": validate,
+        "author": author,
+        "initials": initials,
+        "engine": engine,
+    }
+    context = multiprocessing.get_context()
+    pending = deque(tasks)
+    running = {}  # result connection -> (process, task, start time, temp dir)
+    counts = Counter()
+
+    with open(log_path, "a", encoding="utf-8") as log:
+
+        def finish(conn, status, record):
+            process, task, started, temp_dir = running.pop(conn)
+            conn.close()
+            process.join()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            # A killed worker may leave its half-written output behind
+            task.output.with_name(f".{task.output.name}.tmp").unlink(missing_ok=True)
+            entry = {
+                "docx": str(task.docx),
+                "script": str(task.script),
+                "output": str(task.output),
+                "status": status,
+                "seconds": round(time.monotonic() - started, 3),
+                **record,
+            }
+            log.write(json.dumps(entry, default=str) + "\n")
+            log.flush()
+            counts[status] += 1
+
+        while pending or running:
+            while pending and len(running) < jobs:
+                task = pending.popleft()
+                temp_dir = tempfile.mkdtemp(prefix="docx_batch_")
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(
+                    target=_run_task, args=(task, options, temp_dir, sender), daemon=True
+                )
+                process.start()
+                sender.close()
+                running[receiver] = (process, task, time.monotonic(), temp_dir)
+
+            wait_for = None
+            if timeout is not None:
+                oldest = min(started for _, _, started, _ in running.values())
+                wait_for = max(0.0, oldest + timeout - time.monotonic())
+            for conn in multiprocessing.connection.wait(list(running), wait_for):
+                try:
+                    record = conn.recv()
+                except EOFError:
+                    process = running[conn][0]
+                    process.join()
+                    error = f"Worker exited with code {process.exitcode}"
+                    finish(conn, "crashed", {"error": error})
+                else:
+                    finish(conn, record.pop("status"), record)
+
+            if timeout is not None:
+                now = time.monotonic()
+                for conn, (process, _, started, _) in list(running.items()):
+                    if now - started >= timeout:
+                        process.kill()
+                        finish(conn, "timeout", {"error": f"Exceeded {timeout}s"})
+
+    return counts
+
+
+# ==================== Private: Worker ====================
+
+
+def _run_task(task, options, temp_dir, conn):
+    """Worker process entry point: edit, validate and save one document."""
+    # Keep every temporary file of this task (Document workspace, soffice
+    # profiles, ...) in the task's directory, which the parent removes
+    tempfile.tempdir = temp_dir
+    os.environ["TMPDIR"] = temp_dir
+
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            edit = _load_edit_function(task.script)
+            doc = Document(
+                task.docx,
+                author=options["author"],
+                initials=options["initials"],
+                engine=options["engine"],
+            )
+            result = edit(doc)
+            task.output.parent.mkdir(parents=True, exist_ok=True)
+            doc.save(task.output, validate=options["validate"])
+        record = {"status": "ok"}
+        if result is not None:
+            record["result"] = result
+    except Exception as e:
+        record = {
+            "status": "error",
+            "error": f"{type(e).__name__}: {e}",
+            "traceback": traceback.format_exc(),
+            "log": output.getvalue()[-LOG_TAIL:],
+        }
+
+    try:
+        conn.send(record)
+    except Exception:
+        # The result itself could not be pickled
+        record.pop("result", None)
+        conn.send(record)
+    conn.close()
+
+
+def _load_edit_function(script_path):
+    """Import an edit script and return its edit(doc) function."""
+    spec = importlib.util.spec_from_file_location(
+        f"_batch_edit_{Path(script_path).stem}", script_path
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    edit = getattr(module, "edit", None)
+    if not callable(edit):
+        raise ValueError(f"{script_path} does not define edit(doc)")
+    return edit
+
+
+if __name__ == "__main__":
+    main()
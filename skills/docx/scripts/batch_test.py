@@ -0,0 +1,145 @@
+import json
+import tempfile
+import unittest
+import zipfile
+from collections import Counter
+from pathlib import Path
+
+from .batch import BatchTask, load_manifest, run_batch
+from .testing import write_docx
+
+BODY = """    <w:p w14:paraId="00000001">
+      <w:r><w:t>The Seller delivers.</w:t></w:r>
+    </w:p>
+"""
+
+SCRIPTS = {
+    "rename.py": (
+        "def edit(doc):\n"
+        '    return doc["word/document.xml"].replace_text("Seller", "Vendor")\n'
+    ),
+    "error.py": "def edit(doc):\n    raise ValueError('no such party')\n",
+    "hang.py": "import time\n\ndef edit(doc):\n    time.sleep(60)\n",
+    "crash.py": "import os\n\ndef edit(doc):\n    os._exit(3)\n",
+}
+
+
+class BatchTestCase(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name)
+        for name, content in SCRIPTS.items():
+            (self.root / name).write_text(content)
+        self.log = self.root / "results.jsonl"
+
+    def docx(self, name):
+        path = self.root / name
+        write_docx(path, BODY)
+        return path
+
+    def run_scripts(self, *scripts, **kwargs):
+        """Run one task per script and return the log entries by script name."""
+        out = self.root / "out"
+        tasks = [
+            BatchTask(self.docx(f"{i}.docx"), self.root / name, out / f"{i}.docx")
+            for i, name in enumerate(scripts)
+        ]
+        counts = run_batch(tasks, self.log, validate=False, **kwargs)
+        entries = [json.loads(line) for line in self.log.read_text().splitlines()]
+        self.assertEqual(len(entries), len(tasks))
+        self.assertEqual(counts, Counter(e["status"] for e in entries))
+        return {Path(e["script"]).name: e for e in entries}
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestRunBatch(BatchTestCase):
+    def test_statuses(self):
+        """Each task is logged with its own outcome"""
+        entries = self.run_scripts("rename.py", "error.py", "crash.py", jobs=2)
+
+        ok = entries["rename.py"]
+        self.assertEqual(ok["status"], "ok")
+        self.assertEqual(ok["result"], 1)
+        with zipfile.ZipFile(ok["output"]) as zf:
+            self.assertIn("Vendor", zf.read("word/document.xml").decode())
+
+        error = entries["error.py"]
+        self.assertEqual(error["status"], "error")
+        self.assertEqual(error["error"], "ValueError: no such party")
+        self.assertIn("traceback", error)
+        self.assertFalse(Path(error["output"]).exists())
+
+        crashed = entries["crash.py"]
+        self.assertEqual(crashed["status"], "crashed")
+        self.assertEqual(crashed["error"], "Worker exited with code 3")
+
+    def test_timeout(self):
+        """A task exceeding the timeout is killed without affecting the others"""
+        entries = self.run_scripts("hang.py", "rename.py", jobs=2, timeout=5)
+        self.assertEqual(entries["hang.py"]["status"], "timeout")
+        self.assertLess(entries["hang.py"]["seconds"], 30)
+        self.assertFalse(Path(entries["hang.py"]["output"]).exists())
+        self.assertEqual(entries["rename.py"]["status"], "ok")
+
+    def test_jobs_must_be_positive(self):
+        """jobs below 1 is rejected like in pack and unpack"""
+        with self.assertRaisesRegex(ValueError, "jobs must be at least 1"):
+            run_batch([], self.log, jobs=0)
+
+
+class TestLoadManifest(BatchTestCase):
+    def setUp(self):
+        super().setUp()
+        self.docx("a.docx")
+        self.docx("b.docx")
+        self.manifest = self.root / "manifest.jsonl"
+
+    def load(self, *entries, output_dir=None):
+        lines = [e if isinstance(e, str) else json.dumps(e) for e in entries]
+        self.manifest.write_text("\n".join(lines) + "\n")
+        return load_manifest(self.manifest, output_dir)
+
+    def test_paths_are_relative_to_the_manifest(self):
+        """Paths resolve against the manifest; blank lines are skipped"""
+        tasks = self.load(
+            {"docx": "a.docx", "script": "rename.py", "output": "out/a.docx"},
+            "",
+            {"docx": "b.docx", "script": "rename.py"},
+            output_dir=self.root / "default",
+        )
+        script = self.root / "rename.py"
+        self.assertEqual(
+            tasks,
+            [
+                BatchTask(self.root / "a.docx", script, self.root / "out/a.docx"),
+                BatchTask(self.root / "b.docx", script, self.root / "default/b.docx"),
+            ],
+        )
+
+    def test_invalid_entries(self):
+        """Malformed entries are reported with their line number"""
+        cases = [
+            (":1: expected an object", ["{docx"]),
+            (':1: expected an object with "docx" and "script"', [{"docx": "a.docx"}]),
+            (":1: no output path", [{"docx": "a.docx", "script": "rename.py"}]),
+            (
+                ":1: .*missing.docx not found",
+                [{"docx": "missing.docx", "script": "rename.py", "output": "o.docx"}],
+            ),
+            (
+                ":2: .*o.docx is written by another entry",
+                [
+                    {"docx": "a.docx", "script": "rename.py", "output": "o.docx"},
+                    {"docx": "b.docx", "script": "rename.py", "output": "o.docx"},
+                ],
+            ),
+        ]
+        for message, entries in cases:
+            with self.subTest(message):
+                with self.assertRaisesRegex(ValueError, message):
+                    self.load(*entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -21,24 +21,33 @@ Usage:
     doc["word/document.xml"].suggest_deletion(node)  # Delete content
     doc["word/document.xml"].revert_insertion(ins_node)  # Reject insertion
     doc["word/document.xml"].revert_deletion(del_node)  # Reject deletion
+    doc["word/document.xml"].revert_changes(author="Jane")  # Reject all of an author's changes
+    doc["word/document.xml"].replace_text("Seller", "Vendor")  # Find/replace across runs
 
     # Save
     doc.save()
 """
 
 import html
+import os
 import random
+import re
 import shutil
 import tempfile
+import zipfile
+from copy import deepcopy
 from datetime import datetime, timezone
 from pathlib import Path
 
+import lxml.etree
 from defusedxml import minidom
-from ooxml.scripts.pack import pack_document
+from ooxml.scripts.pack import copy_raw_member, pack_document
 from ooxml.scripts.validation.docx import DOCXSchemaValidator
 from ooxml.scripts.validation.redlining import RedliningValidator
 
-from .utilities import XMLEditor
+from .paragraph_index import ParagraphIndex
+from .paragraph_text import replace_text as _replace_text
+from .utilities import LxmlXMLEditor, XMLEditor
 
 # Path to template files
 TEMPLATE_DIR = Path(__file__).parent / "templates"
@@ -57,7 +66,12 @@ class DocxXMLEditor(XMLEditor):
     """
 
     def __init__(
-        self, xml_path, rsid: str, author: str = "Claude", initials: str = "C"
+        self,
+        xml_path,
+        rsid: str,
+        author: str = "Claude",
+        initials: str = "C",
+        ids=None,
     ):
         """Initialize with required RSID and optional author.
 
@@ -66,52 +80,85 @@ class DocxXMLEditor(XMLEditor):
             rsid: RSID to automatically apply to new elements
             author: Author name for tracked changes and comments (default: "Claude")
             initials: Author initials (default: "C")
+            ids: IdAllocator for new paraIds, shared by the editors of a Document
+                (default: one that avoids the IDs in this file)
         """
         super().__init__(xml_path)
         self.rsid = rsid
         self.author = author
         self.initials = initials
+        self.ids = ids or IdAllocator(sources=lambda: [self.xml_path.read_bytes()])
+        self._next_change_id = None
+        self._declared_namespaces = set()
+        self._paragraph_index = None
+
+    @property
+    def paragraph_index(self):
+        """ParagraphIndex of this part: paragraphs by w14:paraId, with text and flags.
+
+        Built on first use and kept up to date by every change made through the
+        editor, so paragraphs can be addressed by paraId during long edit sessions
+        instead of by line numbers that shift.
+
+        Example:
+            index = doc["word/document.xml"].paragraph_index
+            para = index.element("3A2F19C4")
+            para_ids = index.find(contains="Governing Law")
+        """
+        if self._paragraph_index is None:
+            self._paragraph_index = ParagraphIndex(self)
+            self._index.observers.append(self._paragraph_index)
+        return self._paragraph_index
 
     def _get_next_change_id(self):
-        """Get the next available change ID by checking all tracked change elements."""
-        max_id = -1
-        for tag in ("w:ins", "w:del"):
-            elements = self.dom.getElementsByTagName(tag)
-            for elem in elements:
-                change_id = elem.getAttribute("w:id")
-                if change_id:
-                    try:
-                        max_id = max(max_id, int(change_id))
-                    except ValueError:
-                        pass
-        return max_id + 1
+        """Allocate the next available tracked change ID.
+
+        All w:ins/w:del IDs are scanned once; after that a counter is kept, and it
+        is bumped past any ID found on inserted content.
+        """
+        if self._next_change_id is None:
+            max_id = -1
+            for tag in ("w:ins", "w:del"):
+                for elem in self._dom.getElementsByTagName(tag):
+                    max_id = max(max_id, _parse_change_id(elem.getAttribute("w:id")))
+            self._next_change_id = max_id + 1
+        change_id = self._next_change_id
+        self._next_change_id += 1
+        return change_id
+
+    def _reserve_change_id(self, change_id):
+        """Make sure IDs allocated later are above an existing change ID."""
+        if self._next_change_id is not None:
+            self._next_change_id = max(
+                self._next_change_id, _parse_change_id(change_id) + 1
+            )
+
+    def _ensure_namespace(self, prefix, uri):
+        """Ensure a namespace prefix is declared on the root element."""
+        if prefix in self._declared_namespaces:
+            return
+        root = self._dom.documentElement
+        if not root.hasAttribute(f"xmlns:{prefix}"):  # type: ignore
+            root.setAttribute(f"xmlns:{prefix}", uri)  # type: ignore
+        self._declared_namespaces.add(prefix)
 
     def _ensure_w16du_namespace(self):
         """Ensure w16du namespace is declared on the root element."""
-        root = self.dom.documentElement
-        if not root.hasAttribute("xmlns:w16du"):  # type: ignore
-            root.setAttribute(  # type: ignore
-                "xmlns:w16du",
-                "http://schemas.microsoft.com/office/word/2023/wordml/word16du",
-            )
+        self._ensure_namespace(
+            "w16du", "http://schemas.microsoft.com/office/word/2023/wordml/word16du"
+        )
 
     def _ensure_w16cex_namespace(self):
         """Ensure w16cex namespace is declared on the root element."""
-        root = self.dom.documentElement
-        if not root.hasAttribute("xmlns:w16cex"):  # type: ignore
-            root.setAttribute(  # type: ignore
-                "xmlns:w16cex",
-                "http://schemas.microsoft.com/office/word/2018/wordml/cex",
-            )
+        self._ensure_namespace(
+            "w16cex", "http://schemas.microsoft.com/office/word/2018/wordml/cex"
+        )
 
     def _ensure_w14_namespace(self):
         """Ensure w14 namespace is declared on the root element."""
-        root = self.dom.documentElement
-        if not root.hasAttribute("xmlns:w14"):  # type: ignore
-            root.setAttribute(  # type: ignore
-                "xmlns:w14",
-                "http://schemas.microsoft.com/office/word/2010/wordml",
-            )
+        self._ensure_namespace(
+            "w14", "http://schemas.microsoft.com/office/word/2010/wordml"
+        )
 
     def _inject_attributes_to_nodes(self, nodes):
         """Inject RSID, author, and date attributes into DOM nodes where applicable.
@@ -124,11 +171,12 @@ class DocxXMLEditor(XMLEditor):
         - w:comment: gets w:author, w:date, w:initials
         - w16cex:commentExtensible: gets w16cex:dateUtc
 
+        Each node is visited in a single pass that carries whether the current
+        element is inside a w:del down the tree.
+
         Args:
             nodes: List of DOM nodes to process
         """
-        from datetime import datetime, timezone
-
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
         def is_inside_deletion(elem):
@@ -150,14 +198,16 @@ class DocxXMLEditor(XMLEditor):
             # Add w14:paraId and w14:textId if not present
             if not elem.hasAttribute("w14:paraId"):
                 self._ensure_w14_namespace()
-                elem.setAttribute("w14:paraId", _generate_hex_id())
+                elem.setAttribute("w14:paraId", self.ids.new_id())
+            else:
+                self.ids.reserve(elem.getAttribute("w14:paraId"))
             if not elem.hasAttribute("w14:textId"):
                 self._ensure_w14_namespace()
-                elem.setAttribute("w14:textId", _generate_hex_id())
+                elem.setAttribute("w14:textId", self.ids.new_id())
 
-        def add_rsid_to_r(elem):
+        def add_rsid_to_r(elem, inside_deletion):
             # Use w:rsidDel for <w:r> inside <w:del>, otherwise w:rsidR
-            if is_inside_deletion(elem):
+            if inside_deletion:
                 if not elem.hasAttribute("w:rsidDel"):
                     elem.setAttribute("w:rsidDel", self.rsid)
             else:
@@ -168,14 +218,14 @@ class DocxXMLEditor(XMLEditor):
             # Auto-assign w:id if not present
             if not elem.hasAttribute("w:id"):
                 elem.setAttribute("w:id", str(self._get_next_change_id()))
+            else:
+                self._reserve_change_id(elem.getAttribute("w:id"))
             if not elem.hasAttribute("w:author"):
                 elem.setAttribute("w:author", self.author)
             if not elem.hasAttribute("w:date"):
                 elem.setAttribute("w:date", timestamp)
             # Add w16du:dateUtc for tracked changes (same as w:date since we generate UTC timestamps)
-            if elem.tagName in ("w:ins", "w:del") and not elem.hasAttribute(
-                "w16du:dateUtc"
-            ):
+            if not elem.hasAttribute("w16du:dateUtc"):
                 self._ensure_w16du_namespace()
                 elem.setAttribute("w16du:dateUtc", timestamp)
 
@@ -208,34 +258,30 @@ class DocxXMLEditor(XMLEditor):
             if node.nodeType != node.ELEMENT_NODE:
                 continue
 
-            # Handle the node itself
-            if node.tagName == "w:p":
-                add_rsid_to_p(node)
-            elif node.tagName == "w:r":
-                add_rsid_to_r(node)
-            elif node.tagName == "w:t":
-                add_xml_space_to_t(node)
-            elif node.tagName in ("w:ins", "w:del"):
-                add_tracked_change_attrs(node)
-            elif node.tagName == "w:comment":
-                add_comment_attrs(node)
-            elif node.tagName == "w16cex:commentExtensible":
-                add_comment_extensible_date(node)
-
-            # Process descendants (getElementsByTagName doesn't return the element itself)
-            for elem in node.getElementsByTagName("w:p"):
-                add_rsid_to_p(elem)
-            for elem in node.getElementsByTagName("w:r"):
-                add_rsid_to_r(elem)
-            for elem in node.getElementsByTagName("w:t"):
-                add_xml_space_to_t(elem)
-            for tag in ("w:ins", "w:del"):
-                for elem in node.getElementsByTagName(tag):
+            # Depth-first walk of the node and its descendants in document order
+            stack = [(node, is_inside_deletion(node))]
+            while stack:
+                elem, inside_deletion = stack.pop()
+                tag = elem.tagName
+                if tag == "w:p":
+                    add_rsid_to_p(elem)
+                elif tag == "w:r":
+                    add_rsid_to_r(elem, inside_deletion)
+                elif tag == "w:t":
+                    add_xml_space_to_t(elem)
+                elif tag in ("w:ins", "w:del"):
                     add_tracked_change_attrs(elem)
-            for elem in node.getElementsByTagName("w:comment"):
-                add_comment_attrs(elem)
-            for elem in node.getElementsByTagName("w16cex:commentExtensible"):
-                add_comment_extensible_date(elem)
+                elif tag == "w:comment":
+                    add_comment_attrs(elem)
+                elif tag == "w16cex:commentExtensible":
+                    add_comment_extensible_date(elem)
+
+                inside_deletion = inside_deletion or tag == "w:del"
+                stack.extend(
+                    (child, inside_deletion)
+                    for child in reversed(elem.childNodes)
+                    if child.nodeType == child.ELEMENT_NODE
+                )
 
     def replace_node(self, elem, new_content):
         """Replace node with automatic attribute injection."""
@@ -299,44 +345,7 @@ class DocxXMLEditor(XMLEditor):
                 f"The provided element <{elem.tagName}> contains no insertions. "
             )
 
-        # Process all insertions - wrap all children in w:del
-        for ins_elem in ins_elements:
-            runs = list(ins_elem.getElementsByTagName("w:r"))
-            if not runs:
-                continue
-
-            # Create deletion wrapper
-            del_wrapper = self.dom.createElement("w:del")
-
-            # Process each run
-            for run in runs:
-                # Convert w:t → w:delText and w:rsidR → w:rsidDel
-                if run.hasAttribute("w:rsidR"):
-                    run.setAttribute("w:rsidDel", run.getAttribute("w:rsidR"))
-                    run.removeAttribute("w:rsidR")
-                elif not run.hasAttribute("w:rsidDel"):
-                    run.setAttribute("w:rsidDel", self.rsid)
-
-                for t_elem in list(run.getElementsByTagName("w:t")):
-                    del_text = self.dom.createElement("w:delText")
-                    # Copy ALL child nodes (not just firstChild) to handle entities
-                    while t_elem.firstChild:
-                        del_text.appendChild(t_elem.firstChild)
-                    for i in range(t_elem.attributes.length):
-                        attr = t_elem.attributes.item(i)
-                        del_text.setAttribute(attr.name, attr.value)
-                    t_elem.parentNode.replaceChild(del_text, t_elem)
-
-            # Move all children from ins to del wrapper
-            while ins_elem.firstChild:
-                del_wrapper.appendChild(ins_elem.firstChild)
-
-            # Add del wrapper back to ins
-            ins_elem.appendChild(del_wrapper)
-
-            # Inject attributes to the deletion wrapper
-            self._inject_attributes_to_nodes([del_wrapper])
-
+        self._revert_insertions(ins_elements)
         return [elem]
 
     def revert_deletion(self, elem):
@@ -380,33 +389,108 @@ class DocxXMLEditor(XMLEditor):
                 f"The provided element <{elem.tagName}> contains no deletions. "
             )
 
-        # Track created insertion (only relevant if elem is a single w:del)
-        created_insertion = None
+        created = self._revert_deletions(del_elements)
 
-        # Process all deletions - create insertions that copy the deleted content
-        for del_elem in del_elements:
-            # Clone the deleted runs and convert them to insertions
-            runs = list(del_elem.getElementsByTagName("w:r"))
+        # Return based on input type
+        if is_single_del and created:
+            return [elem, created[0]]
+        else:
+            return [elem]
+
+    def revert_changes(self, author=None, elem=None):
+        """Reject all tracked insertions and deletions, or only those by one author.
+
+        Insertions are rejected as by revert_insertion and deletions as by
+        revert_deletion, in a single pass over the document. Changes nested inside
+        another rejected change are covered by the outer one and left as they are.
+
+        Args:
+            author: Only reject changes with this w:author (default: all authors)
+            elem: Only reject changes in this element (default: whole document)
+
+        Returns:
+            int: Number of w:ins and w:del elements rejected
+
+        Example:
+            # Reject everything one reviewer changed
+            count = doc["word/document.xml"].revert_changes(author="John Doe")
+        """
+        insertions, deletions = self._find_changes(
+            self.get_root() if elem is None else elem, author
+        )
+        self._revert_deletions(deletions)
+        self._revert_insertions(insertions)
+        return len(insertions) + len(deletions)
+
+    def _find_changes(self, elem, author):
+        """Return the outermost w:ins and w:del elements in elem, by author if given."""
+        insertions, deletions = [], []
+        stack = [elem]
+        while stack:
+            node = stack.pop()
+            tag = node.tagName
+            if tag in ("w:ins", "w:del") and (
+                author is None or node.getAttribute("w:author") == author
+            ):
+                (insertions if tag == "w:ins" else deletions).append(node)
+                continue
+            stack.extend(
+                child
+                for child in reversed(node.childNodes)
+                if child.nodeType == child.ELEMENT_NODE
+            )
+        return insertions, deletions
+
+    def _revert_insertions(self, ins_elements):
+        """Wrap the content of each w:ins in a new w:del (see revert_insertion).
+
+        Nodes are changed in place rather than rebuilt from XML fragments, and the
+        node index is updated once per insertion.
+        """
+        self.dirty = True
+        wrappers = []
+        for ins_elem in ins_elements:
+            runs = ins_elem.getElementsByTagName("w:r")
             if not runs:
                 continue
 
-            # Create insertion wrapper
-            ins_elem = self.dom.createElement("w:ins")
+            # Unindex the content under its old tags; it is re-indexed in the wrapper
+            for child in list(ins_elem.childNodes):
+                self._index.removed(child, ins_elem)
+            for run in runs:
+                self._mark_run_deleted(run)
+
+            # Move all children from ins to a new del wrapper inside it
+            del_wrapper = self._dom.createElement("w:del")
+            while ins_elem.firstChild:
+                del_wrapper.appendChild(ins_elem.firstChild)
+            ins_elem.appendChild(del_wrapper)
+            self._index.added([del_wrapper])
+            wrappers.append(del_wrapper)
+
+        self._inject_attributes_to_nodes(wrappers)
+
+    def _revert_deletions(self, del_elements):
+        """Add a w:ins re-inserting the runs of each w:del after it (see revert_deletion).
+
+        Returns:
+            list: The new w:ins elements
+        """
+        self.dirty = True
+        created = []
+        for del_elem in del_elements:
+            runs = del_elem.getElementsByTagName("w:r")
+            if not runs:
+                continue
 
+            ins_elem = self._dom.createElement("w:ins")
             for run in runs:
-                # Clone the run
+                # Cloned nodes have no line number, like parsed fragments
                 new_run = run.cloneNode(True)
 
                 # Convert w:delText → w:t
-                for del_text in list(new_run.getElementsByTagName("w:delText")):
-                    t_elem = self.dom.createElement("w:t")
-                    # Copy ALL child nodes (not just firstChild) to handle entities
-                    while del_text.firstChild:
-                        t_elem.appendChild(del_text.firstChild)
-                    for i in range(del_text.attributes.length):
-                        attr = del_text.attributes.item(i)
-                        t_elem.setAttribute(attr.name, attr.value)
-                    del_text.parentNode.replaceChild(t_elem, del_text)
+                for del_text in new_run.getElementsByTagName("w:delText"):
+                    self._dom.renameNode(del_text, del_text.namespaceURI, "w:t")
 
                 # Update run attributes: w:rsidDel → w:rsidR
                 if new_run.hasAttribute("w:rsidDel"):
@@ -418,17 +502,26 @@ class DocxXMLEditor(XMLEditor):
                 ins_elem.appendChild(new_run)
 
             # Insert the new insertion after the deletion
-            nodes = self.insert_after(del_elem, ins_elem.toxml())
+            del_elem.parentNode.insertBefore(ins_elem, del_elem.nextSibling)
+            created.append(ins_elem)
 
-            # If processing a single w:del, track the created insertion
-            if is_single_del and nodes:
-                created_insertion = nodes[0]
+        self._index.added(created)
+        self._inject_attributes_to_nodes(created)
+        return created
 
-        # Return based on input type
-        if is_single_del and created_insertion:
-            return [elem, created_insertion]
-        else:
-            return [elem]
+    def _mark_run_deleted(self, run):
+        """Convert w:t → w:delText and w:rsidR → w:rsidDel on a run in place.
+
+        The caller updates the node index.
+        """
+        for t_elem in run.getElementsByTagName("w:t"):
+            self._dom.renameNode(t_elem, t_elem.namespaceURI, "w:delText")
+
+        if run.hasAttribute("w:rsidR"):
+            run.setAttribute("w:rsidDel", run.getAttribute("w:rsidR"))
+            run.removeAttribute("w:rsidR")
+        elif not run.hasAttribute("w:rsidDel"):
+            run.setAttribute("w:rsidDel", self.rsid)
 
     @staticmethod
     def suggest_paragraph(xml_content: str) -> str:
@@ -502,7 +595,7 @@ class DocxXMLEditor(XMLEditor):
 
             # Convert w:t → w:delText
             for t_elem in list(elem.getElementsByTagName("w:t")):
-                del_text = self.dom.createElement("w:delText")
+                del_text = self._dom.createElement("w:delText")
                 # Copy ALL child nodes (not just firstChild) to handle entities
                 while t_elem.firstChild:
                     del_text.appendChild(t_elem.firstChild)
@@ -510,7 +603,9 @@ class DocxXMLEditor(XMLEditor):
                 for i in range(t_elem.attributes.length):
                     attr = t_elem.attributes.item(i)
                     del_text.setAttribute(attr.name, attr.value)
-                t_elem.parentNode.replaceChild(del_text, t_elem)
+                parent = t_elem.parentNode
+                parent.replaceChild(del_text, t_elem)
+                self._index.removed(t_elem, parent)
 
             # Update run attributes: w:rsidR → w:rsidDel
             if elem.hasAttribute("w:rsidR"):
@@ -520,11 +615,12 @@ class DocxXMLEditor(XMLEditor):
                 elem.setAttribute("w:rsidDel", self.rsid)
 
             # Wrap in w:del
-            del_wrapper = self.dom.createElement("w:del")
+            del_wrapper = self._dom.createElement("w:del")
             parent = elem.parentNode
             parent.insertBefore(del_wrapper, elem)
             parent.removeChild(elem)
             del_wrapper.appendChild(elem)
+            self._index.added([del_wrapper])
 
             # Inject attributes to the deletion wrapper
             self._inject_attributes_to_nodes([del_wrapper])
@@ -533,56 +629,607 @@ class DocxXMLEditor(XMLEditor):
 
         elif elem.nodeName == "w:p":
             # Check for existing tracked changes
-            if elem.getElementsByTagName("w:ins") or elem.getElementsByTagName("w:del"):
+            if elem.getElementsByTagName("w:ins") or elem.getElementsByTagName("w:del"):
+                raise ValueError("w:p element already contains tracked changes")
+
+            # Check if it's a numbered list item
+            pPr_list = elem.getElementsByTagName("w:pPr")
+            is_numbered = pPr_list and pPr_list[0].getElementsByTagName("w:numPr")
+
+            if is_numbered:
+                # Add <w:del/> to w:rPr in w:pPr
+                pPr = pPr_list[0]
+                rPr_list = pPr.getElementsByTagName("w:rPr")
+
+                if not rPr_list:
+                    rPr = self._dom.createElement("w:rPr")
+                    pPr.appendChild(rPr)
+                else:
+                    rPr = rPr_list[0]
+
+                # Add <w:del/> marker
+                del_marker = self._dom.createElement("w:del")
+                rPr.insertBefore(
+                    del_marker, rPr.firstChild
+                ) if rPr.firstChild else rPr.appendChild(del_marker)
+                self._index.added([rPr])
+
+            # Convert w:t → w:delText in all runs
+            for t_elem in list(elem.getElementsByTagName("w:t")):
+                del_text = self._dom.createElement("w:delText")
+                # Copy ALL child nodes (not just firstChild) to handle entities
+                while t_elem.firstChild:
+                    del_text.appendChild(t_elem.firstChild)
+                # Preserve attributes like xml:space
+                for i in range(t_elem.attributes.length):
+                    attr = t_elem.attributes.item(i)
+                    del_text.setAttribute(attr.name, attr.value)
+                parent = t_elem.parentNode
+                parent.replaceChild(del_text, t_elem)
+                self._index.removed(t_elem, parent)
+
+            # Update run attributes: w:rsidR → w:rsidDel
+            for run in elem.getElementsByTagName("w:r"):
+                if run.hasAttribute("w:rsidR"):
+                    run.setAttribute("w:rsidDel", run.getAttribute("w:rsidR"))
+                    run.removeAttribute("w:rsidR")
+                elif not run.hasAttribute("w:rsidDel"):
+                    run.setAttribute("w:rsidDel", self.rsid)
+
+            # Wrap all non-pPr children in <w:del>
+            del_wrapper = self._dom.createElement("w:del")
+            for child in [c for c in elem.childNodes if c.nodeName != "w:pPr"]:
+                elem.removeChild(child)
+                del_wrapper.appendChild(child)
+            elem.appendChild(del_wrapper)
+            self._index.added([del_wrapper])
+
+            # Inject attributes to the deletion wrapper
+            self._inject_attributes_to_nodes([del_wrapper])
+
+            return elem
+
+        else:
+            raise ValueError(f"Element must be w:r or w:p, got {elem.nodeName}")
+
+    def replace_text(
+        self, pattern, replacement=None, regex=False, ignore_case=False, elem=None
+    ):
+        """Find and replace text across runs as tracked changes.
+
+        Matches paragraph text regardless of how it is split into runs. Only the
+        words that differ are marked: replacing "Section 5" with "Section 6"
+        deletes "5" and inserts "6", keeping the surrounding formatting. All matches
+        are collected first and each affected run is split once, so thousands of
+        replacements are applied in a single pass. Matches that touch existing
+        tracked changes are left unchanged.
+
+        Args:
+            pattern: Text to find, a regex with regex=True, or a dict mapping texts to
+                     their replacements (all applied in one pass)
+            replacement: Replacement text (may use \\1 with regex=True), or a callable
+                         taking the re.Match. Not used when pattern is a dict.
+            regex: Treat pattern as a regular expression (default: False)
+            ignore_case: Match case-insensitively (default: False)
+            elem: Only replace within this element, e.g. a w:p (default: whole part)
+
+        Returns:
+            int: Number of replacements made
+
+        Example:
+            editor = doc["word/document.xml"]
+            editor.replace_text("Seller", "Vendor")
+            editor.replace_text(r"(\\d+) days", r"\\1 business days", regex=True)
+            editor.replace_text({"Seller": "Vendor", "Buyer": "Purchaser"})
+        """
+        return _replace_text(self, pattern, replacement, regex, ignore_case, elem)
+
+    def _split_run(self, run, pieces):
+        """Replace a run with new runs holding the pieces planned by replace_text.
+
+        Kept pieces become plain runs, deleted ones runs in <w:del> with w:delText,
+        and inserted ones runs in <w:ins>. Each new run copies the properties of its
+        source run.
+        """
+        self.dirty = True
+        nodes = []
+        for status, items, source in pieces:
+            new_run = self._dom.createElement("w:r")
+            for name, value in source.attributes.items():
+                if status == "insert" and name.startswith("w:rsid"):
+                    continue
+                if status == "delete" and name == "w:rsidR":
+                    name = "w:rsidDel"
+                new_run.setAttribute(name, value)
+            rPr = next(
+                (c for c in self.get_children(source) if c.tagName == "w:rPr"), None
+            )
+            if rPr is not None:
+                new_run.appendChild(rPr.cloneNode(True))
+
+            for kind, value in items:
+                if kind == "node":
+                    new_run.appendChild(value)
+                    continue
+                text_elem = self._dom.createElement(
+                    "w:delText" if status == "delete" else "w:t"
+                )
+                if value[0].isspace() or value[-1].isspace():
+                    text_elem.setAttribute("xml:space", "preserve")
+                text_elem.appendChild(self._dom.createTextNode(value))
+                new_run.appendChild(text_elem)
+
+            if status == "keep":
+                nodes.append(new_run)
+            else:
+                wrapper = self._dom.createElement(
+                    "w:del" if status == "delete" else "w:ins"
+                )
+                wrapper.appendChild(new_run)
+                nodes.append(wrapper)
+
+        parent = run.parentNode
+        for node in nodes:
+            parent.insertBefore(node, run)
+        parent.removeChild(run)
+        self._index.removed(run, parent)
+        self._index.added(nodes)
+        self._inject_attributes_to_nodes([n for n in nodes if n.tagName != "w:r"])
+        return nodes
+
+
+class LxmlDocxXMLEditor(LxmlXMLEditor):
+    """LxmlXMLEditor that automatically applies RSID, author, and date to new elements.
+
+    lxml-backed counterpart of DocxXMLEditor with the same attribute injection and
+    tracked change helpers. Used by Document(engine="lxml").
+
+    Attributes:
+        tree (lxml.etree._ElementTree): The parsed tree for direct manipulation
+    """
+
+    def __init__(
+        self,
+        xml_path,
+        rsid: str,
+        author: str = "Claude",
+        initials: str = "C",
+        ids=None,
+    ):
+        """Initialize with required RSID and optional author.
+
+        Args:
+            xml_path: Path to XML file to edit
+            rsid: RSID to automatically apply to new elements
+            author: Author name for tracked changes and comments (default: "Claude")
+            initials: Author initials (default: "C")
+            ids: IdAllocator for new paraIds, shared by the editors of a Document
+                (default: one that avoids the IDs in this file)
+        """
+        super().__init__(xml_path)
+        self.rsid = rsid
+        self.author = author
+        self.initials = initials
+        self.ids = ids or IdAllocator(sources=lambda: [self.xml_path.read_bytes()])
+        self._next_change_id = None
+        self._declared_namespaces = set()
+        self._paragraph_index = None
+
+    suggest_paragraph = staticmethod(DocxXMLEditor.suggest_paragraph)
+    paragraph_index = DocxXMLEditor.paragraph_index
+
+    def _get_next_change_id(self):
+        """Allocate the next available tracked change ID (see DocxXMLEditor)."""
+        if self._next_change_id is None:
+            change_id_attr = self._qname("w:id", attribute=True)
+            max_id = max(
+                (
+                    _parse_change_id(elem.get(change_id_attr))
+                    for elem in self.get_root().iter(
+                        self._qname("w:ins"), self._qname("w:del")
+                    )
+                ),
+                default=-1,
+            )
+            self._next_change_id = max_id + 1
+        change_id = self._next_change_id
+        self._next_change_id += 1
+        return change_id
+
+    _reserve_change_id = DocxXMLEditor._reserve_change_id
+
+    def _ensure_namespace(self, prefix, uri):
+        """Ensure a namespace prefix is declared on the root element."""
+        if prefix in self._declared_namespaces:
+            return
+        self._declared_namespaces.add(prefix)
+        self._namespaces[prefix] = uri
+        root = self.get_root()
+        if root.nsmap.get(prefix) == uri:
+            return
+        # lxml cannot add a declaration directly: use the namespace below the root,
+        # then let cleanup_namespaces() hoist it to the root under the wanted prefix
+        holder = next(root.iterchildren(lxml.etree.Element), root)
+        placeholder = f"{{{uri}}}placeholder"
+        holder.set(placeholder, "")
+        used_prefixes = {
+            p for elem in root.iter(lxml.etree.Element) for p in elem.nsmap if p
+        }
+        lxml.etree.cleanup_namespaces(
+            root, top_nsmap={prefix: uri}, keep_ns_prefixes=sorted(used_prefixes)
+        )
+        del holder.attrib[placeholder]
+        self._ns_decl_cache = None
+
+    def _ensure_w16du_namespace(self):
+        """Ensure w16du namespace is declared on the root element."""
+        self._ensure_namespace(
+            "w16du", "http://schemas.microsoft.com/office/word/2023/wordml/word16du"
+        )
+
+    def _ensure_w16cex_namespace(self):
+        """Ensure w16cex namespace is declared on the root element."""
+        self._ensure_namespace(
+            "w16cex", "http://schemas.microsoft.com/office/word/2018/wordml/cex"
+        )
+
+    def _ensure_w14_namespace(self):
+        """Ensure w14 namespace is declared on the root element."""
+        self._ensure_namespace(
+            "w14", "http://schemas.microsoft.com/office/word/2010/wordml"
+        )
+
+    def _set_default(self, elem, name, value, ensure_namespace=None):
+        """Set an attribute by prefixed name unless it is already present.
+
+        Args:
+            elem: lxml element to update
+            name: Prefixed attribute name (e.g., "w:rsidR")
+            value: Attribute value, or a callable producing it
+            ensure_namespace: Optional method declaring the attribute's namespace
+
+        Returns:
+            str: The attribute value now on the element
+        """
+        if ensure_namespace is not None:
+            ensure_namespace()
+        qname = self._qname(name, attribute=True)
+        current = elem.get(qname)
+        if current is None:
+            current = value() if callable(value) else value
+            elem.set(qname, current)
+        return current
+
+    def _inject_attributes_to_nodes(self, nodes):
+        """Inject RSID, author, and date attributes into elements where applicable.
+
+        Adds the same attributes as DocxXMLEditor._inject_attributes_to_nodes, in a
+        single pass per node that tracks whether the current element is in a w:del.
+
+        Args:
+            nodes: List of lxml elements to process
+        """
+        if "w" not in self.get_root().nsmap:
+            # Parts without WordprocessingML content (rels, content types)
+            return
+
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        q = self._qname
+        w_p, w_r, w_t = q("w:p"), q("w:r"), q("w:t")
+        w_ins, w_del, w_comment = q("w:ins"), q("w:del"), q("w:comment")
+        w16cex_ns = self.get_root().nsmap.get("w16cex")
+        comment_extensible = f"{{{w16cex_ns}}}commentExtensible" if w16cex_ns else None
+
+        for node in nodes:
+            if not isinstance(node.tag, str):
+                continue
+
+            deletion_depth = sum(1 for parent in node.iterancestors(w_del))
+            for event, elem in lxml.etree.iterwalk(node, events=("start", "end")):
+                tag = elem.tag
+                if event == "end":
+                    if tag == w_del:
+                        deletion_depth -= 1
+                    continue
+
+                if tag == w_p:
+                    self._set_default(elem, "w:rsidR", self.rsid)
+                    self._set_default(elem, "w:rsidRDefault", self.rsid)
+                    self._set_default(elem, "w:rsidP", self.rsid)
+                    para_id = self._set_default(
+                        elem, "w14:paraId", self.ids.new_id, self._ensure_w14_namespace
+                    )
+                    self.ids.reserve(para_id)
+                    self._set_default(
+                        elem, "w14:textId", self.ids.new_id, self._ensure_w14_namespace
+                    )
+                elif tag == w_r:
+                    # Use w:rsidDel for <w:r> inside <w:del>, otherwise w:rsidR
+                    if deletion_depth:
+                        self._set_default(elem, "w:rsidDel", self.rsid)
+                    else:
+                        self._set_default(elem, "w:rsidR", self.rsid)
+                elif tag == w_t:
+                    # Add xml:space="preserve" if text has leading/trailing whitespace
+                    text = elem.text
+                    if text and (text[0].isspace() or text[-1].isspace()):
+                        self._set_default(elem, "xml:space", "preserve")
+                elif tag in (w_ins, w_del):
+                    # Auto-assign w:id if not present, else keep the counter above it
+                    change_id = self._set_default(
+                        elem, "w:id", lambda: str(self._get_next_change_id())
+                    )
+                    self._reserve_change_id(change_id)
+                    self._set_default(elem, "w:author", self.author)
+                    self._set_default(elem, "w:date", timestamp)
+                    self._set_default(
+                        elem, "w16du:dateUtc", timestamp, self._ensure_w16du_namespace
+                    )
+                elif tag == w_comment:
+                    self._set_default(elem, "w:author", self.author)
+                    self._set_default(elem, "w:date", timestamp)
+                    self._set_default(elem, "w:initials", self.initials)
+                elif tag == comment_extensible:
+                    self._set_default(
+                        elem,
+                        "w16cex:dateUtc",
+                        timestamp,
+                        self._ensure_w16cex_namespace,
+                    )
+
+                if tag == w_del:
+                    deletion_depth += 1
+
+    def replace_node(self, elem, new_content):
+        """Replace node with automatic attribute injection."""
+        nodes = super().replace_node(elem, new_content)
+        self._inject_attributes_to_nodes(nodes)
+        return nodes
+
+    def insert_after(self, elem, xml_content):
+        """Insert after with automatic attribute injection."""
+        nodes = super().insert_after(elem, xml_content)
+        self._inject_attributes_to_nodes(nodes)
+        return nodes
+
+    def insert_before(self, elem, xml_content):
+        """Insert before with automatic attribute injection."""
+        nodes = super().insert_before(elem, xml_content)
+        self._inject_attributes_to_nodes(nodes)
+        return nodes
+
+    def append_to(self, elem, xml_content):
+        """Append to with automatic attribute injection."""
+        nodes = super().append_to(elem, xml_content)
+        self._inject_attributes_to_nodes(nodes)
+        return nodes
+
+    def revert_insertion(self, elem):
+        """Reject an insertion by wrapping its content in a deletion.
+
+        Same behavior as DocxXMLEditor.revert_insertion.
+
+        Args:
+            elem: Element to process (w:ins, w:p, w:body, etc.)
+
+        Returns:
+            list: List containing the processed element(s)
+
+        Raises:
+            ValueError: If the element contains no w:ins elements
+        """
+        # Collect insertions
+        w_ins = self._qname("w:ins")
+        if elem.tag == w_ins:
+            ins_elements = [elem]
+        else:
+            ins_elements = list(elem.iterdescendants(w_ins))
+
+        # Validate that there are insertions to reject
+        if not ins_elements:
+            raise ValueError(
+                f"revert_insertion requires w:ins elements. "
+                f"The provided element <{self.get_tag(elem)}> contains no insertions. "
+            )
+
+        self._revert_insertions(ins_elements)
+        return [elem]
+
+    def revert_deletion(self, elem):
+        """Reject a deletion by re-inserting the deleted content.
+
+        Same behavior as DocxXMLEditor.revert_deletion.
+
+        Args:
+            elem: Element to process (w:del, w:p, w:body, etc.)
+
+        Returns:
+            list: If elem is w:del, returns [elem, new_ins]. Otherwise returns [elem].
+
+        Raises:
+            ValueError: If the element contains no w:del elements
+        """
+        # Collect deletions FIRST - before we modify the tree
+        w_del = self._qname("w:del")
+        is_single_del = elem.tag == w_del
+        if is_single_del:
+            del_elements = [elem]
+        else:
+            del_elements = list(elem.iterdescendants(w_del))
+
+        # Validate that there are deletions to reject
+        if not del_elements:
+            raise ValueError(
+                f"revert_deletion requires w:del elements. "
+                f"The provided element <{self.get_tag(elem)}> contains no deletions. "
+            )
+
+        created = self._revert_deletions(del_elements)
+
+        # Return based on input type
+        if is_single_del and created:
+            return [elem, created[0]]
+        else:
+            return [elem]
+
+    revert_changes = DocxXMLEditor.revert_changes
+
+    def _find_changes(self, elem, author):
+        """Return the outermost w:ins and w:del elements in elem, by author if given."""
+        w_ins, w_del = self._qname("w:ins"), self._qname("w:del")
+        author_attr = self._qname("w:author", attribute=True)
+        insertions, deletions = [], []
+        selected = set()
+        for change in elem.iter(w_ins, w_del):
+            if author is not None and change.get(author_attr) != author:
+                continue
+            if any(outer in selected for outer in change.iterancestors(w_ins, w_del)):
+                continue
+            selected.add(change)
+            (insertions if change.tag == w_ins else deletions).append(change)
+        return insertions, deletions
+
+    def _revert_insertions(self, ins_elements):
+        """Wrap the content of each w:ins in a new w:del (see revert_insertion)."""
+        self.dirty = True
+        w_r, w_del = self._qname("w:r"), self._qname("w:del")
+        wrappers = []
+        for ins_elem in ins_elements:
+            runs = list(ins_elem.iter(w_r))
+            if not runs:
+                continue
+
+            for run in runs:
+                self._mark_run_deleted(run)
+
+            # Move all children from ins to a new del wrapper inside it
+            del_wrapper = lxml.etree.SubElement(ins_elem, w_del)
+            del_wrapper.text, ins_elem.text = ins_elem.text, None
+            for child in list(ins_elem)[:-1]:
+                del_wrapper.append(child)
+            self._index.added([del_wrapper])
+            wrappers.append(del_wrapper)
+
+        self._inject_attributes_to_nodes(wrappers)
+
+    def _revert_deletions(self, del_elements):
+        """Add a w:ins re-inserting the runs of each w:del after it (see revert_deletion).
+
+        Returns:
+            list: The new w:ins elements
+        """
+        self.dirty = True
+        w_r, w_t, w_del_text, w_ins = (
+            self._qname("w:r"),
+            self._qname("w:t"),
+            self._qname("w:delText"),
+            self._qname("w:ins"),
+        )
+        rsid_r = self._qname("w:rsidR", attribute=True)
+        rsid_del = self._qname("w:rsidDel", attribute=True)
+        created = []
+        for del_elem in del_elements:
+            runs = list(del_elem.iter(w_r))
+            if not runs:
+                continue
+
+            # Insert the new insertion after the deletion
+            ins_elem = del_elem.makeelement(w_ins)
+            del_elem.addnext(ins_elem)
+
+            for run in runs:
+                # Clone the run; copies never match a line_number filter
+                new_run = deepcopy(run)
+                new_run.tail = None
+                for copied in new_run.iter():
+                    copied.sourceline = 0
+
+                # Convert w:delText → w:t
+                for del_text in list(new_run.iter(w_del_text)):
+                    del_text.tag = w_t
+
+                # Update run attributes: w:rsidDel → w:rsidR
+                if rsid_del in new_run.attrib:
+                    new_run.set(rsid_r, new_run.attrib.pop(rsid_del))
+                elif rsid_r not in new_run.attrib:
+                    new_run.set(rsid_r, self.rsid)
+
+                ins_elem.append(new_run)
+
+            created.append(ins_elem)
+
+        self._index.added(created)
+        self._inject_attributes_to_nodes(created)
+        return created
+
+    def suggest_deletion(self, elem):
+        """Mark a w:r or w:p element as deleted with tracked changes (in place).
+
+        Same behavior as DocxXMLEditor.suggest_deletion.
+
+        Args:
+            elem: A w:r or w:p element without existing tracked changes
+
+        Returns:
+            Element: The modified element
+
+        Raises:
+            ValueError: If element has existing tracked changes or invalid structure
+        """
+        q = self._qname
+        tag = self.get_tag(elem)
+        if elem.tag == q("w:r"):
+            # Check for existing w:delText
+            if next(elem.iter(q("w:delText")), None) is not None:
+                raise ValueError("w:r element already contains w:delText")
+
+            self.dirty = True
+            self._mark_run_deleted(elem)
+
+            # Wrap in w:del, keeping the run's position and trailing whitespace
+            del_wrapper = elem.makeelement(q("w:del"))
+            elem.addprevious(del_wrapper)
+            del_wrapper.tail, elem.tail = elem.tail, None
+            del_wrapper.append(elem)
+            self._index.added([del_wrapper])
+
+            # Inject attributes to the deletion wrapper
+            self._inject_attributes_to_nodes([del_wrapper])
+
+            return del_wrapper
+
+        elif elem.tag == q("w:p"):
+            # Check for existing tracked changes
+            if next(elem.iterdescendants(q("w:ins"), q("w:del")), None) is not None:
                 raise ValueError("w:p element already contains tracked changes")
 
             # Check if it's a numbered list item
-            pPr_list = elem.getElementsByTagName("w:pPr")
-            is_numbered = pPr_list and pPr_list[0].getElementsByTagName("w:numPr")
+            pPr = next(elem.iterdescendants(q("w:pPr")), None)
+            is_numbered = (
+                pPr is not None
+                and next(pPr.iterdescendants(q("w:numPr")), None) is not None
+            )
 
+            self.dirty = True
             if is_numbered:
-                # Add <w:del/> to w:rPr in w:pPr
-                pPr = pPr_list[0]
-                rPr_list = pPr.getElementsByTagName("w:rPr")
-
-                if not rPr_list:
-                    rPr = self.dom.createElement("w:rPr")
-                    pPr.appendChild(rPr)
-                else:
-                    rPr = rPr_list[0]
-
-                # Add <w:del/> marker
-                del_marker = self.dom.createElement("w:del")
-                rPr.insertBefore(
-                    del_marker, rPr.firstChild
-                ) if rPr.firstChild else rPr.appendChild(del_marker)
-
-            # Convert w:t → w:delText in all runs
-            for t_elem in list(elem.getElementsByTagName("w:t")):
-                del_text = self.dom.createElement("w:delText")
-                # Copy ALL child nodes (not just firstChild) to handle entities
-                while t_elem.firstChild:
-                    del_text.appendChild(t_elem.firstChild)
-                # Preserve attributes like xml:space
-                for i in range(t_elem.attributes.length):
-                    attr = t_elem.attributes.item(i)
-                    del_text.setAttribute(attr.name, attr.value)
-                t_elem.parentNode.replaceChild(del_text, t_elem)
+                # Add <w:del/> marker to w:rPr in w:pPr
+                rPr = next(pPr.iterdescendants(q("w:rPr")), None)
+                if rPr is None:
+                    rPr = lxml.etree.SubElement(pPr, q("w:rPr"))
+                rPr.insert(0, rPr.makeelement(q("w:del")))
+                self._index.added([rPr])
 
-            # Update run attributes: w:rsidR → w:rsidDel
-            for run in elem.getElementsByTagName("w:r"):
-                if run.hasAttribute("w:rsidR"):
-                    run.setAttribute("w:rsidDel", run.getAttribute("w:rsidR"))
-                    run.removeAttribute("w:rsidR")
-                elif not run.hasAttribute("w:rsidDel"):
-                    run.setAttribute("w:rsidDel", self.rsid)
+            # Convert w:t → w:delText and w:rsidR → w:rsidDel in all runs
+            for run in list(elem.iter(q("w:r"))):
+                self._mark_run_deleted(run)
 
             # Wrap all non-pPr children in <w:del>
-            del_wrapper = self.dom.createElement("w:del")
-            for child in [c for c in elem.childNodes if c.nodeName != "w:pPr"]:
-                elem.removeChild(child)
-                del_wrapper.appendChild(child)
-            elem.appendChild(del_wrapper)
+            del_wrapper = elem.makeelement(q("w:del"))
+            for child in list(elem):
+                if child.tag != q("w:pPr"):
+                    del_wrapper.append(child)
+            elem.append(del_wrapper)
+            self._index.added([del_wrapper])
 
             # Inject attributes to the deletion wrapper
             self._inject_attributes_to_nodes([del_wrapper])
@@ -590,27 +1237,184 @@ class DocxXMLEditor(XMLEditor):
             return elem
 
         else:
-            raise ValueError(f"Element must be w:r or w:p, got {elem.nodeName}")
+            raise ValueError(f"Element must be w:r or w:p, got {tag}")
+
+    replace_text = DocxXMLEditor.replace_text
+
+    def _split_run(self, run, pieces):
+        """Replace a run with new runs holding the pieces planned by replace_text.
+
+        Same behavior as DocxXMLEditor._split_run.
+        """
+        q = self._qname
+        rsid_r = q("w:rsidR", attribute=True)
+        rsid_del = q("w:rsidDel", attribute=True)
+        rsid_prefix = q("w:rsid", attribute=True)
+        space = q("xml:space", attribute=True)
+
+        self.dirty = True
+        nodes = []
+        for status, items, source in pieces:
+            new_run = run.makeelement(q("w:r"))
+            for name, value in source.attrib.items():
+                if status == "insert" and name.startswith(rsid_prefix):
+                    continue
+                if status == "delete" and name == rsid_r:
+                    name = rsid_del
+                new_run.set(name, value)
+            rPr = source.find(q("w:rPr"))
+            if rPr is not None:
+                new_run.append(deepcopy(rPr))
+
+            for kind, value in items:
+                if kind == "node":
+                    value.tail = None
+                    new_run.append(value)
+                    continue
+                text_elem = lxml.etree.SubElement(
+                    new_run, q("w:delText") if status == "delete" else q("w:t")
+                )
+                text_elem.text = value
+                if value[0].isspace() or value[-1].isspace():
+                    text_elem.set(space, "preserve")
+
+            if status == "keep":
+                nodes.append(new_run)
+            else:
+                wrapper = run.makeelement(q("w:del") if status == "delete" else q("w:ins"))
+                wrapper.append(new_run)
+                nodes.append(wrapper)
+
+        # New runs never match a line_number filter
+        for node in nodes:
+            run.addprevious(node)
+            for elem in node.iter():
+                elem.sourceline = 0
+        nodes[-1].tail = run.tail
+        parent = run.getparent()
+        parent.remove(run)
+        self._index.removed(run, parent)
+        self._index.added(nodes)
+        self._inject_attributes_to_nodes([n for n in nodes if n.tag != q("w:r")])
+        return nodes
+
+    def _mark_run_deleted(self, run):
+        """Convert w:t → w:delText and w:rsidR → w:rsidDel on a run in place."""
+        for t_elem in list(run.iter(self._qname("w:t"))):
+            parent = t_elem.getparent()
+            self._index.removed(t_elem, parent)
+            t_elem.tag = self._qname("w:delText")
+            self._index.added([t_elem])
+
+        rsid_r = self._qname("w:rsidR", attribute=True)
+        rsid_del = self._qname("w:rsidDel", attribute=True)
+        if rsid_r in run.attrib:
+            run.set(rsid_del, run.attrib.pop(rsid_r))
+        elif rsid_del not in run.attrib:
+            run.set(rsid_del, self.rsid)
+
+
+_EDITOR_CLASSES = {"minidom": DocxXMLEditor, "lxml": LxmlDocxXMLEditor}
+
+
+def _link_or_copy(src, dst):
+    """Hard-link src to dst, falling back to a copy (e.g. across file systems)."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+
+def _copy_changed_files(files, dst_dir):
+    """Copy files that differ from their counterpart in dst_dir.
+
+    Files are compared by identity (hard links), then by size and modification
+    time, which copies preserve. Each file is written to a temp file and renamed
+    into place.
+
+    Args:
+        files: Mapping of paths relative to dst_dir to the files to copy there
+        dst_dir: Directory to copy into
+    """
+    dst_dir = Path(dst_dir)
+    for name, src in files.items():
+        dst = dst_dir / name
+        if dst.exists():
+            src_stat, dst_stat = src.stat(), dst.stat()
+            if os.path.samestat(src_stat, dst_stat) or (
+                src_stat.st_size == dst_stat.st_size
+                and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+            ):
+                continue
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = dst.with_name(f".{dst.name}.tmp")
+        shutil.copy2(src, tmp_path)
+        os.replace(tmp_path, dst)
+
+
+def _parse_change_id(change_id) -> int:
+    """Parse a w:id value, returning -1 if it is missing or not a number."""
+    try:
+        return int(change_id)
+    except (TypeError, ValueError):
+        return -1
 
 
-def _generate_hex_id() -> str:
-    """Generate random 8-character hex ID for para/durable IDs.
+class IdAllocator:
+    """Allocates 8-digit hex IDs that are not used anywhere in the document.
 
-    Values are constrained to be less than 0x7FFFFFFF per OOXML spec:
-    - paraId must be < 0x80000000
-    - durableId must be < 0x7FFFFFFF
-    We use the stricter constraint (0x7FFFFFFF) for both.
+    Used for w14:paraId, w14:textId, durableId and RSIDs. The IDs already in the
+    document are collected in a single scan before the first allocation. New IDs
+    are drawn at random, like Word's, and redrawn on the rare clash, so each
+    allocation is O(1). With a seed the sequence is reproducible.
     """
-    return f"{random.randint(1, 0x7FFFFFFE):08X}"
 
+    # paraId must be < 0x80000000 and durableId < 0x7FFFFFFF; use the stricter limit
+    MAX_ID = 0x7FFFFFFE
 
-def _generate_rsid() -> str:
-    """Generate random 8-character hex RSID."""
-    return "".join(random.choices("0123456789ABCDEF", k=8))
+    def __init__(self, seed=None, sources=None):
+        """Initialize the allocator.
+
+        Args:
+            seed: Seed for reproducible IDs (default: random)
+            sources: Callable returning the contents (bytes) of the XML parts to scan
+                for existing IDs; called once, before the first allocation
+        """
+        self._random = random.Random(seed)
+        self._sources = sources
+        self._used = set()
+
+    def reserve(self, value):
+        """Mark an ID (hex string) as used, e.g. one found on inserted content."""
+        try:
+            self._used.add(int(value, 16))
+        except (TypeError, ValueError):
+            pass
+
+    def new_id(self) -> str:
+        """Return a new unused 8-digit hex ID."""
+        if self._sources is not None:
+            sources, self._sources = self._sources, None
+            for content in sources():
+                for match in _EXISTING_ID.finditer(content):
+                    self._used.add(int(match.group(1) or match.group(2), 16))
+        while True:
+            value = self._random.randint(1, self.MAX_ID)
+            if value not in self._used:
+                self._used.add(value)
+                return f"{value:08X}"
+
+
+# Attributes holding paraId/textId/durableId/RSID values, and RSIDs in settings.xml
+_EXISTING_ID = re.compile(
+    rb'(?:paraId|textId|durableId|rsid[A-Za-z]*)="([0-9A-Fa-f]{8})"'
+    rb'|<w:rsid(?:Root)? w:val="([0-9A-Fa-f]{8})"'
+)
 
 
 class Document:
-    """Manages comments in unpacked Word documents."""
+    """Manages comments in unpacked Word documents or .docx files."""
 
     def __init__(
         self,
@@ -619,36 +1423,84 @@ class Document:
         track_revisions=False,
         author="Claude",
         initials="C",
+        engine="minidom",
+        original_docx=None,
+        id_seed=None,
     ):
         """
-        Initialize with path to unpacked Word document directory.
+        Initialize with path to unpacked Word document directory or .docx file.
         Automatically sets up comment infrastructure (people.xml, RSIDs).
 
+        Parts are copied into a private workspace (unpacked_path) when first
+        opened, so parts that are never edited cost nothing. A .docx is opened
+        without unpacking: parts are extracted as-is (not pretty-printed), and
+        save() writes a new .docx.
+
         Args:
-            unpacked_dir: Path to unpacked DOCX directory (must contain word/ subdirectory)
+            unpacked_dir: Path to unpacked DOCX directory (must contain word/ subdirectory),
+                or to a .docx file
             rsid: Optional RSID to use for all comment elements. If not provided, one will be generated.
             track_revisions: If True, enables track revisions in settings.xml (default: False)
             author: Default author name for comments (default: "Claude")
             initials: Default author initials for comments (default: "C")
+            engine: XML backend for editors, "minidom" or "lxml" (default: "minidom").
+                lxml is much faster on large documents; its nodes are lxml elements.
+            original_docx: Optional path to the .docx the directory was unpacked from.
+                Used as the validation baseline instead of packing the directory.
+            id_seed: Optional seed making generated IDs (RSID, paraIds, durableIds)
+                reproducible, e.g. for regression tests and benchmarks.
         """
+        if engine not in _EDITOR_CLASSES:
+            raise ValueError(
+                f"Unknown engine: {engine}. Use one of: {', '.join(_EDITOR_CLASSES)}"
+            )
+        self.engine = engine
         self.original_path = Path(unpacked_dir)
+        self.is_docx = self.original_path.is_file() and zipfile.is_zipfile(
+            self.original_path
+        )
 
-        if not self.original_path.exists() or not self.original_path.is_dir():
+        if not self.is_docx and not self.original_path.is_dir():
             raise ValueError(f"Directory not found: {unpacked_dir}")
 
-        # Create temporary directory with subdirectories for unpacked content and baseline
+        # Create temporary directory with subdirectories for unpacked content and baseline.
+        # Parts are copied into the workspace when first opened (see _has_part).
         self.temp_dir = tempfile.mkdtemp(prefix="docx_")
         self.unpacked_path = Path(self.temp_dir) / "unpacked"
-        shutil.copytree(self.original_path, self.unpacked_path)
+        self.unpacked_path.mkdir()
+        self._extracted = {}  # part -> (size, mtime) of its private copy
+        self._linked = set()  # parts linked to the originals for validation
+        if self.is_docx:
+            # Parts are extracted from a private link to the source; it stays
+            # intact if the source is overwritten.
+            self._source_docx = Path(self.temp_dir) / "original.docx"
+            _link_or_copy(self.original_path, self._source_docx)
+            with zipfile.ZipFile(self._source_docx) as zf:
+                self._members = {
+                    info.filename for info in zf.infolist() if not info.is_dir()
+                }
+            original_docx = original_docx or self._source_docx
+        else:
+            self._members = {
+                path.relative_to(self.original_path).as_posix()
+                for path in self.original_path.rglob("*")
+                if path.is_file()
+            }
 
-        # Pack original directory into temporary .docx for validation baseline (outside unpacked dir)
-        self.original_docx = Path(self.temp_dir) / "original.docx"
-        pack_document(self.original_path, self.original_docx, validate=False)
+        # Validation baseline is packed on first use (see original_docx)
+        self._original_docx = Path(original_docx) if original_docx else None
+        # Check results of unchanged parts, reused by later validate() calls
+        self._validation_cache = {}
 
         self.word_path = self.unpacked_path / "word"
 
+        # IDs for new paragraphs, comments and the RSID never clash with existing ones
+        self.ids = IdAllocator(seed=id_seed, sources=self._iter_xml_contents)
+
         # Generate RSID if not provided
-        self.rsid = rsid if rsid else _generate_rsid()
+        if rsid:
+            self.ids.reserve(rsid)
+        self.rsid = rsid if rsid else self.ids.new_id()
         print(f"Using RSID: {self.rsid}")
 
         # Set default author and initials
@@ -679,7 +1531,7 @@ class Document:
 
     def __getitem__(self, xml_path: str) -> DocxXMLEditor:
         """
-        Get or create a DocxXMLEditor for the specified XML file.
+        Get or create a DocxXMLEditor (or LxmlDocxXMLEditor) for the specified XML file.
 
         Enables lazy-loaded editors with bracket notation:
             node = doc["word/document.xml"].get_node(tag="w:p", line_number=42)
@@ -702,11 +1554,15 @@ class Document:
         """
         if xml_path not in self._editors:
             file_path = self.unpacked_path / xml_path
-            if not file_path.exists():
+            if not self._has_part(file_path):
                 raise ValueError(f"XML file not found: {xml_path}")
-            # Use DocxXMLEditor with RSID, author, and initials for all editors
-            self._editors[xml_path] = DocxXMLEditor(
-                file_path, rsid=self.rsid, author=self.author, initials=self.initials
+            # Use the engine's editor with RSID, author, and initials for all editors
+            self._editors[xml_path] = _EDITOR_CLASSES[self.engine](
+                file_path,
+                rsid=self.rsid,
+                author=self.author,
+                initials=self.initials,
+                ids=self.ids,
             )
         return self._editors[xml_path]
 
@@ -727,40 +1583,18 @@ class Document:
             end_node = cm.get_document_node(tag="w:ins", id="2")
             cm.add_comment(start=start_node, end=end_node, text="Explanation")
         """
-        comment_id = self.next_comment_id
-        para_id = _generate_hex_id()
-        durable_id = _generate_hex_id()
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        comment = self._new_comment(text)
 
         # Add comment ranges to document.xml immediately
-        self._document.insert_before(start, self._comment_range_start_xml(comment_id))
-
-        # If end node is a paragraph, append comment markup inside it
-        # Otherwise insert after it (for run-level anchors)
-        if end.tagName == "w:p":
-            self._document.append_to(end, self._comment_range_end_xml(comment_id))
-        else:
-            self._document.insert_after(end, self._comment_range_end_xml(comment_id))
-
-        # Add to comments.xml immediately
-        self._add_to_comments_xml(
-            comment_id, para_id, text, self.author, self.initials, timestamp
-        )
+        self._insert_comment_range(comment["id"], start, end)
 
-        # Add to commentsExtended.xml immediately
-        self._add_to_comments_extended_xml(para_id, parent_para_id=None)
-
-        # Add to commentsIds.xml immediately
-        self._add_to_comments_ids_xml(para_id, durable_id)
-
-        # Add to commentsExtensible.xml immediately
-        self._add_to_comments_extensible_xml(durable_id)
+        # Add to comments.xml, commentsExtended.xml, commentsIds.xml and
+        # commentsExtensible.xml immediately
+        self._add_to_comment_parts([comment])
 
         # Update existing_comments so replies work
-        self.existing_comments[comment_id] = {"para_id": para_id}
-
-        self.next_comment_id += 1
-        return comment_id
+        self.existing_comments[comment["id"]] = {"para_id": comment["para_id"]}
+        return comment["id"]
 
     def reply_to_comment(
         self,
@@ -783,11 +1617,9 @@ class Document:
         if parent_comment_id not in self.existing_comments:
             raise ValueError(f"Parent comment with id={parent_comment_id} not found")
 
-        parent_info = self.existing_comments[parent_comment_id]
-        comment_id = self.next_comment_id
-        para_id = _generate_hex_id()
-        durable_id = _generate_hex_id()
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        comment = self._new_comment(
+            text, parent_para_id=self.existing_comments[parent_comment_id]["para_id"]
+        )
 
         # Add comment ranges to document.xml immediately
         parent_start_elem = self._document.get_node(
@@ -796,55 +1628,83 @@ class Document:
         parent_ref_elem = self._document.get_node(
             tag="w:commentReference", attrs={"w:id": str(parent_comment_id)}
         )
+        self._insert_reply_range(comment["id"], parent_start_elem, parent_ref_elem)
 
-        self._document.insert_after(
-            parent_start_elem, self._comment_range_start_xml(comment_id)
-        )
-        parent_ref_run = parent_ref_elem.parentNode
-        self._document.insert_after(
-            parent_ref_run, f'<w:commentRangeEnd w:id="{comment_id}"/>'
-        )
-        self._document.insert_after(
-            parent_ref_run, self._comment_ref_run_xml(comment_id)
-        )
+        # Add to the comment parts immediately (with parent)
+        self._add_to_comment_parts([comment])
 
-        # Add to comments.xml immediately
-        self._add_to_comments_xml(
-            comment_id, para_id, text, self.author, self.initials, timestamp
-        )
+        # Update existing_comments so replies work
+        self.existing_comments[comment["id"]] = {"para_id": comment["para_id"]}
+        return comment["id"]
 
-        # Add to commentsExtended.xml immediately (with parent)
-        self._add_to_comments_extended_xml(
-            para_id, parent_para_id=parent_info["para_id"]
-        )
+    def batch(self):
+        """
+        Start a batch of edits that are queued and applied together.
 
-        # Add to commentsIds.xml immediately
-        self._add_to_comments_ids_xml(para_id, durable_id)
+        Use as a context manager: queued edits are applied when the block exits
+        without an exception and discarded otherwise. Comment parts are updated
+        once per part for the whole batch and reply anchors are resolved in one
+        pass over document.xml, which makes large reviews much faster.
 
-        # Add to commentsExtensible.xml immediately
-        self._add_to_comments_extensible_xml(durable_id)
+        Returns:
+            DocumentBatch: Queue for comments, replies and tracked changes
 
-        # Update existing_comments so replies work
-        self.existing_comments[comment_id] = {"para_id": para_id}
+        Example:
+            with doc.batch() as batch:
+                for para in paragraphs:
+                    comment_id = batch.add_comment(start=para, end=para, text="Check")
+                    batch.reply_to_comment(parent_comment_id=comment_id, text="Done")
+                batch.suggest_deletion(run)
+        """
+        return DocumentBatch(self)
 
-        self.next_comment_id += 1
-        return comment_id
+    @property
+    def original_docx(self):
+        """Path to the original document as a .docx, used as validation baseline.
+
+        Packed from the original directory on first access unless a source .docx
+        was given.
+        """
+        if self._original_docx is None:
+            # Pack into the temp directory (outside unpacked dir)
+            original_docx = Path(self.temp_dir) / "original.docx"
+            pack_document(self.original_path, original_docx, validate=False)
+            self._original_docx = original_docx
+        return self._original_docx
 
     def __del__(self):
         """Clean up temporary directory on deletion."""
         if hasattr(self, "temp_dir") and Path(self.temp_dir).exists():
             shutil.rmtree(self.temp_dir)
 
-    def validate(self) -> None:
+    def validate(self, jobs=1) -> None:
         """
         Validate the document against XSD schema and redlining rules.
 
+        Unsaved editor changes are written to the workspace first. Parts whose
+        content is unchanged since an earlier validate() are not checked again,
+        so validating after every edit only re-checks the edited parts.
+
+        Args:
+            jobs: Number of processes validating parts against XSD schemas in
+                parallel (default: 1)
+
         Raises:
-            ValueError: If validation fails.
+            ValueError: If validation fails or jobs is less than 1.
         """
+        # Validators read every part from the workspace
+        self._extract_all_parts()
+        for editor in self._editors.values():
+            if editor.dirty:
+                editor.save()
+
         # Create validators with current state
         schema_validator = DOCXSchemaValidator(
-            self.unpacked_path, self.original_docx, verbose=False
+            self.unpacked_path,
+            self.original_docx,
+            verbose=False,
+            jobs=jobs,
+            cache=self._validation_cache,
         )
         redlining_validator = RedliningValidator(
             self.unpacked_path, self.original_docx, verbose=False
@@ -861,19 +1721,27 @@ class Document:
         Save all modified XML files to disk and copy to destination directory.
 
         This persists all changes made via add_comment() and reply_to_comment().
+        Only editors with changes are serialized, and only files that differ from
+        the destination are copied, each written to a temp file and renamed.
+
+        For a document opened from a .docx, a new .docx is written instead:
+        unchanged parts are streamed from the source archive and only modified or
+        new parts are taken from the workspace.
 
         Args:
-            destination: Optional path to save to. If None, saves back to original directory.
+            destination: Optional path to save to. If None, saves back to original
+                directory (or .docx file).
             validate: If True, validates document before saving (default: True).
         """
         # Only ensure comment relationships and content types if comment files exist
-        if self.comments_path.exists():
+        if self._has_part(self.comments_path):
             self._ensure_comment_relationships()
             self._ensure_comment_content_types()
 
         # Save all modified XML files in temp directory
         for editor in self._editors.values():
-            editor.save()
+            if editor.dirty:
+                editor.save()
 
         # Validate by default
         if validate:
@@ -881,19 +1749,160 @@ class Document:
 
         # Copy contents from temp directory to destination (or original directory)
         target_path = Path(destination) if destination else self.original_path
-        shutil.copytree(self.unpacked_path, target_path, dirs_exist_ok=True)
+        if self.is_docx:
+            self._write_docx(target_path)
+            return
+        if target_path.resolve() == self.original_path.resolve():
+            # Keep the baseline for later validation before overwriting the originals
+            self.original_docx
+        # Parts never opened are taken from the original directory
+        files = {name: self.original_path / name for name in self._members}
+        for path in self.unpacked_path.rglob("*"):
+            if path.is_file():
+                files[path.relative_to(self.unpacked_path).as_posix()] = path
+        _copy_changed_files(files, target_path)
+
+    # ==================== Private: Workspace ====================
+
+    def _has_part(self, file_path):
+        """Check whether a part exists, copying it into the workspace if needed.
+
+        Parts of the source (.docx or directory) are copied on first use, so
+        opening a document costs nothing for the parts that are never edited.
+
+        Args:
+            file_path: Path of the part inside unpacked_path
+
+        Returns:
+            bool: True if the file now exists in the workspace
+        """
+        file_path = Path(file_path)
+        name = file_path.relative_to(self.unpacked_path).as_posix()
+        if name in self._linked:
+            # Replace the link with a private copy before it can be edited
+            self._linked.discard(name)
+            file_path.unlink()
+        elif file_path.exists():
+            return True
+        if name not in self._members or name in self._extracted:
+            return False
+        if self.is_docx:
+            with zipfile.ZipFile(self._source_docx) as zf:
+                self._extract_member(zf, name)
+        else:
+            self._copy_member(name)
+        return True
+
+    def _extract_all_parts(self):
+        """Put every part of the source that is not in the workspace yet there.
+
+        Members of a source .docx are extracted; files of a source directory are
+        hard-linked, as they are only read (by the validators) until opened.
+        """
+        missing = [
+            name
+            for name in sorted(self._members)
+            if name not in self._extracted
+            and name not in self._linked
+            and not (self.unpacked_path / name).exists()
+        ]
+        if not missing:
+            return
+        if not self.is_docx:
+            for name in missing:
+                path = self.unpacked_path / name
+                path.parent.mkdir(parents=True, exist_ok=True)
+                _link_or_copy(self.original_path / name, path)
+                self._linked.add(name)
+            return
+        with zipfile.ZipFile(self._source_docx) as zf:
+            for name in missing:
+                self._extract_member(zf, name)
+
+    def _extract_member(self, zf, name):
+        """Extract a single archive member as-is and remember its size and mtime."""
+        path = Path(zf.extract(name, self.unpacked_path))
+        stat = path.stat()
+        self._extracted[name] = (stat.st_size, stat.st_mtime_ns)
+
+    def _copy_member(self, name):
+        """Copy a single file of the source directory, like _extract_member."""
+        path = self.unpacked_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(self.original_path / name, path)
+        stat = path.stat()
+        self._extracted[name] = (stat.st_size, stat.st_mtime_ns)
+
+    def _write_docx(self, target_path):
+        """Write the document as a .docx, replacing target_path atomically.
+
+        Archive members that were never extracted, or are unchanged since
+        extraction, are copied byte for byte from the source .docx without
+        recompressing; modified and new files are read from the workspace.
+        """
+        target_path = Path(target_path)
+        tmp_path = target_path.with_name(f".{target_path.name}.tmp")
+        written = set()
+        try:
+            with zipfile.ZipFile(self._source_docx) as src, zipfile.ZipFile(
+                tmp_path, "w", zipfile.ZIP_DEFLATED
+            ) as dst:
+                for info in src.infolist():
+                    written.add(info.filename)
+                    path = self.unpacked_path / info.filename
+                    if not info.is_dir() and self._is_modified(info.filename, path):
+                        dst.write(path, info.filename)
+                    else:
+                        copy_raw_member(dst, src, info)
+
+                # Parts added during editing (comments, people.xml, images, ...)
+                for path in sorted(self.unpacked_path.rglob("*")):
+                    name = path.relative_to(self.unpacked_path).as_posix()
+                    if path.is_file() and name not in written:
+                        dst.write(path, name)
+            os.replace(tmp_path, target_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def _iter_xml_contents(self):
+        """Yield the content of every XML part, for the IdAllocator scan."""
+        seen = set()
+        for path in sorted(self.unpacked_path.rglob("*.xml")):
+            seen.add(path.relative_to(self.unpacked_path).as_posix())
+            yield path.read_bytes()
+        missing = sorted(n for n in self._members - seen if n.endswith(".xml"))
+        if not missing:
+            return
+        if not self.is_docx:
+            for name in missing:
+                yield (self.original_path / name).read_bytes()
+            return
+        with zipfile.ZipFile(self._source_docx) as zf:
+            for name in missing:
+                yield zf.read(name)
+
+    def _is_modified(self, name, path):
+        """Check whether a workspace file differs from the archive member."""
+        if not path.exists():
+            return False
+        if name not in self._extracted:
+            # Created in the workspace by the caller
+            return True
+        stat = path.stat()
+        return (stat.st_size, stat.st_mtime_ns) != self._extracted[name]
 
     # ==================== Private: Initialization ====================
 
     def _get_next_comment_id(self):
         """Get the next available comment ID."""
-        if not self.comments_path.exists():
+        if not self._has_part(self.comments_path):
             return 0
 
         editor = self["word/comments.xml"]
         max_id = -1
-        for comment_elem in editor.dom.getElementsByTagName("w:comment"):
-            comment_id = comment_elem.getAttribute("w:id")
+        for comment_elem in editor.find_all("w:comment"):
+            comment_id = editor.get_attribute(comment_elem, "w:id")
             if comment_id:
                 try:
                     max_id = max(max_id, int(comment_id))
@@ -903,21 +1912,21 @@ class Document:
 
     def _load_existing_comments(self):
         """Load existing comments from files to enable replies."""
-        if not self.comments_path.exists():
+        if not self._has_part(self.comments_path):
             return {}
 
         editor = self["word/comments.xml"]
         existing = {}
 
-        for comment_elem in editor.dom.getElementsByTagName("w:comment"):
-            comment_id = comment_elem.getAttribute("w:id")
+        for comment_elem in editor.find_all("w:comment"):
+            comment_id = editor.get_attribute(comment_elem, "w:id")
             if not comment_id:
                 continue
 
             # Find para_id from the w:p element within the comment
             para_id = None
-            for p_elem in comment_elem.getElementsByTagName("w:p"):
-                para_id = p_elem.getAttribute("w14:paraId")
+            for p_elem in editor.find_all("w:p", comment_elem):
+                para_id = editor.get_attribute(p_elem, "w14:paraId")
                 if para_id:
                     break
 
@@ -953,7 +1962,7 @@ class Document:
 
     def _update_people_xml(self, path):
         """Create people.xml if it doesn't exist."""
-        if not path.exists():
+        if not self._has_part(path):
             # Copy from template
             shutil.copy(TEMPLATE_DIR / "people.xml", path)
 
@@ -965,7 +1974,7 @@ class Document:
             return
 
         # Add Override element
-        root = editor.dom.documentElement
+        root = editor.get_root()
         override_xml = '<Override PartName="/word/people.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.people+xml"/>'
         editor.append_to(root, override_xml)
 
@@ -976,8 +1985,8 @@ class Document:
         if self._has_relationship(editor, "people.xml"):
             return
 
-        root = editor.dom.documentElement
-        root_tag = root.tagName  # type: ignore
+        root = editor.get_root()
+        root_tag = editor.get_tag(root)
         prefix = root_tag.split(":")[0] + ":" if ":" in root_tag else ""
         next_rid = editor.get_next_rid()
 
@@ -998,34 +2007,33 @@ class Document:
         """
         editor = self["word/settings.xml"]
         root = editor.get_node(tag="w:settings")
-        prefix = root.tagName.split(":")[0] if ":" in root.tagName else "w"
+        root_tag = editor.get_tag(root)
+        prefix = root_tag.split(":")[0] if ":" in root_tag else "w"
 
         # Conditionally add trackRevisions if requested
         if track_revisions:
-            track_revisions_exists = any(
-                elem.tagName == f"{prefix}:trackRevisions"
-                for elem in editor.dom.getElementsByTagName(f"{prefix}:trackRevisions")
-            )
+            track_revisions_exists = bool(editor.find_all(f"{prefix}:trackRevisions"))
 
             if not track_revisions_exists:
                 track_rev_xml = f"<{prefix}:trackRevisions/>"
                 # Try to insert before documentProtection, defaultTabStop, or at start
                 inserted = False
                 for tag in [f"{prefix}:documentProtection", f"{prefix}:defaultTabStop"]:
-                    elements = editor.dom.getElementsByTagName(tag)
+                    elements = editor.find_all(tag)
                     if elements:
                         editor.insert_before(elements[0], track_rev_xml)
                         inserted = True
                         break
                 if not inserted:
                     # Insert as first child of settings
-                    if root.firstChild:
-                        editor.insert_before(root.firstChild, track_rev_xml)
+                    children = editor.get_children(root)
+                    if children:
+                        editor.insert_before(children[0], track_rev_xml)
                     else:
                         editor.append_to(root, track_rev_xml)
 
         # Always check if rsids section exists
-        rsids_elements = editor.dom.getElementsByTagName(f"{prefix}:rsids")
+        rsids_elements = editor.find_all(f"{prefix}:rsids")
 
         if not rsids_elements:
             # Add new rsids section
@@ -1036,15 +2044,13 @@ class Document:
 
             # Try to insert after compat, before clrSchemeMapping, or before closing tag
             inserted = False
-            compat_elements = editor.dom.getElementsByTagName(f"{prefix}:compat")
+            compat_elements = editor.find_all(f"{prefix}:compat")
             if compat_elements:
                 editor.insert_after(compat_elements[0], rsids_xml)
                 inserted = True
 
             if not inserted:
-                clr_elements = editor.dom.getElementsByTagName(
-                    f"{prefix}:clrSchemeMapping"
-                )
+                clr_elements = editor.find_all(f"{prefix}:clrSchemeMapping")
                 if clr_elements:
                     editor.insert_before(clr_elements[0], rsids_xml)
                     inserted = True
@@ -1055,80 +2061,148 @@ class Document:
             # Check if this rsid already exists
             rsids_elem = rsids_elements[0]
             rsid_exists = any(
-                elem.getAttribute(f"{prefix}:val") == self.rsid
-                for elem in rsids_elem.getElementsByTagName(f"{prefix}:rsid")
+                editor.get_attribute(elem, f"{prefix}:val") == self.rsid
+                for elem in editor.find_all(f"{prefix}:rsid", rsids_elem)
             )
 
             if not rsid_exists:
                 rsid_xml = f'<{prefix}:rsid {prefix}:val="{self.rsid}"/>'
                 editor.append_to(rsids_elem, rsid_xml)
 
-    # ==================== Private: XML File Creation ====================
+    # ==================== Private: Comments ====================
 
-    def _add_to_comments_xml(
-        self, comment_id, para_id, text, author, initials, timestamp
-    ):
-        """Add a single comment to comments.xml."""
-        if not self.comments_path.exists():
-            shutil.copy(TEMPLATE_DIR / "comments.xml", self.comments_path)
+    def _new_comment(self, text, parent_para_id=None):
+        """Allocate IDs for a new comment or reply.
 
-        editor = self["word/comments.xml"]
-        root = editor.get_node(tag="w:comments")
+        Returns:
+            dict: Comment entry with id, para_id, durable_id, text and parent_para_id
+        """
+        comment = {
+            "id": self.next_comment_id,
+            "para_id": self.ids.new_id(),
+            "durable_id": self.ids.new_id(),
+            "text": text,
+            "parent_para_id": parent_para_id,
+        }
+        self.next_comment_id += 1
+        return comment
 
-        escaped_text = (
-            text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    def _insert_comment_range(self, comment_id, start, end):
+        """Insert comment range markers and the reference run into document.xml.
+
+        Returns:
+            tuple: (commentRangeStart element, commentReference element)
+        """
+        range_start = self._document.insert_before(
+            start, self._comment_range_start_xml(comment_id)
         )
-        # Note: w:rsidR, w:rsidRDefault, w:rsidP on w:p, w:rsidR on w:r,
-        # and w:author, w:date, w:initials on w:comment are automatically added by DocxXMLEditor
-        comment_xml = f'''<w:comment w:id="{comment_id}">
-  <w:p w14:paraId="{para_id}" w14:textId="77777777">
-    <w:r><w:rPr><w:rStyle w:val="CommentReference"/></w:rPr><w:annotationRef/></w:r>
-    <w:r><w:rPr><w:color w:val="000000"/><w:sz w:val="20"/><w:szCs w:val="20"/></w:rPr><w:t>{escaped_text}</w:t></w:r>
-  </w:p>
-</w:comment>'''
-        editor.append_to(root, comment_xml)
 
-    def _add_to_comments_extended_xml(self, para_id, parent_para_id):
-        """Add a single comment to commentsExtended.xml."""
-        if not self.comments_extended_path.exists():
-            shutil.copy(
-                TEMPLATE_DIR / "commentsExtended.xml", self.comments_extended_path
+        # If end node is a paragraph, append comment markup inside it
+        # Otherwise insert after it (for run-level anchors)
+        if self._document.get_tag(end) == "w:p":
+            nodes = self._document.append_to(end, self._comment_range_end_xml(comment_id))
+        else:
+            nodes = self._document.insert_after(
+                end, self._comment_range_end_xml(comment_id)
             )
+        return range_start[0], self._find_comment_reference(nodes)
 
-        editor = self["word/commentsExtended.xml"]
-        root = editor.get_node(tag="w15:commentsEx")
+    def _insert_reply_range(self, comment_id, parent_start_elem, parent_ref_elem):
+        """Insert reply markers next to the parent comment's markers in document.xml.
 
-        if parent_para_id:
-            xml = f'<w15:commentEx w15:paraId="{para_id}" w15:paraIdParent="{parent_para_id}" w15:done="0"/>'
-        else:
-            xml = f'<w15:commentEx w15:paraId="{para_id}" w15:done="0"/>'
-        editor.append_to(root, xml)
+        Returns:
+            tuple: (commentRangeStart element, commentReference element)
+        """
+        range_start = self._document.insert_after(
+            parent_start_elem, self._comment_range_start_xml(comment_id)
+        )
+        parent_ref_run = self._document.get_parent(parent_ref_elem)
+        self._document.insert_after(
+            parent_ref_run, f'<w:commentRangeEnd w:id="{comment_id}"/>'
+        )
+        nodes = self._document.insert_after(
+            parent_ref_run, self._comment_ref_run_xml(comment_id)
+        )
+        return range_start[0], self._find_comment_reference(nodes)
 
-    def _add_to_comments_ids_xml(self, para_id, durable_id):
-        """Add a single comment to commentsIds.xml."""
-        if not self.comments_ids_path.exists():
-            shutil.copy(TEMPLATE_DIR / "commentsIds.xml", self.comments_ids_path)
+    def _find_comment_reference(self, nodes):
+        """Return the w:commentReference inside freshly inserted reference runs."""
+        for node in nodes:
+            if (
+                self._document.is_element(node)
+                and self._document.get_tag(node) == "w:r"
+            ):
+                return self._document.find_all("w:commentReference", node)[0]
+        raise ValueError("Inserted comment markup has no w:commentReference")
+
+    def _add_to_comment_parts(self, comments):
+        """Add comments to comments.xml, commentsExtended.xml, commentsIds.xml and
+        commentsExtensible.xml, appending to each part once.
 
-        editor = self["word/commentsIds.xml"]
-        root = editor.get_node(tag="w16cid:commentsIds")
+        Args:
+            comments: List of entries from _new_comment
+        """
+        # Note: w:rsidR, w:rsidRDefault, w:rsidP on w:p, w:rsidR on w:r,
+        # and w:author, w:date, w:initials on w:comment are automatically added by DocxXMLEditor
+        parts = [
+            ("word/comments.xml", self.comments_path, "w:comments", self._comment_xml),
+            (
+                "word/commentsExtended.xml",
+                self.comments_extended_path,
+                "w15:commentsEx",
+                self._comment_extended_xml,
+            ),
+            (
+                "word/commentsIds.xml",
+                self.comments_ids_path,
+                "w16cid:commentsIds",
+                self._comment_ids_xml,
+            ),
+            (
+                "word/commentsExtensible.xml",
+                self.comments_extensible_path,
+                "w16cex:commentsExtensible",
+                self._comment_extensible_xml,
+            ),
+        ]
+        for xml_path, file_path, root_tag, make_xml in parts:
+            if not self._has_part(file_path):
+                shutil.copy(TEMPLATE_DIR / file_path.name, file_path)
 
-        xml = f'<w16cid:commentId w16cid:paraId="{para_id}" w16cid:durableId="{durable_id}"/>'
-        editor.append_to(root, xml)
+            editor = self[xml_path]
+            root = editor.get_node(tag=root_tag)
+            editor.append_to(root, "\n".join(make_xml(c) for c in comments))
 
-    def _add_to_comments_extensible_xml(self, durable_id):
-        """Add a single comment to commentsExtensible.xml."""
-        if not self.comments_extensible_path.exists():
-            shutil.copy(
-                TEMPLATE_DIR / "commentsExtensible.xml", self.comments_extensible_path
-            )
+    # ==================== Private: XML Fragments ====================
 
-        editor = self["word/commentsExtensible.xml"]
-        root = editor.get_node(tag="w16cex:commentsExtensible")
+    def _comment_xml(self, comment):
+        """Generate XML for a comment in comments.xml."""
+        escaped_text = (
+            comment["text"]
+            .replace("&", "&amp;")
+            .replace("<", "&lt;")
+            .replace(">", "&gt;")
+        )
+        return f'''<w:comment w:id="{comment["id"]}">
+  <w:p w14:paraId="{comment["para_id"]}" w14:textId="77777777">
+    <w:r><w:rPr><w:rStyle w:val="CommentReference"/></w:rPr><w:annotationRef/></w:r>
+    <w:r><w:rPr><w:color w:val="000000"/><w:sz w:val="20"/><w:szCs w:val="20"/></w:rPr><w:t>{escaped_text}</w:t></w:r>
+  </w:p>
+</w:comment>'''
 
-        xml = f'<w16cex:commentExtensible w16cex:durableId="{durable_id}"/>'
-        editor.append_to(root, xml)
+    def _comment_extended_xml(self, comment):
+        """Generate XML for a comment in commentsExtended.xml."""
+        if comment["parent_para_id"]:
+            return f'<w15:commentEx w15:paraId="{comment["para_id"]}" w15:paraIdParent="{comment["parent_para_id"]}" w15:done="0"/>'
+        return f'<w15:commentEx w15:paraId="{comment["para_id"]}" w15:done="0"/>'
 
-    # ==================== Private: XML Fragments ====================
+    def _comment_ids_xml(self, comment):
+        """Generate XML for a comment in commentsIds.xml."""
+        return f'<w16cid:commentId w16cid:paraId="{comment["para_id"]}" w16cid:durableId="{comment["durable_id"]}"/>'
+
+    def _comment_extensible_xml(self, comment):
+        """Generate XML for a comment in commentsExtensible.xml."""
+        return f'<w16cex:commentExtensible w16cex:durableId="{comment["durable_id"]}"/>'
 
     def _comment_range_start_xml(self, comment_id):
         """Generate XML for comment range start."""
@@ -1159,22 +2233,22 @@ class Document:
 
     def _has_relationship(self, editor, target):
         """Check if a relationship with given target exists."""
-        for rel_elem in editor.dom.getElementsByTagName("Relationship"):
-            if rel_elem.getAttribute("Target") == target:
+        for rel_elem in editor.find_all("Relationship"):
+            if editor.get_attribute(rel_elem, "Target") == target:
                 return True
         return False
 
     def _has_override(self, editor, part_name):
         """Check if an override with given part name exists."""
-        for override_elem in editor.dom.getElementsByTagName("Override"):
-            if override_elem.getAttribute("PartName") == part_name:
+        for override_elem in editor.find_all("Override"):
+            if editor.get_attribute(override_elem, "PartName") == part_name:
                 return True
         return False
 
     def _has_author(self, editor, author):
         """Check if an author already exists in people.xml."""
-        for person_elem in editor.dom.getElementsByTagName("w15:person"):
-            if person_elem.getAttribute("w15:author") == author:
+        for person_elem in editor.find_all("w15:person"):
+            if editor.get_attribute(person_elem, "w15:author") == author:
                 return True
         return False
 
@@ -1207,8 +2281,8 @@ class Document:
         if self._has_relationship(editor, "comments.xml"):
             return
 
-        root = editor.dom.documentElement
-        root_tag = root.tagName  # type: ignore
+        root = editor.get_root()
+        root_tag = editor.get_tag(root)
         prefix = root_tag.split(":")[0] + ":" if ":" in root_tag else ""
         next_rid_num = int(editor.get_next_rid()[3:])
 
@@ -1247,7 +2321,7 @@ class Document:
         if self._has_override(editor, "/word/comments.xml"):
             return
 
-        root = editor.dom.documentElement
+        root = editor.get_root()
 
         # Add Override elements
         overrides = [
@@ -1274,3 +2348,209 @@ class Document:
                 f'<Override PartName="{part_name}" ContentType="{content_type}"/>'
             )
             editor.append_to(root, override_xml)
+
+
+class DocumentBatch:
+    """Queue of Document edits applied together, created by Document.batch().
+
+    Comment and reply IDs are allocated when queued, so they can be used for
+    replies within the same batch. Tracked change methods apply to
+    word/document.xml and return nothing; their results are available after the
+    batch is applied.
+    """
+
+    def __init__(self, document):
+        """Initialize an empty batch for a Document."""
+        self.document = document
+        self._operations = []
+        self._comments = []
+        self._pending_comments = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.apply()
+        else:
+            self.discard()
+        return False
+
+    def add_comment(self, start, end, text: str) -> int:
+        """Queue a comment spanning from one element to another.
+
+        Args:
+            start: Element for the starting point
+            end: Element for the ending point
+            text: Comment content
+
+        Returns:
+            The comment ID that will be created
+        """
+        comment = self.document._new_comment(text)
+        self._queue_comment(comment, ("comment", comment["id"], start, end))
+        return comment["id"]
+
+    def reply_to_comment(self, parent_comment_id: int, text: str) -> int:
+        """Queue a reply to an existing comment or to one queued in this batch.
+
+        Args:
+            parent_comment_id: The w:id of the parent comment to reply to
+            text: Reply text
+
+        Returns:
+            The comment ID that will be created for the reply
+
+        Raises:
+            ValueError: If the parent comment does not exist
+        """
+        parent_info = self._pending_comments.get(
+            parent_comment_id
+        ) or self.document.existing_comments.get(parent_comment_id)
+        if parent_info is None:
+            raise ValueError(f"Parent comment with id={parent_comment_id} not found")
+
+        comment = self.document._new_comment(
+            text, parent_para_id=parent_info["para_id"]
+        )
+        self._queue_comment(comment, ("reply", comment["id"], parent_comment_id))
+        return comment["id"]
+
+    def suggest_deletion(self, elem):
+        """Queue DocxXMLEditor.suggest_deletion on word/document.xml."""
+        self._operations.append(("edit", "suggest_deletion", elem))
+
+    def revert_insertion(self, elem):
+        """Queue DocxXMLEditor.revert_insertion on word/document.xml."""
+        self._operations.append(("edit", "revert_insertion", elem))
+
+    def revert_deletion(self, elem):
+        """Queue DocxXMLEditor.revert_deletion on word/document.xml."""
+        self._operations.append(("edit", "revert_deletion", elem))
+
+    def revert_changes(self, author=None, elem=None):
+        """Queue DocxXMLEditor.revert_changes on word/document.xml."""
+        self._operations.append(("edit", "revert_changes", author, elem))
+
+    def insert_before(self, elem, xml_content):
+        """Queue DocxXMLEditor.insert_before on word/document.xml."""
+        self._operations.append(("edit", "insert_before", elem, xml_content))
+
+    def insert_after(self, elem, xml_content):
+        """Queue DocxXMLEditor.insert_after on word/document.xml."""
+        self._operations.append(("edit", "insert_after", elem, xml_content))
+
+    def replace_node(self, elem, new_content):
+        """Queue DocxXMLEditor.replace_node on word/document.xml."""
+        self._operations.append(("edit", "replace_node", elem, new_content))
+
+    def apply(self):
+        """Apply all queued edits in order and clear the batch.
+
+        Edits to word/document.xml run in the order they were queued. The comment
+        markers in word/document.xml are collected in a single pass, which serves
+        both to check replies up front and as their anchors, and each comment part
+        is appended to once.
+
+        Replies to missing comments are rejected before anything is changed. If an
+        edit fails part way, the edits before it stay applied, and comments whose
+        markers are already in word/document.xml are still added to the comment
+        parts, so no marker points to a missing comment. The batch is cleared either
+        way.
+
+        Raises:
+            ValueError: If the markers of a replied-to comment are not found, or
+                an edit is invalid
+        """
+        document = self.document
+        editor = document._document
+
+        # Replies to comments from before the batch need their markers
+        parents = {
+            operation[2]
+            for operation in self._operations
+            if operation[0] == "reply" and operation[2] not in self._pending_comments
+        }
+        range_starts, references = {}, {}
+        if parents:
+            range_starts, references = self._comment_markers(editor)
+        missing = parents - (range_starts.keys() & references.keys())
+        if missing:
+            self.discard()
+            raise ValueError(
+                f"Comment markers for parent comment id={min(missing)} not found"
+            )
+
+        try:
+            for operation in self._operations:
+                kind = operation[0]
+                if kind == "edit":
+                    _, method, elem, *args = operation
+                    getattr(editor, method)(elem, *args)
+                elif kind == "comment":
+                    _, comment_id, start, end = operation
+                    anchors = document._insert_comment_range(comment_id, start, end)
+                    range_starts[comment_id], references[comment_id] = anchors
+                else:
+                    _, comment_id, parent_id = operation
+                    if not all(
+                        anchors.get(parent_id) is not None
+                        and editor._index.is_attached(anchors[parent_id])
+                        for anchors in (range_starts, references)
+                    ):
+                        # Markers moved or replaced by an edit in this batch
+                        range_starts, references = self._comment_markers(editor)
+                    if parent_id not in range_starts or parent_id not in references:
+                        raise ValueError(
+                            f"Comment markers for parent comment id={parent_id} not found"
+                        )
+                    anchors = document._insert_reply_range(
+                        comment_id, range_starts[parent_id], references[parent_id]
+                    )
+                    range_starts[comment_id], references[comment_id] = anchors
+        except BaseException:
+            # Only comments with markers in document.xml are added
+            range_starts, references = self._comment_markers(editor)
+            marked = range_starts.keys() | references.keys()
+            self._comments = [c for c in self._comments if c["id"] in marked]
+            raise
+        finally:
+            if self._comments:
+                document._add_to_comment_parts(self._comments)
+            document.existing_comments.update(
+                (c["id"], self._pending_comments[c["id"]]) for c in self._comments
+            )
+            self.discard()
+
+    def discard(self):
+        """Drop all queued edits. Allocated comment IDs are not reused."""
+        self._operations = []
+        self._comments = []
+        self._pending_comments = {}
+
+    @staticmethod
+    def _comment_markers(editor):
+        """Return the first w:commentRangeStart and w:commentReference per comment ID.
+
+        Markers whose w:id is missing or not a number are skipped.
+
+        Args:
+            editor: Editor of word/document.xml
+
+        Returns:
+            tuple: Two dicts, {comment ID: range start} and {comment ID: reference}
+        """
+        markers = []
+        for tag in ("w:commentRangeStart", "w:commentReference"):
+            found = {}
+            for elem in editor.find_all(tag):
+                comment_id = _parse_change_id(editor.get_attribute(elem, "w:id"))
+                if comment_id >= 0:
+                    found.setdefault(comment_id, elem)
+            markers.append(found)
+        return tuple(markers)
+
+    def _queue_comment(self, comment, operation):
+        self._comments.append(comment)
+        self._pending_comments[comment["id"]] = {"para_id": comment["para_id"]}
+        self._operations.append(operation)
@@ -0,0 +1,260 @@
+import random
+import unittest
+import zipfile
+from unittest import mock
+
+from . import document
+from .document import Document
+from .testing import NAMESPACES, DocumentTestCase, EditorTestCase, both_engines, write_docx
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+@both_engines
+class TestRevertChanges(EditorTestCase):
+    BODY = """    <w:p>
+      <w:ins w:id="1" w:author="Alice" w:date="2024-01-01T00:00:00Z">
+        <w:r><w:t>added</w:t></w:r>
+        <w:del w:id="2" w:author="Alice" w:date="2024-01-01T00:00:00Z">
+          <w:r><w:delText>typo</w:delText></w:r>
+        </w:del>
+      </w:ins>
+      <w:del w:id="3" w:author="Alice" w:date="2024-01-01T00:00:00Z">
+        <w:r w:rsidDel="00AA0001"><w:delText>removed</w:delText></w:r>
+      </w:del>
+      <w:ins w:id="4" w:author="Bob" w:date="2024-01-01T00:00:00Z">
+        <w:r><w:t>kept</w:t></w:r>
+      </w:ins>
+    </w:p>
+"""
+    editor_kwargs = {"rsid": "00BB0000", "author": "Carol"}
+
+    def test_reject_by_author(self):
+        """Only the author's outermost changes are rejected"""
+        count = self.editor.revert_changes(author="Alice")
+        self.assertEqual(count, 2)
+        self.assertEqual(self.texts("w:t"), ["removed", "kept"])
+        self.assertEqual(self.texts("w:delText"), ["added", "typo", "removed"])
+
+        (reinserted,) = [
+            ins
+            for ins in self.editor.find_all("w:ins")
+            if self.editor.get_attribute(ins, "w:author") == "Carol"
+        ]
+        (run,) = self.editor.get_children(reinserted)
+        self.assertEqual(self.editor.get_attribute(run, "w:rsidR"), "00AA0001")
+        self.assertEqual(self.editor.get_attribute(reinserted, "w:id"), "5")
+
+    def test_single_element_methods(self):
+        """revert_insertion/revert_deletion keep their return values"""
+        para = self.editor.get_node(tag="w:p")
+        self.assertEqual(self.editor.revert_insertion(para), [para])
+        deletion = self.editor.get_node(tag="w:del", attrs={"w:id": "3"})
+        nodes = self.editor.revert_deletion(deletion)
+        self.assertEqual(nodes[0], deletion)
+        self.assertEqual(self.editor.get_tag(nodes[1]), "w:ins")
+        (text,) = self.editor.find_all("w:t", nodes[1])
+        self.assertEqual(self.editor.get_text(text), "removed")
+
+
+class TestWriteDocx(DocumentTestCase):
+    BODY = """    <w:p w14:paraId="00000001">
+      <w:r><w:t>Hello</w:t></w:r>
+    </w:p>
+"""
+
+    def setUp(self):
+        super().setUp()
+        # Deflated at level 1, so recompressing at the default level would show
+        rng = random.Random(0)
+        styles = "".join(
+            f'<w:style w:styleId="S{rng.getrandbits(24)}"/>' for _ in range(500)
+        )
+        write_docx(
+            self.docx_path,
+            self.BODY,
+            {"word/styles.xml": f"<w:styles {NAMESPACES}>{styles}</w:styles>"},
+            compresslevel=1,
+        )
+        self.output = self.temp_path / "output.docx"
+
+    def test_unchanged_members_are_copied_raw(self):
+        """Members not touched by editing keep their compressed bytes"""
+        doc = Document(self.docx_path, id_seed=1)
+        doc.save(self.output, validate=False)
+        with zipfile.ZipFile(self.docx_path) as src, zipfile.ZipFile(self.output) as dst:
+            before = src.getinfo("word/styles.xml")
+            after = dst.getinfo("word/styles.xml")
+            self.assertEqual(after.compress_size, before.compress_size)
+            self.assertEqual(after.CRC, before.CRC)
+            self.assertEqual(dst.read("word/styles.xml"), src.read("word/styles.xml"))
+            self.assertIsNone(dst.testzip())
+
+    def test_failed_write_leaves_no_temp_file(self):
+        """A failure while writing removes the temp file and keeps the target"""
+        doc = Document(self.docx_path, id_seed=1)
+        with mock.patch.object(
+            document, "copy_raw_member", side_effect=OSError("disk full")
+        ):
+            with self.assertRaises(OSError):
+                doc.save(self.output, validate=False)
+        self.assertEqual(sorted(p.name for p in self.temp_path.iterdir()), ["input.docx"])
+
+
+class TestWorkspace(DocumentTestCase):
+    BODY = """    <w:p w14:paraId="00000001">
+      <w:r><w:t>Hello</w:t></w:r>
+    </w:p>
+"""
+    # Not opened by Document itself, unlike document.xml and settings.xml
+    PARTS = {"word/styles.xml": f"<w:styles {NAMESPACES}/>"}
+
+    def setUp(self):
+        super().setUp()
+        self.unpacked = self.temp_path / "unpacked"
+        with zipfile.ZipFile(self.docx_path) as zf:
+            zf.extractall(self.unpacked)
+        (self.unpacked / "word/media").mkdir()
+        (self.unpacked / "word/media/image1.png").write_bytes(b"\x89PNG" * 256)
+        self.doc = Document(self.unpacked, id_seed=1)
+
+    def test_parts_are_copied_when_opened(self):
+        """Parts are copied into the workspace on first use, as private copies"""
+        part = "word/styles.xml"
+        original = (self.unpacked / part).read_bytes()
+        copy = self.doc.unpacked_path / part
+        self.assertFalse(copy.exists())
+        self.assertFalse((self.doc.unpacked_path / "word/media/image1.png").exists())
+        self.doc[part]
+        self.assertFalse(copy.samefile(self.unpacked / part))
+        with open(copy, "r+b") as f:
+            f.write(b"<!-- edited -->")
+        self.assertEqual((self.unpacked / part).read_bytes(), original)
+
+    def test_unopened_parts_are_linked_for_validation(self):
+        """Validation links the parts not opened yet; opening one copies it"""
+        self.doc._extract_all_parts()  # as done by validate()
+        for part in ("word/media/image1.png", "word/styles.xml"):
+            with self.subTest(part):
+                linked = self.doc.unpacked_path / part
+                self.assertTrue(linked.samefile(self.unpacked / part))
+        self.doc["word/styles.xml"]
+        copy = self.doc.unpacked_path / "word/styles.xml"
+        self.assertFalse(copy.samefile(self.unpacked / "word/styles.xml"))
+
+    def test_save_includes_unopened_parts(self):
+        """Parts never opened are saved from the original directory"""
+        destination = self.temp_path / "saved"
+        self.doc.save(destination, validate=False)
+        for part in ("word/media/image1.png", "word/styles.xml"):
+            with self.subTest(part):
+                self.assertEqual(
+                    (destination / part).read_bytes(), (self.unpacked / part).read_bytes()
+                )
+        self.assertFalse((self.doc.unpacked_path / "word/styles.xml").exists())
+
+
+class TestDocumentBatch(DocumentTestCase):
+    BODY = """    <w:p w14:paraId="00000001">
+      <w:r><w:t>First</w:t></w:r>
+    </w:p>
+    <w:p w14:paraId="00000002">
+      <w:r><w:t>Second</w:t></w:r>
+    </w:p>
+"""
+    # Comment 5 exists, but has no markers in document.xml
+    PARTS = {
+        "word/comments.xml": (
+            f"<w:comments {NAMESPACES}>"
+            '<w:comment w:id="5" w:author="Other">'
+            '<w:p w14:paraId="0000AAAA"><w:r><w:t>Old</w:t></w:r></w:p>'
+            "</w:comment></w:comments>"
+        )
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.doc = Document(self.docx_path, id_seed=1)
+        self.editor = self.doc["word/document.xml"]
+
+    def marker_ids(self):
+        return {
+            self.editor.get_attribute(e, "w:id")
+            for e in self.editor.find_all("w:commentRangeStart")
+        }
+
+    def comment_texts(self):
+        comments = self.doc["word/comments.xml"]
+        return {
+            comments.get_attribute(c, "w:id"): "".join(
+                comments.get_text(t) for t in comments.find_all("w:t", c)
+            )
+            for c in comments.find_all("w:comment")
+        }
+
+    def test_failed_edit_keeps_comments_of_inserted_markers(self):
+        """Markers inserted before a failing edit still get their comments"""
+        first = self.editor.get_node(tag="w:p", contains="First")
+        second = self.editor.get_node(tag="w:p", contains="Second")
+        batch = self.doc.batch()
+        applied_id = batch.add_comment(first, first, "Applied")
+        batch.insert_after(second, "<w:p><w:r>")  # Malformed, fails on apply
+        skipped_id = batch.add_comment(second, second, "Skipped")
+
+        with self.assertRaises(Exception):
+            batch.apply()
+
+        self.assertEqual(self.marker_ids(), {str(applied_id)})
+        texts = self.comment_texts()
+        self.assertEqual(texts[str(applied_id)], "Applied")
+        self.assertNotIn(str(skipped_id), texts)
+        self.assertIn(applied_id, self.doc.existing_comments)
+        self.assertNotIn(skipped_id, self.doc.existing_comments)
+        batch.apply()  # The batch was cleared
+        self.assertEqual(self.marker_ids(), {str(applied_id)})
+
+    def test_reply_without_markers_changes_nothing(self):
+        """A reply to a comment without markers is rejected before any edit"""
+        first = self.editor.get_node(tag="w:p", contains="First")
+        batch = self.doc.batch()
+        batch.add_comment(first, first, "New")
+        batch.reply_to_comment(5, "Reply")
+
+        with self.assertRaisesRegex(ValueError, "parent comment id=5"):
+            batch.apply()
+
+        self.assertEqual(self.marker_ids(), set())
+        self.assertEqual(set(self.comment_texts()), {"5"})
+
+    def test_markers_are_collected_once(self):
+        """One pass finds the reply anchors; non-numeric marker IDs are skipped"""
+        first = self.editor.get_node(tag="w:p", contains="First")
+        comment_id = self.doc.add_comment(first, first, "Existing")
+        self.editor.append_to(
+            first,
+            '<w:commentRangeStart w:id="draft"/>'
+            '<w:r><w:commentReference w:id="draft"/></w:r>',
+        )
+        with mock.patch.object(
+            self.editor, "find_all", wraps=self.editor.find_all
+        ) as find_all:
+            with self.doc.batch() as batch:
+                replies = [batch.reply_to_comment(comment_id, "Reply") for _ in "ab"]
+        scans = [c for c in find_all.call_args_list if c.args == ("w:commentReference",)]
+        self.assertEqual(len(scans), 1)
+        self.assertEqual(
+            self.marker_ids(), {"draft", str(comment_id), *map(str, replies)}
+        )
+
+    def test_markers_removed_in_the_batch(self):
+        """A reply whose parent markers were replaced earlier in the batch fails"""
+        first = self.editor.get_node(tag="w:p", contains="First")
+        comment_id = self.doc.add_comment(first, first, "Existing")
+        batch = self.doc.batch()
+        batch.replace_node(first, "<w:p><w:r><w:t>Rewritten</w:t></w:r></w:p>")
+        batch.reply_to_comment(comment_id, "Reply")
+        with self.assertRaisesRegex(ValueError, f"parent comment id={comment_id}"):
+            batch.apply()
+
+
+if __name__ == "__main__":
+    unittest.main()
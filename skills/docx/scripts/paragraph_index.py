@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Compact index of paragraphs and runs keyed by w14:paraId.
+
+Line numbers shift after every insert, but w14:paraId values do not. ParagraphIndex
+gives O(1) access to paragraphs by paraId for the whole of an editing session,
+together with their text, style and tracked change flags. Values are stored column
+by column (arrays of codes and flags rather than an object per paragraph), so the
+index stays small and quick to scan even for very large documents.
+
+The index follows every change made through the editor (insert_*, replace_node,
+suggest_deletion, replace_text, ...): affected paragraphs are re-read the next time
+the index is used.
+
+Usage:
+    index = doc["word/document.xml"].paragraph_index
+
+    para = index.element("3A2F19C4")
+    print(index.text("3A2F19C4"), index.style("3A2F19C4"))
+    for run, offset, flags in index.runs("3A2F19C4"):
+        ...
+
+    headings = index.find(style="Heading1")
+    redlined = index.find(flags=TRACKED_CHANGES)
+    para_ids = index.find(contains="Governing Law")
+"""
+
+import html
+from array import array
+
+# Tracked change flags of paragraphs and runs
+INSERTED = 1  # run inside (paragraph containing) a w:ins
+DELETED = 2  # run inside (paragraph containing) a w:del
+MOVED = 4  # run inside (paragraph containing) a w:moveFrom or w:moveTo
+MARK_CHANGED = 8  # the paragraph mark itself is inserted or deleted
+TRACKED_CHANGES = INSERTED | DELETED | MOVED | MARK_CHANGED
+
+_CHANGE_FLAGS = {
+    "w:ins": INSERTED,
+    "w:del": DELETED,
+    "w:moveFrom": MOVED,
+    "w:moveTo": MOVED,
+}
+
+
+class ParagraphIndex:
+    """
+    Columnar index of the paragraphs and runs of a WordprocessingML part.
+
+    Every paragraph gets a row that stays the same for as long as the paragraph is
+    in the document; rows of removed paragraphs are left empty. Runs live in shared
+    run columns and each paragraph row points to its slice of them.
+
+    The index is an observer of the editor's node index, so it is told about every
+    change made through the editor, and it is rebuilt whenever the editor notices
+    direct changes to the DOM. A paraId that is not found makes the index rebuild
+    once, in case of direct changes the editor did not notice; call reset() after
+    other direct changes.
+    """
+
+    def __init__(self, editor):
+        """
+        Create the index; it is built on first use.
+
+        Args:
+            editor: DocxXMLEditor or LxmlDocxXMLEditor of a WordprocessingML part
+        """
+        self.editor = editor
+        self.reset()
+
+    def reset(self):
+        """Drop all rows so that the index is rebuilt from the DOM on next use."""
+        self._built = False
+        # Paragraph columns, indexed by row
+        self._elements = []  # w:p element, None once removed
+        self._ids = []  # w14:paraId, None if absent
+        self._texts = []  # text of the paragraph's w:t elements
+        self._styles = array("H")  # code into _style_names
+        self._flags = bytearray()
+        self._run_first = array("I")  # row of the paragraph's first run
+        self._run_count = array("I")
+        # Run columns, indexed by run row
+        self._runs = []  # w:r element
+        self._run_offsets = array("I")  # offset of the run's text in the paragraph
+        self._run_flags = bytearray()
+        self._live_runs = 0
+        # Lookups
+        self._style_names = [""]
+        self._style_codes = {"": 0}
+        self._row_of = {}  # w:p element -> row
+        self._by_id = {}  # paraId -> row
+        self._stale = {}  # rows to re-read, used as an ordered set
+        self._order = None  # rows in document order, rebuilt after moves
+        self._fresh = False  # just rebuilt for a missing paraId, unchanged since
+
+    def __len__(self):
+        """Return the number of paragraphs in the part."""
+        self._update()
+        return len(self._row_of)
+
+    def __contains__(self, para_id):
+        """Check whether a paragraph with this w14:paraId exists."""
+        try:
+            self._row(para_id)
+        except ValueError:
+            return False
+        return True
+
+    def element(self, para_id):
+        """
+        Return the w:p element with a given w14:paraId.
+
+        Args:
+            para_id: The w14:paraId value (e.g., "3A2F19C4")
+
+        Returns:
+            The w:p element
+
+        Raises:
+            ValueError: If no paragraph has this paraId
+        """
+        elem = self._elements[self._row(para_id)]
+        # The caller may modify the returned node directly
+        self.editor._handed_out.add(elem)
+        return elem
+
+    def text(self, para_id):
+        """Return the text of a paragraph (its w:t content, without deleted text)."""
+        return self._texts[self._row(para_id)]
+
+    def style(self, para_id):
+        """Return the paragraph style ID (w:pStyle), or "" for the default style."""
+        return self._style_names[self._styles[self._row(para_id)]]
+
+    def flags(self, para_id):
+        """Return the tracked change flags of a paragraph (INSERTED, DELETED, ...)."""
+        return self._flags[self._row(para_id)]
+
+    def runs(self, para_id):
+        """
+        Return the runs of a paragraph, excluding those of nested paragraphs.
+
+        Args:
+            para_id: The w14:paraId value
+
+        Returns:
+            list: (run, offset, flags) per w:r in document order, where offset is
+            the position of the run's text in text(para_id)
+        """
+        row = self._row(para_id)
+        first = self._run_first[row]
+        rows = range(first, first + self._run_count[row])
+        for r in rows:
+            self.editor._handed_out.add(self._runs[r])
+        return [(self._runs[r], self._run_offsets[r], self._run_flags[r]) for r in rows]
+
+    def para_ids(self):
+        """Return the w14:paraId of every paragraph that has one, in document order."""
+        self._update()
+        return [self._ids[row] for row in self._ordered_rows() if self._ids[row]]
+
+    def find(self, contains=None, style=None, flags=0):
+        """
+        Find paragraphs by text, style and tracked change flags.
+
+        Args:
+            contains: Text the paragraph must contain (entity notation supported)
+            style: Paragraph style ID the paragraph must have ("" for the default)
+            flags: Flags of which the paragraph must have at least one
+
+        Returns:
+            list: w14:paraId values of the matching paragraphs, in document order
+
+        Example:
+            index.find(contains="Governing Law")
+            index.find(style="Heading1")
+            index.find(flags=INSERTED | DELETED)
+        """
+        self._update()
+        contains = html.unescape(contains) if contains is not None else None
+        code = None
+        if style is not None:
+            code = self._style_codes.get(style)
+            if code is None:
+                return []
+        return [
+            self._ids[row]
+            for row in self._ordered_rows()
+            if self._ids[row]
+            and (code is None or self._styles[row] == code)
+            and (not flags or self._flags[row] & flags)
+            and (contains is None or contains in self._texts[row])
+        ]
+
+    # ==================== Observer ====================
+
+    def added(self, nodes):
+        """Record nodes inserted through the editor."""
+        if not self._built:
+            return
+        self._fresh = False
+        editor = self.editor
+        for node in nodes:
+            if not editor.is_element(node):
+                continue
+            self._touch(editor.get_parent(node))
+            for paragraph in self._paragraphs_in(node):
+                row = self._row_of.get(paragraph)
+                if row is None:
+                    self._new_row(paragraph)
+                else:
+                    self._stale[row] = None
+                self._order = None
+
+    def removed(self, node, parent):
+        """Record a node detached through the editor."""
+        if not self._built:
+            return
+        self._fresh = False
+        self._touch(parent)
+        if self.editor.is_element(node):
+            for paragraph in self._paragraphs_in(node):
+                row = self._row_of.pop(paragraph, None)
+                if row is not None:
+                    self._drop_row(row)
+
+    # ==================== Private ====================
+
+    def _update(self):
+        """Build the index or re-read the paragraphs changed since the last use."""
+        # Resets this index if the editor noticed direct changes to the DOM
+        self.editor._sync_index()
+        if not self._built:
+            self._built = True
+            for paragraph in self.editor.find_all("w:p"):
+                self._new_row(paragraph)
+            self._order = list(range(len(self._elements)))
+        for row in self._stale:
+            self._read_row(row)
+        self._stale.clear()
+        # Runs of re-read paragraphs are appended; drop old slices once they dominate
+        if len(self._runs) > 2 * self._live_runs + 1024:
+            self._compact_runs()
+
+    def _row(self, para_id):
+        """Return the row of a paraId, checked against the live DOM."""
+        self._update()
+        row = self._by_id.get(para_id)
+        if row is not None:
+            elem = self._elements[row]
+            if self._read_id(elem) == para_id and self.editor._index.is_attached(elem):
+                return row
+
+        # Not indexed: only possible if the DOM was modified directly. Rebuild once,
+        # then trust the index until the next change.
+        if not self._fresh:
+            self.reset()
+            self._update()
+            self._fresh = True
+            row = self._by_id.get(para_id)
+            if row is not None:
+                return row
+        raise ValueError(
+            f"Paragraph not found: w14:paraId={para_id}. "
+            f"Verify the paraId, or search with find(contains=...)."
+        )
+
+    def _ordered_rows(self):
+        if self._order is None:
+            self._order = [
+                self._row_of[p] for p in self.editor.find_all("w:p") if p in self._row_of
+            ]
+        return self._order
+
+    def _paragraphs_in(self, node):
+        """Return node and its descendants that are w:p elements."""
+        paragraphs = self.editor.find_all("w:p", node)
+        if self.editor.get_tag(node) == "w:p":
+            paragraphs.insert(0, node)
+        return paragraphs
+
+    def _touch(self, node):
+        """Mark the paragraphs enclosing a changed node as stale."""
+        editor = self.editor
+        while node is not None and editor.is_element(node):
+            row = self._row_of.get(node)
+            if row is not None:
+                self._stale[row] = None
+            node = editor.get_parent(node)
+
+    def _new_row(self, paragraph):
+        row = len(self._elements)
+        self._elements.append(paragraph)
+        self._ids.append(None)
+        self._texts.append("")
+        self._styles.append(0)
+        self._flags.append(0)
+        self._run_first.append(0)
+        self._run_count.append(0)
+        self._row_of[paragraph] = row
+        self._stale[row] = None
+        return row
+
+    def _drop_row(self, row):
+        para_id = self._ids[row]
+        if para_id is not None and self._by_id.get(para_id) == row:
+            del self._by_id[para_id]
+        self._elements[row] = None
+        self._ids[row] = None
+        self._texts[row] = ""
+        self._styles[row] = 0
+        self._flags[row] = 0
+        self._live_runs -= self._run_count[row]
+        self._run_count[row] = 0
+        self._stale.pop(row, None)
+        self._order = None
+
+    def _read_id(self, paragraph):
+        try:
+            return self.editor.get_attribute(paragraph, "w14:paraId") or None
+        except ValueError:
+            # w14 namespace not declared in this part
+            return None
+
+    def _read_row(self, row):
+        """Re-read the columns of one paragraph from the DOM."""
+        editor = self.editor
+        paragraph = self._elements[row]
+
+        old_id, para_id = self._ids[row], self._read_id(paragraph)
+        if old_id is not None and self._by_id.get(old_id) == row:
+            del self._by_id[old_id]
+        if para_id is not None:
+            self._by_id[para_id] = row
+        self._ids[row] = para_id
+
+        style, flags = "", 0
+        for pPr in editor.get_children(paragraph):
+            if editor.get_tag(pPr) != "w:pPr":
+                continue
+            for prop in editor.get_children(pPr):
+                tag = editor.get_tag(prop)
+                if tag == "w:pStyle":
+                    style = editor.get_attribute(prop, "w:val")
+                elif tag == "w:rPr":
+                    if any(
+                        editor.get_tag(mark) in ("w:ins", "w:del")
+                        for mark in editor.get_children(prop)
+                    ):
+                        flags |= MARK_CHANGED
+            break
+
+        self._live_runs -= self._run_count[row]
+        first = len(self._runs)
+        parts = []
+        offset = 0
+        for run in editor.find_all("w:r", paragraph):
+            run_flags = 0
+            node = editor.get_parent(run)
+            while node is not paragraph:
+                tag = editor.get_tag(node)
+                if tag == "w:p":
+                    break  # run of a nested paragraph
+                run_flags |= _CHANGE_FLAGS.get(tag, 0)
+                node = editor.get_parent(node)
+            else:
+                self._runs.append(run)
+                self._run_offsets.append(offset)
+                self._run_flags.append(run_flags)
+                flags |= run_flags
+                for child in editor.get_children(run):
+                    if editor.get_tag(child) == "w:t":
+                        text = editor.get_text(child)
+                        parts.append(text)
+                        offset += len(text)
+
+        if style not in self._style_codes:
+            self._style_codes[style] = len(self._style_names)
+            self._style_names.append(style)
+        self._texts[row] = "".join(parts)
+        self._styles[row] = self._style_codes[style]
+        self._flags[row] = flags
+        self._run_first[row] = first
+        self._run_count[row] = len(self._runs) - first
+        self._live_runs += self._run_count[row]
+
+    def _compact_runs(self):
+        """Rewrite the run columns without the slices of re-read or removed paragraphs."""
+        runs, offsets, run_flags = [], array("I"), bytearray()
+        for row, count in enumerate(self._run_count):
+            first = self._run_first[row]
+            self._run_first[row] = len(runs)
+            runs.extend(self._runs[first : first + count])
+            offsets.extend(self._run_offsets[first : first + count])
+            run_flags.extend(self._run_flags[first : first + count])
+        self._runs, self._run_offsets, self._run_flags = runs, offsets, run_flags
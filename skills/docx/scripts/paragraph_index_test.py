@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+
+from .paragraph_index import DELETED, INSERTED
+from .testing import EditorTestCase, both_engines
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+@both_engines
+class TestParagraphIndex(EditorTestCase):
+    BODY = """    <w:p w14:paraId="00000001">
+      <w:pPr><w:pStyle w:val="Heading1"/></w:pPr>
+      <w:r><w:t>Definitions</w:t></w:r>
+    </w:p>
+    <w:p w14:paraId="00000002">
+      <w:r><w:t xml:space="preserve">The </w:t></w:r>
+      <w:ins w:id="1" w:author="Other" w:date="2024-01-01T00:00:00Z">
+        <w:r><w:t>Seller</w:t></w:r>
+      </w:ins>
+      <w:r><w:t xml:space="preserve"> shall deliver</w:t></w:r>
+    </w:p>
+"""
+    editor_kwargs = {"rsid": "00BB0000"}
+
+    def setUp(self):
+        super().setUp()
+        self.index = self.editor.paragraph_index
+
+    def test_columns(self):
+        """Text, style, flags and runs are available by paraId"""
+        self.assertEqual(self.index.para_ids(), ["00000001", "00000002"])
+        self.assertEqual(self.index.style("00000001"), "Heading1")
+        self.assertEqual(self.index.text("00000002"), "The Seller shall deliver")
+        self.assertEqual(self.index.flags("00000002"), INSERTED)
+        offsets = [offset for _, offset, _ in self.index.runs("00000002")]
+        self.assertEqual(offsets, [0, 4, 10])
+        self.assertEqual(self.index.find(style="Heading1"), ["00000001"])
+        self.assertEqual(self.index.find(contains="Seller"), ["00000002"])
+
+    def test_follows_edits(self):
+        """Inserted, changed and replaced paragraphs are updated incrementally"""
+        first = self.index.element("00000001")
+        nodes = self.editor.insert_after(first, "<w:p><w:r><w:t>New</w:t></w:r></w:p>")
+        new_id = self.editor.get_attribute(nodes[0], "w14:paraId")
+        self.assertEqual(self.index.para_ids()[1], new_id)
+        self.assertEqual(self.index.text(new_id), "New")
+
+        self.editor.suggest_deletion(self.index.element(new_id))
+        self.assertEqual(self.index.text(new_id), "")
+        self.assertEqual(self.index.flags(new_id), DELETED)
+
+        self.editor.replace_node(
+            self.index.element("00000002"),
+            '<w:p w14:paraId="00000002"><w:r><w:t>Replaced</w:t></w:r></w:p>',
+        )
+        self.assertEqual(self.index.text("00000002"), "Replaced")
+        self.assertEqual(len(self.index), 3)
+
+    def test_unknown_para_id(self):
+        """Unknown paraIds raise ValueError"""
+        self.assertNotIn("0000FFFF", self.index)
+        with self.assertRaises(ValueError):
+            self.index.element("0000FFFF")
+
+    def test_unknown_para_ids_rebuild_once(self):
+        """Repeated misses rebuild the columns once instead of scanning every time"""
+        self.assertEqual(len(self.index), 2)
+        with mock.patch.object(
+            self.editor, "find_all", wraps=self.editor.find_all
+        ) as find_all:
+            for _ in range(3):
+                self.assertNotIn("0000FFFF", self.index)
+        scans = [c for c in find_all.call_args_list if c.args == ("w:p",)]
+        self.assertEqual(len(scans), 1)
+
+    def test_returned_nodes(self):
+        """element() and runs() follow the get_node rule for direct changes"""
+        para = self.index.element("00000001")
+        self.index.runs("00000002")
+        self.assertFalse(self.editor.dirty)
+        if self.engine == "lxml":
+            para.set(self.editor._qname("w14:paraId", attribute=True), "0000000A")
+        else:
+            para.setAttribute("w14:paraId", "0000000A")
+        self.assertEqual(self.index.text("0000000A"), "Definitions")
+        self.assertNotIn("00000001", self.index)
+        self.assertTrue(self.editor.dirty)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Paragraph text model for find and replace across runs.
+
+Word splits visible text over any number of <w:r> runs, so a phrase is rarely in a
+single w:t element. ParagraphText joins the w:t text of a paragraph (the same text
+search.search_document matches against) and maps character offsets back to the
+run and w:t element holding each character.
+
+replace_text() builds on it to redline many replacements in one pass: only the
+words that actually differ are wrapped in <w:del>/<w:ins>, and every affected run
+is split exactly once, however many replacements touch it.
+
+Usage:
+    editor = doc["word/document.xml"]
+
+    # Tracked replacements, matching text across runs
+    editor.replace_text("Seller", "Vendor")
+    editor.replace_text(r"(\\d+) days", r"\\1 business days", regex=True)
+    editor.replace_text({"Seller": "Vendor", "Buyer": "Purchaser"})
+
+    # Map an offset in paragraph text to its run
+    para = editor.get_node(tag="w:p", contains="Governing Law")
+    text = ParagraphText(editor, para)
+    run, t_elem, offset = text.locate(text.text.index("Law"))
+"""
+
+import html
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any
+
+# Containers whose runs are already tracked changes; their text is never edited
+TRACKED_CONTAINERS = {"w:ins", "w:del", "w:moveFrom", "w:moveTo"}
+
+# Units kept whole by minimal edits: words, whitespace runs, single other characters
+_TOKEN = re.compile(r"\w+|\s+|[^\w\s]")
+
+
+@dataclass
+class TextSpan:
+    """The text of one w:t element within its paragraph's text."""
+
+    run: Any  # enclosing w:r element
+    text_elem: Any  # the w:t element
+    start: int  # offset of the first character in the paragraph text
+    end: int  # offset just past the last character
+    editable: bool  # False for runs inside existing tracked changes
+
+
+class ParagraphText:
+    """
+    Text of a w:p element with a map from character offsets to runs.
+
+    The text is the concatenation of all w:t elements in the paragraph, excluding
+    those of nested paragraphs (e.g. in text boxes), which have their own text.
+
+    Attributes:
+        paragraph: The w:p element
+        text: The paragraph text
+        spans: TextSpan for each w:t element, in document order
+    """
+
+    def __init__(self, editor, paragraph):
+        """
+        Build the text model of a paragraph.
+
+        Args:
+            editor: XMLEditor or LxmlXMLEditor holding the paragraph
+            paragraph: The w:p element
+        """
+        self.paragraph = paragraph
+        self.spans = []
+        parts = []
+        offset = 0
+        # run -> editable, or None when the run belongs to a nested paragraph
+        runs = {}
+        for text_elem in editor.find_all("w:t", paragraph):
+            run = editor.get_parent(text_elem)
+            if run not in runs:
+                runs[run] = _classify_run(editor, run, paragraph)
+            if runs[run] is None:
+                continue
+            text = editor.get_text(text_elem)
+            self.spans.append(
+                TextSpan(run, text_elem, offset, offset + len(text), runs[run])
+            )
+            parts.append(text)
+            offset += len(text)
+        self.text = "".join(parts)
+        self._starts = [span.start for span in self.spans]
+        self._run_starts = {}
+        for span in self.spans:
+            self._run_starts.setdefault(span.run, span.start)
+
+    def locate(self, offset):
+        """
+        Find the run and w:t element holding a character of the paragraph text.
+
+        Args:
+            offset: Character offset in the paragraph text
+
+        Returns:
+            tuple: (run, text_elem, offset within the w:t text)
+
+        Raises:
+            ValueError: If offset is outside the paragraph text
+        """
+        span = self.span_at(offset)
+        return span.run, span.text_elem, offset - span.start
+
+    def span_at(self, offset):
+        """Return the TextSpan holding the character at offset (see locate)."""
+        if not 0 <= offset < len(self.text):
+            raise ValueError(
+                f"Offset {offset} is outside the paragraph text (length {len(self.text)})"
+            )
+        index = bisect_right(self._starts, offset) - 1
+        # Skip empty w:t elements that start at the same offset
+        while self.spans[index].end <= offset:
+            index -= 1
+        return self.spans[index]
+
+    def spans_between(self, start, end):
+        """Return the TextSpans with characters in the range [start, end)."""
+        index = bisect_right(self._starts, start) - 1
+        spans = []
+        for span in self.spans[max(index, 0) :]:
+            if span.start >= end:
+                break
+            if span.end > start and span.end > span.start:
+                spans.append(span)
+        return spans
+
+    def run_start(self, run):
+        """Return the offset of a run's first character in the paragraph text."""
+        return self._run_starts[run]
+
+
+def replace_text(
+    editor, pattern, replacement=None, regex=False, ignore_case=False, elem=None
+):
+    """
+    Replace text across runs, recording each replacement as a tracked change.
+
+    Only the words that differ between the old and new text are marked: replacing
+    "Section 5" with "Section 6" deletes "5" and inserts "6". Inserted text takes the
+    formatting of the first replaced character. Matches that touch existing tracked
+    changes are left unchanged.
+
+    Args:
+        editor: DocxXMLEditor or LxmlDocxXMLEditor
+        pattern: Text to find, a regex with regex=True, or a dict mapping texts to
+                 their replacements (all applied in one pass). Literal text supports
+                 entity notation (&#8220;) like get_node.
+        replacement: Replacement text (may use \\1 group references with regex=True),
+                     or a callable taking the re.Match and returning the text.
+                     Not used when pattern is a dict.
+        regex: Treat pattern as a regular expression (default: False)
+        ignore_case: Match case-insensitively (default: False)
+        elem: Only replace within this element, e.g. a w:p or w:tbl (default: whole part)
+
+    Returns:
+        int: Number of replacements made
+    """
+    compiled, replace = _compile(pattern, replacement, regex, ignore_case)
+
+    if elem is None:
+        paragraphs = editor.find_all("w:p")
+    elif editor.get_tag(elem) == "w:p":
+        paragraphs = [elem, *editor.find_all("w:p", elem)]
+    else:
+        paragraphs = editor.find_all("w:p", elem)
+
+    count = 0
+    for paragraph in paragraphs:
+        model = ParagraphText(editor, paragraph)
+        if not model.text:
+            continue
+        edits = []
+        for match in compiled.finditer(model.text):
+            if match.start() == match.end():
+                continue
+            edit = _minimal_edit(match.start(), match.group(), replace(match))
+            if edit is not None and _is_editable(model, *edit):
+                edits.append(edit)
+        if edits:
+            _apply_edits(editor, model, edits)
+            count += len(edits)
+    return count
+
+
+# ==================== Private: Matching ====================
+
+
+def _compile(pattern, replacement, regex, ignore_case):
+    """Return the compiled pattern and a function giving each match's replacement."""
+    flags = re.IGNORECASE if ignore_case else 0
+
+    if isinstance(pattern, dict):
+        mapping = {html.unescape(old): html.unescape(new) for old, new in pattern.items()}
+        if ignore_case:
+            mapping = {old.casefold(): new for old, new in mapping.items()}
+        # Longest first, so that "Seller's" wins over "Seller"
+        alternatives = sorted(filter(None, mapping), key=len, reverse=True)
+        if not alternatives:
+            raise ValueError("No texts to replace")
+        compiled = re.compile("|".join(map(re.escape, alternatives)), flags)
+        if ignore_case:
+            return compiled, lambda match: mapping[match.group().casefold()]
+        return compiled, lambda match: mapping[match.group()]
+
+    if replacement is None:
+        raise ValueError("replacement is required unless pattern is a dict")
+    if regex:
+        compiled = re.compile(pattern, flags)
+    else:
+        compiled = re.compile(re.escape(html.unescape(pattern)), flags)
+    if callable(replacement):
+        return compiled, replacement
+    if regex:
+        return compiled, lambda match: match.expand(replacement)
+    replacement = html.unescape(replacement)
+    return compiled, lambda match: replacement
+
+
+def _minimal_edit(start, old, new):
+    """
+    Reduce a replacement to the words that differ.
+
+    Common leading and trailing words (and the spaces and punctuation between them)
+    are left untouched, so "30 days" -> "45 days" only replaces "30". Words are not
+    split, which keeps the redline readable.
+
+    Returns:
+        tuple: (delete_start, delete_end, inserted_text), or None if nothing changes
+    """
+    if old == new:
+        return None
+    old_tokens = _TOKEN.findall(old)
+    new_tokens = _TOKEN.findall(new)
+    prefix = 0
+    limit = min(len(old_tokens), len(new_tokens))
+    while prefix < limit and old_tokens[prefix] == new_tokens[prefix]:
+        prefix += 1
+    suffix = 0
+    limit -= prefix
+    while suffix < limit and old_tokens[-1 - suffix] == new_tokens[-1 - suffix]:
+        suffix += 1
+
+    head = sum(map(len, old_tokens[:prefix]))
+    old_tail = sum(map(len, old_tokens[len(old_tokens) - suffix :]))
+    new_tail = sum(map(len, new_tokens[len(new_tokens) - suffix :]))
+    return start + head, start + len(old) - old_tail, new[head : len(new) - new_tail]
+
+
+def _is_editable(model, start, end, text):
+    """Check that an edit only touches runs outside existing tracked changes."""
+    if any(not span.editable for span in model.spans_between(start, end)):
+        return False
+    if text:
+        return _insertion_span(model, start, end).editable
+    return True
+
+
+def _insertion_span(model, start, end):
+    """Return the span whose run receives an edit's inserted text.
+
+    Text is inserted right after the character before it (the last deleted one, for
+    a replacement), so it continues that run; at the very start it goes in the first.
+    """
+    return model.span_at(end - 1) if end > 0 else model.span_at(0)
+
+
+# ==================== Private: Run Splitting ====================
+
+
+def _classify_run(editor, run, paragraph):
+    """Return whether a run's text is editable, or None if it is not part of paragraph.
+
+    Runs of nested paragraphs belong to those paragraphs; runs inside tracked changes
+    are kept as they are.
+    """
+    if editor.get_tag(run) != "w:r":
+        return False
+    editable = True
+    node = editor.get_parent(run)
+    while node is not paragraph:
+        tag = editor.get_tag(node)
+        if tag == "w:p":
+            return None
+        if tag in TRACKED_CONTAINERS:
+            editable = False
+        node = editor.get_parent(node)
+    return editable
+
+
+def _apply_edits(editor, model, edits):
+    """Split every run touched by the edits of one paragraph exactly once."""
+    # run -> (deleted ranges, {position: [(inserted text, run giving formatting)]})
+    changes = {}
+
+    def changes_for(run):
+        if run not in changes:
+            changes[run] = ([], {})
+        return changes[run]
+
+    for start, end, text in edits:
+        for span in model.spans_between(start, end):
+            run_start = model.run_start(span.run)
+            deletions, _ = changes_for(span.run)
+            range_start = max(start, span.start) - run_start
+            range_end = min(end, span.end) - run_start
+            if deletions and deletions[-1][1] == range_start:
+                deletions[-1] = (deletions[-1][0], range_end)
+            else:
+                deletions.append((range_start, range_end))
+        if text:
+            target = _insertion_span(model, start, end).run
+            source = model.span_at(start).run if end > start else target
+            _, insertions = changes_for(target)
+            position = end - model.run_start(target)
+            insertions.setdefault(position, []).append((text, source))
+
+    for run, (deletions, insertions) in changes.items():
+        editor._split_run(run, _plan_run(editor, run, deletions, insertions))
+
+
+def _plan_run(editor, run, deletions, insertions):
+    """
+    Divide a run's content into pieces to keep, delete and insert.
+
+    Args:
+        editor: Editor holding the run
+        run: The w:r element
+        deletions: Non-overlapping (start, end) ranges of the run's text to delete
+        insertions: {position: [(text, source_run)]} of text to insert right after
+                    the character before position (at the very start for 0)
+
+    Returns:
+        list: (status, items, source_run) tuples in document order, where status is
+        "keep", "delete" or "insert", items are ("text", str) or ("node", element),
+        and source_run is the run whose properties the new run takes
+    """
+    pieces = []
+
+    def add(status, kind, value, source=run):
+        if pieces and pieces[-1][0] == status and pieces[-1][2] is source:
+            items = pieces[-1][1]
+            if kind == "text" and items[-1][0] == "text":
+                items[-1] = ("text", items[-1][1] + value)
+            else:
+                items.append((kind, value))
+        else:
+            pieces.append((status, [(kind, value)], source))
+
+    def add_insertions(position):
+        for text, source in insertions.get(position, ()):
+            add("insert", "text", text, source)
+
+    cuts = sorted({p for deletion in deletions for p in deletion} | set(insertions))
+    add_insertions(0)
+    offset = 0
+    for child in editor.get_children(run):
+        tag = editor.get_tag(child)
+        if tag == "w:rPr":
+            continue
+        if tag != "w:t":
+            # Tabs, breaks, drawings, ... are deleted only when inside a deleted range
+            inside = any(start < offset < end for start, end in deletions)
+            add("delete" if inside else "keep", "node", child)
+            continue
+
+        text = editor.get_text(child)
+        end = offset + len(text)
+        points = [offset, *(p for p in cuts if offset < p < end), end]
+        for start, stop in zip(points, points[1:]):
+            if start == stop:
+                continue
+            deleted = any(a <= start < b for a, b in deletions)
+            add("delete" if deleted else "keep", "text", text[start - offset : stop - offset])
+            add_insertions(stop)
+        offset = end
+    return pieces
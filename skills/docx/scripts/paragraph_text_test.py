@@ -0,0 +1,79 @@
+import unittest
+
+from .paragraph_text import ParagraphText
+from .testing import EditorTestCase, both_engines
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+@both_engines
+class TestReplaceText(EditorTestCase):
+    BODY = """    <w:p w14:paraId="00000001">
+      <w:r w:rsidR="00AA0001">
+        <w:rPr><w:b/></w:rPr>
+        <w:t xml:space="preserve">The Sel</w:t>
+      </w:r>
+      <w:r w:rsidR="00AA0002">
+        <w:t>ler pays within 30 days</w:t>
+        <w:tab/>
+        <w:t xml:space="preserve"> Section 5</w:t>
+      </w:r>
+    </w:p>
+    <w:p w14:paraId="00000002">
+      <w:ins w:id="7" w:author="Other" w:date="2024-01-01T00:00:00Z">
+        <w:r><w:t>Seller</w:t></w:r>
+      </w:ins>
+      <w:r><w:t xml:space="preserve"> and Seller</w:t></w:r>
+    </w:p>
+"""
+    editor_kwargs = {"rsid": "00BB0000", "author": "Tester"}
+
+    def paragraph(self, para_id):
+        return self.editor.get_node(tag="w:p", attrs={"w14:paraId": para_id})
+
+    def test_offsets_map_to_runs(self):
+        """Paragraph text spans runs and offsets resolve to the right w:t"""
+        model = ParagraphText(self.editor, self.paragraph("00000001"))
+        self.assertEqual(model.text, "The Seller pays within 30 days Section 5")
+        run, text_elem, offset = model.locate(model.text.index("ler"))
+        self.assertEqual(self.editor.get_attribute(run, "w:rsidR"), "00AA0002")
+        self.assertEqual(self.editor.get_text(text_elem)[offset:], "ler pays within 30 days")
+
+    def test_replacement_across_runs(self):
+        """A match split across runs is deleted in both and inserted once"""
+        count = self.editor.replace_text("Seller", "Vendor", elem=self.paragraph("00000001"))
+        self.assertEqual(count, 1)
+        self.assertEqual(self.texts("w:delText"), ["Sel", "ler"])
+        (inserted,) = self.editor.find_all("w:ins", self.paragraph("00000001"))
+        self.assertEqual(self.editor.get_attribute(inserted, "w:author"), "Tester")
+        # The insertion takes the formatting of the first replaced character
+        self.assertTrue(self.editor.find_all("w:b", inserted))
+        model = ParagraphText(self.editor, self.paragraph("00000001"))
+        self.assertEqual(model.text, "The Vendor pays within 30 days Section 5")
+
+    def test_only_changed_words_are_marked(self):
+        """Common leading and trailing words are left out of the tracked change"""
+        count = self.editor.replace_text(
+            {"30 days": "45 days", "Section 5": "Section 6"}
+        )
+        self.assertEqual(count, 2)
+        self.assertEqual(self.texts("w:delText"), ["30", "5"])
+        self.assertIn("45", self.texts("w:t"))
+        self.assertEqual(len(self.editor.find_all("w:tab")), 1)
+
+    def test_existing_tracked_changes_are_kept(self):
+        """Matches inside another author's insertion are skipped"""
+        count = self.editor.replace_text("Seller", "Vendor", elem=self.paragraph("00000002"))
+        self.assertEqual(count, 1)
+        self.assertEqual(self.texts("w:delText"), ["Seller"])
+        self.assertEqual(len(self.editor.find_all("w:ins")), 2)
+
+    def test_regex_replacement(self):
+        """Regex group references are expanded"""
+        count = self.editor.replace_text(r"(\d+) days", r"\1 business days", regex=True)
+        self.assertEqual(count, 1)
+        self.assertEqual(self.texts("w:delText"), [])
+        self.assertIn("business ", self.texts("w:t"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Streaming text search over word/document.xml.
+
+Finds literal or regex matches in paragraph text without building a DOM, so large
+documents can be searched in constant memory before deciding what to edit.
+Paragraph text is the concatenation of its w:t elements, so matches may span
+run boundaries.
+
+Usage:
+    from scripts.search import search_document
+
+    for match in search_document("unpacked/word/document.xml", "Governing Law"):
+        print(match.para_id, match.line_number, match.start, match.text)
+
+    # Regex search directly inside a .docx
+    for match in search_document("contract.docx", r"Section \\d+\\.\\d+", regex=True):
+        node = doc["word/document.xml"].get_node(
+            tag="w:p", attrs={"w14:paraId": match.para_id}
+        )
+"""
+
+import html
+import re
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+import lxml.etree
+
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W14_NAMESPACE = "http://schemas.microsoft.com/office/word/2010/wordml"
+
+_W_P = f"{{{W_NAMESPACE}}}p"
+_W_T = f"{{{W_NAMESPACE}}}t"
+_PARA_ID = f"{{{W14_NAMESPACE}}}paraId"
+
+
+@dataclass
+class TextMatch:
+    """A match of the search pattern inside one paragraph."""
+
+    para_id: Optional[str]  # w14:paraId of the paragraph, if present
+    paragraph_index: int  # 0-based position of the paragraph in the document
+    line_number: Optional[int]  # line of the <w:p> start tag in the XML file
+    start: int  # character offset of the match in the paragraph text
+    end: int  # character offset just past the match
+    text: str  # matched text
+    paragraph_text: str  # full text of the paragraph
+
+
+def search_document(
+    path, pattern: str, regex: bool = False, ignore_case: bool = False
+) -> Iterator[TextMatch]:
+    """
+    Stream matches of a pattern in the paragraphs of a Word document.
+
+    Args:
+        path: Path to word/document.xml (or another part), or to a .docx file
+        pattern: Text to find. Literal text supports entity notation (&#8220;)
+                 like XMLEditor.get_node; with regex=True it is a regular expression.
+        regex: Treat pattern as a regular expression (default: False)
+        ignore_case: Match case-insensitively (default: False)
+
+    Yields:
+        TextMatch: Matches in document order. Nested paragraphs (e.g. in text
+        boxes) are reported separately from the paragraph containing them.
+
+    Example:
+        matches = list(search_document("unpacked/word/document.xml", "Agreement"))
+        matches = list(search_document("doc.docx", r"\\$[\\d,]+", regex=True))
+    """
+    flags = re.IGNORECASE if ignore_case else 0
+    compiled = re.compile(pattern if regex else re.escape(html.unescape(pattern)), flags)
+
+    for index, para_id, line_number, text in iter_paragraphs(path):
+        for found in compiled.finditer(text):
+            if found.start() == found.end():
+                continue
+            yield TextMatch(
+                para_id=para_id,
+                paragraph_index=index,
+                line_number=line_number,
+                start=found.start(),
+                end=found.end(),
+                text=found.group(),
+                paragraph_text=text,
+            )
+
+
+def iter_paragraphs(path) -> Iterator[tuple]:
+    """
+    Stream (paragraph_index, para_id, line_number, text) for every w:p.
+
+    Parsed elements are released as soon as their outermost paragraph ends, so
+    memory use does not grow with document size.
+
+    Args:
+        path: Path to an XML part or to a .docx file (reads word/document.xml)
+    """
+    path = Path(path)
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf, zf.open("word/document.xml") as source:
+            yield from _iter_paragraphs(source)
+    else:
+        with open(path, "rb") as source:
+            yield from _iter_paragraphs(source)
+
+
+def _iter_paragraphs(source):
+    # Open paragraphs as [index, para_id, line_number, text parts]; nested
+    # paragraphs get their own entry and text goes to the innermost one
+    open_paragraphs = []
+    next_index = 0
+    for event, elem in lxml.etree.iterparse(
+        source,
+        events=("start", "end"),
+        tag=(_W_P, _W_T),
+        resolve_entities=False,
+        no_network=True,
+        load_dtd=False,
+    ):
+        if elem.tag == _W_P:
+            if event == "start":
+                open_paragraphs.append(
+                    [next_index, elem.get(_PARA_ID), elem.sourceline, []]
+                )
+                next_index += 1
+                continue
+
+            index, para_id, line_number, parts = open_paragraphs.pop()
+            yield index, para_id, line_number, "".join(parts)
+            if not open_paragraphs:
+                # Release the finished paragraph and everything before it,
+                # including finished rows and tables further up the tree
+                elem.clear(keep_tail=True)
+                node, parent = elem, elem.getparent()
+                while parent is not None:
+                    while node.getprevious() is not None:
+                        del parent[0]
+                    node, parent = parent, parent.getparent()
+        elif event == "end" and open_paragraphs and elem.text:
+            open_paragraphs[-1][3].append(elem.text)
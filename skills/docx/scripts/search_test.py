@@ -0,0 +1,88 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import lxml.etree
+
+from .search import iter_paragraphs, search_document
+from .testing import document_xml, write_docx
+
+BODY = """    <w:p w14:paraId="00000001">
+      <w:r><w:t>Governing </w:t></w:r>
+      <w:r><w:t>La</w:t></w:r>
+      <w:r><w:t>w applies.</w:t></w:r>
+    </w:p>
+    <w:p w14:paraId="00000002">
+      <w:del w:id="1" w:author="Alice" w:date="2024-01-01T00:00:00Z">
+        <w:r><w:delText>Old term</w:delText></w:r>
+      </w:del>
+      <w:ins w:id="2" w:author="Alice" w:date="2024-01-01T00:00:00Z">
+        <w:r><w:t>New term</w:t></w:r>
+      </w:ins>
+    </w:p>
+"""
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestSearchDocument(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name)
+        self.xml_path = self.temp_path / "document.xml"
+        self.xml_path.write_text(document_xml(BODY), encoding="utf-8")
+
+    def test_match_across_runs(self):
+        """Paragraph text joins its runs, so matches span run boundaries"""
+        (match,) = search_document(self.xml_path, "Governing Law")
+        self.assertEqual(match.para_id, "00000001")
+        self.assertEqual((match.paragraph_index, match.line_number), (0, 4))
+        self.assertEqual((match.start, match.end), (0, 13))
+        self.assertEqual(match.paragraph_text, "Governing Law applies.")
+
+    def test_deleted_text_is_skipped(self):
+        """Deleted text is not part of the paragraph text"""
+        self.assertEqual(list(search_document(self.xml_path, "Old term")), [])
+        (match,) = search_document(self.xml_path, "term")
+        self.assertEqual(match.para_id, "00000002")
+        self.assertEqual(match.paragraph_text, "New term")
+
+    def test_regex_in_docx(self):
+        """A .docx is searched in its word/document.xml"""
+        docx_path = self.temp_path / "input.docx"
+        write_docx(docx_path, BODY)
+        matches = search_document(docx_path, r"(new|law)\b", regex=True, ignore_case=True)
+        self.assertEqual([m.text for m in matches], ["Law", "New"])
+
+    def test_memory_is_released(self):
+        """Finished paragraphs and tables are removed from the parsed tree"""
+        paragraph = '    <w:p><w:r><w:t xml:space="preserve">Text {} </w:t></w:r></w:p>\n'
+        table = "    <w:tbl><w:tr><w:tc>{}</w:tc></w:tr></w:tbl>\n"
+        body = "".join(
+            paragraph.format(i) + table.format(paragraph.format(f"cell {i}"))
+            for i in range(2000)
+        )
+        self.xml_path.write_text(document_xml(body), encoding="utf-8")
+
+        roots = []
+        iterparse = lxml.etree.iterparse
+
+        def recording_iterparse(*args, **kwargs):
+            for event, elem in iterparse(*args, **kwargs):
+                if not roots:
+                    roots.append(elem.getroottree().getroot())
+                yield event, elem
+
+        sizes = []
+        with mock.patch.object(lxml.etree, "iterparse", recording_iterparse):
+            for _, _, _, text in iter_paragraphs(self.xml_path):
+                sizes.append(sum(1 for _ in roots[0].iter()))
+        self.assertEqual(len(sizes), 4000)
+        self.assertEqual(text, "Text cell 1999 ")
+        # 18000 elements in all; only lxml's read-ahead stays in memory
+        self.assertLess(max(sizes), 3000)
+
+
+if __name__ == "__main__":
+    unittest.main()
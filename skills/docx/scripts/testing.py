@@ -0,0 +1,153 @@
+"""
+Shared fixtures for the tests of the scripts package.
+
+EditorTestCase writes a word/document.xml built from the test case's BODY into a
+temporary directory and opens it with an editor. Decorating a test case with
+@both_engines also runs it with the lxml backend. DocumentTestCase writes a
+minimal .docx with that body instead, for tests of Document.
+
+Usage:
+    @both_engines
+    class TestSomething(EditorTestCase):
+        BODY = '''    <w:p w14:paraId="00000001">
+      <w:r><w:t>Text</w:t></w:r>
+    </w:p>
+'''
+
+        def test_text(self):
+            para = self.editor.get_node(tag="w:p", contains="Text")
+"""
+
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from .document import DocxXMLEditor, LxmlDocxXMLEditor
+
+NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:w14="http://schemas.microsoft.com/office/word/2010/wordml"'
+)
+
+CONTENT_TYPES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+  <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+  <Default Extension="xml" ContentType="application/xml"/>
+  <Default Extension="png" ContentType="image/png"/>
+  <Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+  <Override PartName="/word/settings.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.settings+xml"/>
+</Types>
+"""
+
+PACKAGE_RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+  <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>
+"""
+
+DOCUMENT_RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+  <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/settings" Target="settings.xml"/>
+</Relationships>
+"""
+
+
+def document_xml(body):
+    """Return a word/document.xml with body inside w:body, starting on line 4."""
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        f"<w:document {NAMESPACES}>\n"
+        "  <w:body>\n"
+        f"{body}"
+        "  </w:body>\n"
+        "</w:document>\n"
+    )
+
+
+def write_docx(path, body, parts=None, compresslevel=None):
+    """
+    Write a minimal .docx whose word/document.xml has body inside w:body.
+
+    Args:
+        path: Path of the .docx to write
+        body: Content of w:body, indented by four spaces
+        parts: Optional {member name: content} added to (or replacing) the parts
+        compresslevel: Deflate level of all members (default: zlib's)
+    """
+    members = {
+        "[Content_Types].xml": CONTENT_TYPES_XML,
+        "_rels/.rels": PACKAGE_RELS_XML,
+        "word/document.xml": document_xml(body),
+        "word/_rels/document.xml.rels": DOCUMENT_RELS_XML,
+        "word/settings.xml": f"<w:settings {NAMESPACES}/>",
+        **(parts or {}),
+    }
+    with zipfile.ZipFile(
+        path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel
+    ) as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+
+
+class EditorTestCase(unittest.TestCase):
+    """
+    Test case with self.editor open on a temporary document.xml.
+
+    Attributes:
+        BODY: Content of w:body, indented by four spaces
+        engine: "minidom" or "lxml"; set by @both_engines for the lxml copy
+        editor_classes: Editor class to use for each engine
+        editor_kwargs: Extra arguments for the editor constructor
+    """
+
+    BODY = ""
+    engine = "minidom"
+    editor_classes = {"minidom": DocxXMLEditor, "lxml": LxmlDocxXMLEditor}
+    editor_kwargs = {}
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name)
+        self.xml_path = self.temp_path / "document.xml"
+        self.xml_path.write_text(document_xml(self.BODY), encoding="utf-8")
+        self.editor = self.editor_classes[self.engine](
+            self.xml_path, **self.editor_kwargs
+        )
+
+    def texts(self, tag):
+        """Return the text of every tag element, in document order."""
+        return [self.editor.get_text(e) for e in self.editor.find_all(tag)]
+
+
+class DocumentTestCase(unittest.TestCase):
+    """
+    Test case with a minimal .docx at self.docx_path.
+
+    Attributes:
+        BODY: Content of w:body, indented by four spaces
+        PARTS: Extra {member name: content} for the .docx
+    """
+
+    BODY = ""
+    PARTS = {}
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name)
+        self.docx_path = self.temp_path / "input.docx"
+        write_docx(self.docx_path, self.BODY, self.PARTS)
+
+
+def both_engines(cls):
+    """Add a copy of a minidom test case that uses the lxml engine to its module.
+
+    TestFoo gets a TestLxmlFoo sibling, so both backends run the same tests.
+    """
+    name = cls.__name__.replace("Test", "TestLxml", 1)
+    variant = type(name, (cls,), {"engine": "lxml", "__module__": cls.__module__})
+    setattr(sys.modules[cls.__module__], name, variant)
+    return cls
@@ -28,14 +28,24 @@ Example usage:
 
     # Save changes
     editor.save()
+
+LxmlXMLEditor offers the same API on top of lxml, which is much faster for large files:
+    editor = LxmlXMLEditor("document.xml")
 """
 
 import html
+import io
+import os
+import re
+import shutil
+from bisect import bisect_left, bisect_right
+from itertools import islice
 from pathlib import Path
 from typing import Optional, Union
 
 import defusedxml.minidom
 import defusedxml.sax
+import lxml.etree
 
 
 class XMLEditor:
@@ -50,6 +60,7 @@ class XMLEditor:
         xml_path: Path to the XML file being edited
         encoding: Detected encoding of the XML file ('ascii' or 'utf-8')
         dom: Parsed DOM tree with parse_position attributes on elements
+        dirty: True once the tree may differ from the file on disk
     """
 
     def __init__(self, xml_path):
@@ -66,12 +77,41 @@ class XMLEditor:
         if not self.xml_path.exists():
             raise ValueError(f"XML file not found: {xml_path}")
 
-        with open(self.xml_path, "rb") as f:
-            header = f.read(200).decode("utf-8", errors="ignore")
-        self.encoding = "ascii" if 'encoding="ascii"' in header else "utf-8"
+        self.encoding = _detect_encoding(self.xml_path)
 
         parser = _create_line_tracking_parser()
-        self.dom = defusedxml.minidom.parse(str(self.xml_path), parser)
+        self._dom = defusedxml.minidom.parse(str(self.xml_path), parser)
+        self._index = _NodeIndex(self._dom.documentElement)
+        self._handed_out = _HandedOutNodes(self._index)
+        self._index.observers.append(self._handed_out)
+        self._ns_decl_cache = None  # (root attribute count, declarations)
+        self._fragment_templates = {}  # fragment shape -> parsed nodes
+        self._nodes_exposed = False  # the DOM was handed out and may have changed
+        self._dirty = False
+
+    @property
+    def dom(self):
+        """The parsed DOM. Direct access marks the editor dirty, as it may be modified."""
+        self.dirty = True
+        self._nodes_exposed = True
+        return self._dom
+
+    @property
+    def dirty(self):
+        """True once the tree may differ from the file on disk."""
+        if not self._dirty and self._handed_out.changed(recent_only=False):
+            # A node returned by get_node was changed directly
+            self._dirty = True
+            self._index.reset()
+        return self._dirty
+
+    @dirty.setter
+    def dirty(self, value):
+        # Notice direct changes before an edit through the editor hides them
+        self._sync_index()
+        if not value:
+            self._handed_out.retake(recent_only=False)
+        self._dirty = value
 
     def get_node(
         self,
@@ -109,40 +149,10 @@ class XMLEditor:
             elem = editor.get_node(tag="w:t", contains="&#8220;Agreement")  # Entity notation
             elem = editor.get_node(tag="w:t", contains="\u201cAgreement")   # Unicode character
         """
-        matches = []
-        for elem in self.dom.getElementsByTagName(tag):
-            # Check line_number filter
-            if line_number is not None:
-                parse_pos = getattr(elem, "parse_position", (None,))
-                elem_line = parse_pos[0]
-
-                # Handle both single line number and range
-                if isinstance(line_number, range):
-                    if elem_line not in line_number:
-                        continue
-                else:
-                    if elem_line != line_number:
-                        continue
-
-            # Check attrs filter
-            if attrs is not None:
-                if not all(
-                    elem.getAttribute(attr_name) == attr_value
-                    for attr_name, attr_value in attrs.items()
-                ):
-                    continue
-
-            # Check contains filter
-            if contains is not None:
-                elem_text = self._get_element_text(elem)
-                # Normalize the search string: convert HTML entities to Unicode characters
-                # This allows searching for both "&#8220;Rowan" and ""Rowan"
-                normalized_contains = html.unescape(contains)
-                if normalized_contains not in elem_text:
-                    continue
-
-            # If all applicable filters passed, this is a match
-            matches.append(elem)
+        # Normalize the search string: convert HTML entities to Unicode characters
+        # This allows searching for both "&#8220;Rowan" and ""Rowan"
+        normalized_contains = html.unescape(contains) if contains is not None else None
+        matches = self._find_nodes(tag, attrs, line_number, normalized_contains)
 
         if not matches:
             # Build descriptive error message
@@ -178,8 +188,100 @@ class XMLEditor:
                 f"Multiple nodes found: <{tag}>. "
                 f"Add more filters (attrs, line_number, or contains) to narrow the search."
             )
+        # The caller may modify the returned node directly
+        self._handed_out.add(matches[0])
         return matches[0]
 
+    def _find_nodes(self, tag, attrs, line_number, contains):
+        """
+        Find all elements matching the get_node filters.
+
+        Candidates come from the node index and are re-checked against the live DOM.
+        The index only tracks changes made through this editor, so it is rebuilt
+        first if the DOM may have been changed directly (see _sync_index). When the
+        index yields no match the whole DOM is scanned as before; if that scan does
+        find matches, the index is rebuilt on next use.
+
+        Args:
+            tag: The XML tag name
+            attrs: Dictionary of attribute name-value pairs to match, or None
+            line_number: Line number (int) or line range (range), or None
+            contains: Unescaped text that must appear in the element, or None
+
+        Returns:
+            list: Matching elements
+        """
+        self._sync_index()
+        matches = []
+        if tag != "*":
+            for elem in self._index.candidates(
+                tag, attrs, line_number, contains, self._get_element_text
+            ):
+                if self._index.is_attached(elem) and self._node_matches(
+                    elem, tag, attrs, line_number, contains
+                ):
+                    matches.append(elem)
+            if matches:
+                return matches
+
+        matches = [
+            elem
+            for elem in self._index.scan(tag)
+            if self._node_matches(elem, tag, attrs, line_number, contains)
+        ]
+        if matches and tag != "*":
+            self._index.reset()
+        return matches
+
+    def _sync_index(self):
+        """
+        Rebuild the node index on next use if the DOM may have been changed directly.
+
+        That is the case after dom/tree access, and when a node recently returned by
+        get_node has been moved, removed, cloned next to, or had its attributes,
+        text or number of children changed (see _HandedOutNodes).
+        """
+        if self._handed_out.changed():
+            self._dirty = True
+        elif not self._nodes_exposed:
+            return
+        self._nodes_exposed = False
+        self._index.reset()
+
+    def _node_matches(self, elem, tag, attrs, line_number, contains):
+        """Check a single element against the get_node filters using the live DOM."""
+        index = self._index
+        if tag != "*" and index.tag_of(elem) != tag:
+            return False
+
+        # Check line_number filter
+        if line_number is not None:
+            elem_line = index.line_of(elem)
+
+            # Handle both single line number and range
+            if isinstance(line_number, range):
+                if elem_line not in line_number:
+                    return False
+            elif elem_line != line_number:
+                return False
+
+        # Check attrs filter
+        if attrs is not None:
+            if not all(
+                index.attribute_of(elem, attr_name) == attr_value
+                for attr_name, attr_value in attrs.items()
+            ):
+                return False
+
+        # Check contains filter
+        if contains is not None:
+            text = self._get_element_text(elem)
+            index.set_text(elem, text)
+            if contains not in text:
+                return False
+
+        return True
+
     def _get_element_text(self, elem):
         """
         Recursively extract all text content from an element.
@@ -217,11 +319,14 @@ class XMLEditor:
         Example:
             new_nodes = editor.replace_node(old_elem, "<w:r><w:t>text</w:t></w:r>")
         """
+        self.dirty = True
         parent = elem.parentNode
         nodes = self._parse_fragment(new_content)
         for node in nodes:
             parent.insertBefore(node, elem)
         parent.removeChild(elem)
+        self._index.removed(elem, parent)
+        self._index.added(nodes)
         return nodes
 
     def insert_after(self, elem, xml_content):
@@ -238,6 +343,7 @@ class XMLEditor:
         Example:
             new_nodes = editor.insert_after(elem, "<w:r><w:t>text</w:t></w:r>")
         """
+        self.dirty = True
         parent = elem.parentNode
         next_sibling = elem.nextSibling
         nodes = self._parse_fragment(xml_content)
@@ -246,6 +352,7 @@ class XMLEditor:
                 parent.insertBefore(node, next_sibling)
             else:
                 parent.appendChild(node)
+        self._index.added(nodes)
         return nodes
 
     def insert_before(self, elem, xml_content):
@@ -262,10 +369,12 @@ class XMLEditor:
         Example:
             new_nodes = editor.insert_before(elem, "<w:r><w:t>text</w:t></w:r>")
         """
+        self.dirty = True
         parent = elem.parentNode
         nodes = self._parse_fragment(xml_content)
         for node in nodes:
             parent.insertBefore(node, elem)
+        self._index.added(nodes)
         return nodes
 
     def append_to(self, elem, xml_content):
@@ -282,16 +391,61 @@ class XMLEditor:
         Example:
             new_nodes = editor.append_to(elem, "<w:r><w:t>text</w:t></w:r>")
         """
+        self.dirty = True
         nodes = self._parse_fragment(xml_content)
         for node in nodes:
             elem.appendChild(node)
+        self._index.added(nodes)
         return nodes
 
+    def get_root(self):
+        """Return the root element of the document."""
+        return self._dom.documentElement
+
+    def is_element(self, node):
+        """Check whether a node returned by this editor is an element."""
+        return node.nodeType == node.ELEMENT_NODE
+
+    def get_tag(self, elem):
+        """Return the prefixed tag name of an element (e.g., "w:p")."""
+        return elem.tagName
+
+    def get_attribute(self, elem, name):
+        """Return an attribute value by prefixed name, or "" if it is not set."""
+        return elem.getAttribute(name)
+
+    def get_parent(self, elem):
+        """Return the parent element of an element."""
+        return elem.parentNode
+
+    def get_children(self, elem):
+        """Return the child elements of an element."""
+        return [n for n in elem.childNodes if n.nodeType == n.ELEMENT_NODE]
+
+    def get_text(self, elem):
+        """Return the text directly inside an element (e.g. a w:t), whitespace included."""
+        return "".join(n.data for n in elem.childNodes if n.nodeType == n.TEXT_NODE)
+
+    def find_all(self, tag, elem=None):
+        """
+        Return all elements with the given prefixed tag name in document order.
+
+        Args:
+            tag: The XML tag name (e.g., "w:p")
+            elem: Only search descendants of this element (default: whole document)
+
+        Returns:
+            list: Matching elements
+        """
+        return list(
+            (self._dom if elem is None else elem).getElementsByTagName(tag)
+        )
+
     def get_next_rid(self):
         """Get the next available rId for relationships files."""
         max_id = 0
-        for rel_elem in self.dom.getElementsByTagName("Relationship"):
-            rel_id = rel_elem.getAttribute("Id")
+        for rel_elem in self.find_all("Relationship"):
+            rel_id = self.get_attribute(rel_elem, "Id")
             if rel_id.startswith("rId"):
                 try:
                     max_id = max(max_id, int(rel_id[3:]))
@@ -304,15 +458,31 @@ class XMLEditor:
         Save the edited XML back to the file.
 
         Serializes the DOM tree and writes it back to the original file path,
-        preserving the original encoding (ascii or utf-8).
+        preserving the original encoding (ascii or utf-8). The output is streamed to
+        a temporary file that then replaces the original, so no serialized copy of
+        the document is held in memory and the file is never left half written.
         """
-        content = self.dom.toxml(encoding=self.encoding)
-        self.xml_path.write_bytes(content)
+
+        def write(f):
+            # Same output as toxml(encoding=...), written as it is produced
+            writer = io.TextIOWrapper(
+                f, encoding=self.encoding, errors="xmlcharrefreplace", newline="\n"
+            )
+            self._dom.writexml(writer, encoding=self.encoding)
+            writer.flush()
+            writer.detach()
+
+        _write_atomically(self.xml_path, write)
+        self.dirty = False
 
     def _parse_fragment(self, xml_content):
         """
         Parse XML fragment and return list of imported nodes.
 
+        Fragments with the same shape as an earlier one, differing only in attribute
+        values (see _fragment_shape), are copied from the nodes parsed for it rather
+        than parsed again.
+
         Args:
             xml_content: String containing XML fragment
 
@@ -322,26 +492,771 @@ class XMLEditor:
         Raises:
             AssertionError: If fragment contains no element nodes
         """
-        # Extract namespace declarations from the root document element
-        root_elem = self.dom.documentElement
-        namespaces = []
-        if root_elem and root_elem.attributes:
-            for i in range(root_elem.attributes.length):
-                attr = root_elem.attributes.item(i)
+        ns_decl = self._namespace_declarations()
+        shape = _fragment_shape(xml_content)
+        template = self._fragment_templates.get(shape[0]) if shape else None
+        if template is None:
+            wrapper = f"<root {ns_decl}>{xml_content}</root>"
+            fragment_doc = defusedxml.minidom.parseString(wrapper)
+            nodes = [
+                self._dom.importNode(child, deep=True)
+                for child in fragment_doc.documentElement.childNodes  # type: ignore
+            ]
+            elements = [n for n in nodes if n.nodeType == n.ELEMENT_NODE]
+            assert elements, "Fragment must contain at least one element"
+            if shape:
+                # Keep the parsed nodes detached and hand out copies
+                _remember_template(self._fragment_templates, shape[0], nodes)
+                nodes = [node.cloneNode(True) for node in nodes]
+            return nodes
+
+        # Same shape as an earlier fragment: copy its nodes and set the values
+        nodes = [node.cloneNode(True) for node in template]
+        if shape[1]:
+            elements = [
+                elem for node in nodes for elem in self._index.iter_elements(node)
+            ]
+            for (number, name), value in zip(shape[1], shape[2]):
+                elements[number].setAttribute(name, value)
+        return nodes
+
+    def _namespace_declarations(self):
+        """
+        Return the root element's namespace declarations as attribute source text.
+
+        Cached per editor; recomputed when attributes are added to or removed from
+        the root element, which also drops the fragment templates parsed with the
+        old declarations.
+        """
+        root_elem = self._dom.documentElement
+        attributes = root_elem.attributes if root_elem else None
+        count = attributes.length if attributes else 0
+        if self._ns_decl_cache is None or self._ns_decl_cache[0] != count:
+            namespaces = []
+            for i in range(count):
+                attr = attributes.item(i)  # type: ignore
                 if attr.name.startswith("xmlns"):  # type: ignore
                     namespaces.append(f'{attr.name}="{attr.value}"')  # type: ignore
+            self._ns_decl_cache = (count, " ".join(namespaces))
+            self._fragment_templates.clear()
+        return self._ns_decl_cache[1]
 
-        ns_decl = " ".join(namespaces)
-        wrapper = f"<root {ns_decl}>{xml_content}</root>"
-        fragment_doc = defusedxml.minidom.parseString(wrapper)
-        nodes = [
-            self.dom.importNode(child, deep=True)
-            for child in fragment_doc.documentElement.childNodes  # type: ignore
-        ]
-        elements = [n for n in nodes if n.nodeType == n.ELEMENT_NODE]
-        assert elements, "Fragment must contain at least one element"
+
+class _NodeIndex:
+    """
+    Lazily built lookup tables used by XMLEditor.get_node.
+
+    The tag index is built in one pass over the DOM the first time it is needed.
+    Attribute, line and text indexes are derived from it per tag on demand. Changes
+    made through XMLEditor methods are applied incrementally; anything returned by
+    candidates() must still be re-checked against the live DOM by the caller.
+
+    Node access goes through the static methods at the end of the class so that the
+    same index works for other DOM implementations (see _LxmlNodeIndex).
+
+    Other indexes over the same DOM can follow the same changes by adding themselves
+    to observers; they receive the added(), removed() and reset() calls.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.observers = []
+        self.reset()
+
+    def reset(self):
+        """Drop all indexes so they are rebuilt from the DOM on next use."""
+        self.invalidate()
+        for observer in self.observers:
+            observer.reset()
+
+    def invalidate(self):
+        """Drop this index, but not its observers, so it is rebuilt on next use."""
+        self._by_tag = None  # tag -> {elem: None}, used as an ordered set
+        self._by_attr = {}  # tag -> {attr_name -> {attr_value -> {elem: None}}}
+        self._by_line = {}  # tag -> (sorted line numbers, elements in same order)
+        self._text = {}  # elem -> text content
+
+    def candidates(self, tag, attrs, line_number, contains, get_text):
+        """
+        Yield elements that may match the given get_node filters.
+
+        Args:
+            tag: The tag name as stored in the DOM
+            attrs: Dictionary of attribute name-value pairs, or None
+            line_number: Line number (int) or line range (range), or None
+            contains: Unescaped text the element must contain, or None
+            get_text: Callable returning the text content of an element
+        """
+        pools = []
+        if attrs:
+            for attr_name, attr_value in attrs.items():
+                pools.append(self._attr_index(tag, attr_name).get(attr_value, {}))
+        if line_number is not None:
+            pools.append(self._line_candidates(tag, line_number))
+        if not pools:
+            pools.append(self._tag_index().get(tag, {}))
+
+        # Every filter is re-checked by the caller, so start from the smallest pool
+        for elem in min(pools, key=len):
+            if contains is not None:
+                text = self._text.get(elem)
+                if text is None:
+                    text = self._text[elem] = get_text(elem)
+                if contains not in text:
+                    continue
+            yield elem
+
+    def is_attached(self, node):
+        """Check whether node is still part of the indexed DOM."""
+        while node is not self.root:
+            node = self.parent_of(node)
+            if node is None:
+                return False
+        return True
+
+    def set_text(self, elem, text):
+        """Record freshly computed text content for an element."""
+        self._text[elem] = text
+
+    def added(self, nodes):
+        """Index nodes that were just inserted into the DOM, with their descendants."""
+        for node in nodes:
+            if self.is_element(node):
+                for elem in self.iter_elements(node):
+                    self._text.pop(elem, None)
+                    if self._by_tag is not None:
+                        self._add_to_tag_index(elem)
+            self.changed(self.parent_of(node))
+        for observer in self.observers:
+            observer.added(nodes)
+
+    def removed(self, node, parent):
+        """Forget a node (and its descendants) that was just detached from parent."""
+        if self.is_element(node):
+            for elem in self.iter_elements(node):
+                self._text.pop(elem, None)
+                if self._by_tag is not None:
+                    tag = self.tag_of(elem)
+                    self._by_tag.get(tag, {}).pop(elem, None)
+                    for attr_name, buckets in self._by_attr.get(tag, {}).items():
+                        buckets.get(self.attribute_of(elem, attr_name), {}).pop(
+                            elem, None
+                        )
+        self.changed(parent)
+        for observer in self.observers:
+            observer.removed(node, parent)
+
+    def changed(self, node):
+        """Invalidate cached text for node and all of its ancestors."""
+        if not self._text:
+            return
+        while node is not None:
+            self._text.pop(node, None)
+            node = self.parent_of(node)
+
+    def _tag_index(self):
+        if self._by_tag is None:
+            self._by_tag = {}
+            for elem in self.iter_elements(self.root):
+                self._add_to_tag_index(elem)
+        return self._by_tag
+
+    def _add_to_tag_index(self, elem):
+        tag = self.tag_of(elem)
+        self._by_tag.setdefault(tag, {})[elem] = None
+        for attr_name, buckets in self._by_attr.get(tag, {}).items():
+            buckets.setdefault(self.attribute_of(elem, attr_name), {})[elem] = None
+
+    def _attr_index(self, tag, attr_name):
+        attr_maps = self._by_attr.setdefault(tag, {})
+        if attr_name not in attr_maps:
+            buckets = {}
+            for elem in self._tag_index().get(tag, {}):
+                buckets.setdefault(self.attribute_of(elem, attr_name), {})[elem] = None
+            attr_maps[attr_name] = buckets
+        return attr_maps[attr_name]
+
+    def _line_candidates(self, tag, line_number):
+        if tag not in self._by_line:
+            # Only parsed elements have a line; new ones never match a line filter
+            located = sorted(
+                (
+                    (line, elem)
+                    for elem in self._tag_index().get(tag, {})
+                    if (line := self.line_of(elem)) is not None
+                ),
+                key=lambda item: item[0],
+            )
+            self._by_line[tag] = (
+                [line for line, _ in located],
+                [elem for _, elem in located],
+            )
+        lines, elems = self._by_line[tag]
+
+        if not isinstance(line_number, range):
+            first, last = line_number, line_number
+        elif not line_number:
+            return []
+        else:
+            first, last = min(line_number), max(line_number)
+        return elems[bisect_left(lines, first) : bisect_right(lines, last)]
+
+    def scan(self, tag):
+        """Yield all elements with the given tag ("*" for any) by walking the DOM."""
+        if tag == "*" or self.tag_of(self.root) == tag:
+            yield self.root
+        yield from self.root.getElementsByTagName(tag)
+
+    @staticmethod
+    def iter_elements(node):
+        """Yield node and all descendant elements in document order."""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.nodeType == current.ELEMENT_NODE:
+                yield current
+                stack.extend(reversed(current.childNodes))
+
+    @staticmethod
+    def is_element(node):
+        return node.nodeType == node.ELEMENT_NODE
+
+    @staticmethod
+    def parent_of(node):
+        return node.parentNode
+
+    @staticmethod
+    def tag_of(elem):
+        return elem.tagName
+
+    @staticmethod
+    def attribute_of(elem, name):
+        return elem.getAttribute(name)
+
+    @staticmethod
+    def line_of(elem):
+        return getattr(elem, "parse_position", (None,))[0]
+
+    @staticmethod
+    def state_of(elem):
+        """Return what a direct change to elem or next to it is likely to alter."""
+        parent, first = elem.parentNode, elem.firstChild
+        return (
+            parent,
+            elem.previousSibling,
+            elem.nextSibling,
+            parent and parent.firstChild,
+            parent and parent.lastChild,
+            getattr(first, "data", first),
+            elem.lastChild,
+            elem.attributes.items(),
+        )
+
+
+class LxmlXMLEditor(XMLEditor):
+    """
+    XMLEditor backed by lxml instead of minidom.
+
+    Provides the same get_node/replace_node/insert_*/append_to/save API, with line
+    numbers taken from lxml's sourceline. Parsing, lookups and saving are much faster
+    and use far less memory than minidom on large parts such as word/document.xml.
+
+    Tag and attribute names are passed with their document prefixes ("w:p",
+    "w14:paraId") exactly as for XMLEditor. Returned nodes are lxml elements, so use
+    the get_tag/get_attribute/get_parent/get_children/find_all helpers (or the lxml
+    API with "{namespace}local" names) instead of minidom methods.
+
+    Attributes:
+        xml_path: Path to the XML file being edited
+        encoding: Detected encoding of the XML file ('ascii' or 'utf-8')
+        tree: Parsed lxml.etree._ElementTree
+        dirty: True once the tree may differ from the file on disk
+    """
+
+    def __init__(self, xml_path):
+        """
+        Initialize with path to XML file and parse it with lxml.
+
+        Args:
+            xml_path: Path to XML file to edit (str or Path)
+
+        Raises:
+            ValueError: If the XML file does not exist
+        """
+        self.xml_path = Path(xml_path)
+        if not self.xml_path.exists():
+            raise ValueError(f"XML file not found: {xml_path}")
+
+        self.encoding = _detect_encoding(self.xml_path)
+        self._tree = lxml.etree.parse(str(self.xml_path), _create_safe_lxml_parser())
+        self._namespaces = {"xml": _XML_NAMESPACE}
+        self._index = _LxmlNodeIndex(self._tree.getroot())
+        self._handed_out = _HandedOutNodes(self._index)
+        self._index.observers.append(self._handed_out)
+        self._fragment_parser = _create_safe_lxml_parser()
+        self._ns_decl_cache = None
+        self._nodes_exposed = False
+        self._dirty = False
+
+    @property
+    def tree(self):
+        """The parsed tree. Direct access marks the editor dirty, as it may be modified."""
+        self.dirty = True
+        self._nodes_exposed = True
+        return self._tree
+
+    def get_root(self):
+        """Return the root element of the document."""
+        return self._tree.getroot()
+
+    def is_element(self, node):
+        """Check whether a node returned by this editor is an element."""
+        return isinstance(node.tag, str)
+
+    def get_tag(self, elem):
+        """Return the prefixed tag name of an element (e.g., "w:p")."""
+        local = lxml.etree.QName(elem).localname
+        return f"{elem.prefix}:{local}" if elem.prefix else local
+
+    def get_attribute(self, elem, name):
+        """Return an attribute value by prefixed name, or "" if it is not set."""
+        return elem.get(self._qname(name, attribute=True), "")
+
+    def get_parent(self, elem):
+        """Return the parent element of an element."""
+        return elem.getparent()
+
+    def get_children(self, elem):
+        """Return the child elements of an element."""
+        return [child for child in elem if isinstance(child.tag, str)]
+
+    def get_text(self, elem):
+        """Return the text directly inside an element (e.g. a w:t), whitespace included."""
+        return elem.text or ""
+
+    def find_all(self, tag, elem=None):
+        """
+        Return all elements with the given prefixed tag name in document order.
+
+        Args:
+            tag: The XML tag name (e.g., "w:p")
+            elem: Only search descendants of this element (default: whole document)
+
+        Returns:
+            list: Matching elements
+        """
+        if elem is None:
+            return list(self._tree.getroot().iter(self._qname(tag)))
+        return list(elem.iterdescendants(self._qname(tag)))
+
+    def replace_node(self, elem, new_content):
+        """
+        Replace an element with new XML content.
+
+        Args:
+            elem: lxml element to replace
+            new_content: String containing XML to replace the node with
+
+        Returns:
+            List[lxml.etree._Element]: All inserted elements
+        """
+        self.dirty = True
+        parent = elem.getparent()
+        nodes = self._parse_fragment(new_content)
+        for node in nodes:
+            elem.addprevious(node)
+        # Keep the whitespace that followed the replaced element
+        nodes[-1].tail = (nodes[-1].tail or "") + (elem.tail or "")
+        parent.remove(elem)
+        self._index.removed(elem, parent)
+        self._index.added(nodes)
+        return nodes
+
+    def insert_after(self, elem, xml_content):
+        """
+        Insert XML content after an element.
+
+        Args:
+            elem: lxml element to insert after
+            xml_content: String containing XML to insert
+
+        Returns:
+            List[lxml.etree._Element]: All inserted elements
+        """
+        self.dirty = True
+        nodes = self._parse_fragment(xml_content)
+        for node in reversed(nodes):
+            elem.addnext(node)
+        self._index.added(nodes)
+        return nodes
+
+    def insert_before(self, elem, xml_content):
+        """
+        Insert XML content before an element.
+
+        Args:
+            elem: lxml element to insert before
+            xml_content: String containing XML to insert
+
+        Returns:
+            List[lxml.etree._Element]: All inserted elements
+        """
+        self.dirty = True
+        nodes = self._parse_fragment(xml_content)
+        for node in nodes:
+            elem.addprevious(node)
+        self._index.added(nodes)
+        return nodes
+
+    def append_to(self, elem, xml_content):
+        """
+        Append XML content as a child of an element.
+
+        Args:
+            elem: lxml element to append to
+            xml_content: String containing XML to append
+
+        Returns:
+            List[lxml.etree._Element]: All inserted elements
+        """
+        self.dirty = True
+        nodes = self._parse_fragment(xml_content)
+        for node in nodes:
+            elem.append(node)
+        self._index.added(nodes)
+        return nodes
+
+    def save(self):
+        """
+        Save the edited XML back to the file.
+
+        Preserves the original encoding (ascii or utf-8) and standalone="yes".
+        Streamed to a temporary file that replaces the original, like XMLEditor.save.
+        """
+        standalone = ' standalone="yes"' if self._tree.docinfo.standalone else ""
+        declaration = f'<?xml version="1.0" encoding="{self.encoding}"{standalone}?>'
+
+        def write(f):
+            f.write(declaration.encode(self.encoding))
+            self._tree.write(f, encoding=self.encoding, xml_declaration=False)
+
+        _write_atomically(self.xml_path, write)
+        self.dirty = False
+
+    def _find_nodes(self, tag, attrs, line_number, contains):
+        """Resolve prefixed names to lxml names, then search like XMLEditor."""
+        if attrs is not None:
+            attrs = {
+                self._qname(name, attribute=True): value
+                for name, value in attrs.items()
+            }
+        return super()._find_nodes(self._qname(tag), attrs, line_number, contains)
+
+    def _get_element_text(self, elem):
+        """Extract all non-whitespace-only text content from an element."""
+        return "".join(text for text in elem.itertext() if text.strip())
+
+    def _qname(self, name, attribute=False):
+        """
+        Convert a prefixed name ("w:p") to lxml's "{namespace}local" form.
+
+        Unprefixed element names use the root's default namespace; unprefixed
+        attribute names have no namespace.
+
+        Raises:
+            ValueError: If the prefix is not declared anywhere in the document
+        """
+        if name == "*" or name.startswith("{"):
+            return name
+        prefix, _, local = name.rpartition(":")
+        if not prefix:
+            if attribute:
+                return name
+            prefix = None
+
+        if prefix not in self._namespaces:
+            root = self._tree.getroot()
+            uri = root.nsmap.get(prefix)
+            if uri is None and prefix is not None:
+                # Rare: prefix declared below the root element
+                uri = next(
+                    (
+                        elem.nsmap[prefix]
+                        for elem in root.iter(lxml.etree.Element)
+                        if prefix in elem.nsmap
+                    ),
+                    None,
+                )
+                if uri is None:
+                    raise ValueError(f"Namespace prefix not declared: {prefix}")
+            self._namespaces[prefix] = uri
+
+        uri = self._namespaces[prefix]
+        return f"{{{uri}}}{local}" if uri else local
+
+    def _parse_fragment(self, xml_content):
+        """
+        Parse XML fragment and return its top-level elements.
+
+        Text between the fragment's top-level elements is kept as their tails.
+        New elements have no sourceline, so they never match a line_number filter.
+
+        Args:
+            xml_content: String containing XML fragment
+
+        Returns:
+            List of lxml elements, not yet attached to this document
+
+        Raises:
+            AssertionError: If fragment contains no element nodes
+        """
+        # Unlike minidom, lxml parses small fragments faster than they could be
+        # looked up by shape (see XMLEditor._parse_fragment) and cloned
+        wrapper = lxml.etree.fromstring(
+            f"<root {self._namespace_declarations()}>{xml_content}</root>",
+            self._fragment_parser,
+        )
+        nodes = list(wrapper)
+        assert any(
+            isinstance(node.tag, str) for node in nodes
+        ), "Fragment must contain at least one element"
+        for node in nodes:
+            for elem in node.iter():
+                elem.sourceline = 0
         return nodes
 
+    def _namespace_declarations(self):
+        """
+        Return the root element's namespace declarations as attribute source text.
+
+        Cached per editor: lxml only changes the declarations of an element through
+        lxml.etree.cleanup_namespaces, after which the cache must be cleared by
+        setting _ns_decl_cache to None.
+        """
+        if self._ns_decl_cache is None:
+            self._ns_decl_cache = " ".join(
+                f'xmlns:{prefix}="{uri}"' if prefix else f'xmlns="{uri}"'
+                for prefix, uri in self._tree.getroot().nsmap.items()
+            )
+        return self._ns_decl_cache
+
+
+class _LxmlNodeIndex(_NodeIndex):
+    """_NodeIndex over an lxml tree, keyed by "{namespace}local" names."""
+
+    def scan(self, tag):
+        return self.root.iter(lxml.etree.Element if tag == "*" else tag)
+
+    @staticmethod
+    def iter_elements(node):
+        return node.iter(lxml.etree.Element)
+
+    @staticmethod
+    def is_element(node):
+        return isinstance(node.tag, str)
+
+    @staticmethod
+    def parent_of(node):
+        return node.getparent()
+
+    @staticmethod
+    def tag_of(elem):
+        return elem.tag
+
+    @staticmethod
+    def attribute_of(elem, name):
+        return elem.get(name, "")
+
+    @staticmethod
+    def line_of(elem):
+        return elem.sourceline
+
+    @staticmethod
+    def state_of(elem):
+        # Only the ends of child lists: len() walks all children
+        parent = elem.getparent()
+        ends = (None, None) if parent is None else _child_list_ends(parent)
+        return (
+            parent,
+            elem.getprevious(),
+            elem.getnext(),
+            *ends,
+            elem.text,
+            *_child_list_ends(elem),
+            elem.attrib.items(),
+        )
+
+
+def _child_list_ends(elem):
+    """Return the first and last child of an lxml element, or None."""
+    return next(elem.iterchildren(), None), next(elem.iterchildren(reversed=True), None)
+
+
+class _HandedOutNodes:
+    """
+    Cheap detection of direct changes to nodes returned by get_node.
+
+    Callers may change returned nodes directly in the DOM, which neither the node
+    index nor the dirty flag can see. Rather than assume that every returned node
+    was changed, a small snapshot of each is kept: its parent, siblings, attributes,
+    leading text, and the first and last children of the node and of its parent.
+    Moving, removing or cloning a returned node, adding children to it, or editing
+    its attributes or text changes the snapshot. Changes deeper inside a returned
+    node are not seen; use the editor's dom/tree property for those.
+
+    Lookups only compare the RECENT most recently returned nodes, so they stay cheap
+    however many nodes were returned; reading the dirty flag compares all nodes
+    returned since the last save. As an observer of the node index, the snapshots
+    of recent nodes are retaken after every change made through the editor.
+    """
+
+    RECENT = 32
+
+    def __init__(self, index):
+        self.index = index
+        self._states = {}  # node -> snapshot, most recently returned last
+
+    def add(self, node):
+        """Start watching a node that is being returned to the caller."""
+        self._states.pop(node, None)
+        self._states[node] = self.index.state_of(node)
+
+    def changed(self, recent_only=True):
+        """Check whether watched nodes changed since their snapshot, and retake it."""
+        changed = False
+        for node in self._watched(recent_only):
+            state = self.index.state_of(node)
+            if state != self._states[node]:
+                self._states[node] = state
+                changed = True
+        return changed
+
+    def retake(self, recent_only=True):
+        """Accept the current state of watched nodes, dropping detached ones."""
+        for node in self._watched(recent_only):
+            if recent_only or self.index.is_attached(node):
+                self._states[node] = self.index.state_of(node)
+            else:
+                del self._states[node]
+
+    def added(self, nodes):
+        self.retake()
+
+    def removed(self, node, parent):
+        self.retake()
+
+    def reset(self):
+        self.retake()
+
+    def _watched(self, recent_only):
+        if recent_only:
+            return list(islice(reversed(self._states), self.RECENT))
+        return list(self._states)
+
+
+_XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+# Buffer size for saving; serializers issue many small writes
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Parsed fragments kept per editor, and the largest fragment worth keeping
+_MAX_FRAGMENT_TEMPLATES = 256
+_MAX_TEMPLATE_LENGTH = 4096
+
+# Tags (split out of a fragment), and start tags whose attribute values are all
+# plain and double-quoted
+_MARKUP = re.compile(r"(<[^<>]*>)")
+_PLAIN_TAG = re.compile(
+    r'[^\s"\'<>/=]+(?:\s+[^\s"\'<>/=]+\s*=\s*"[^"&<\t\n\r]*")*\s*/?'
+)
+
+
+def _fragment_shape(xml_content):
+    """
+    Split an XML fragment into its shape and its attribute values.
+
+    Fragments that differ only in attribute values (such as the w:id of comment
+    markers) have the same shape, so nodes parsed for one of them can be cloned for
+    the others and given their values, instead of parsing every fragment.
+
+    Returns:
+        tuple: (shape, slots, values), where slots holds the (element number in
+        document order, attribute name) of each value; None if the fragment is not
+        worth keeping (large, or containing markup other than elements and text)
+    """
+    if len(xml_content) > _MAX_TEMPLATE_LENGTH:
+        return None
+    parts = _MARKUP.split(xml_content)  # text, tag, text, tag, ..., text
+    slots, values = [], []
+    number = -1
+    for i in range(1, len(parts), 2):
+        tag = parts[i]
+        if tag[1] in "!?":
+            return None
+        if tag[1] == "/":
+            continue
+        number += 1
+        if "=" not in tag or not _PLAIN_TAG.fullmatch(tag, 1, len(tag) - 1):
+            continue  # no values, or kept as it is in the shape
+        # '<w:r w:id="' 'value' '" w:val="' 'value' '"/>'
+        chunks = tag.split('"')
+        for j in range(1, len(chunks), 2):
+            name = chunks[j - 1].rstrip()[:-1].split()[-1]
+            if name == "xmlns" or name.startswith("xmlns:"):
+                continue
+            slots.append((number, name))
+            values.append(chunks[j])
+            chunks[j] = ""
+        parts[i] = '"'.join(chunks)
+    return "".join(parts), tuple(slots), values
+
+
+def _remember_template(templates, shape, template):
+    """Store a parsed fragment, dropping the oldest one when the cache is full."""
+    if len(templates) >= _MAX_FRAGMENT_TEMPLATES:
+        del templates[next(iter(templates))]
+    templates[shape] = template
+
+
+def _write_atomically(path, write):
+    """
+    Write a file through a temporary file next to it that then replaces it.
+
+    Readers see either the old or the complete new file, and a failed write leaves
+    the original untouched. The new file keeps the original's permissions.
+
+    Args:
+        path: Path of the file to write
+        write: Callable writing the content to a binary file object
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+            write(f)
+        if path.exists():
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _detect_encoding(xml_path):
+    """Return 'ascii' if the XML declaration says so, otherwise 'utf-8'."""
+    with open(xml_path, "rb") as f:
+        header = f.read(200).decode("utf-8", errors="ignore")
+    return "ascii" if 'encoding="ascii"' in header else "utf-8"
+
+
+def _create_safe_lxml_parser():
+    """
+    Create an lxml parser that will not expand entities or load external resources.
+
+    Returns:
+        lxml.etree.XMLParser: Configured parser
+    """
+    return lxml.etree.XMLParser(resolve_entities=False, no_network=True, load_dtd=False)
+
 
 def _create_line_tracking_parser():
     """
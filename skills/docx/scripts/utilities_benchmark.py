@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark XMLEditor.save on a large synthetic word/document.xml.
+
+Compares save() with serializing the whole document in memory first (toxml() or
+lxml.etree.tostring(), as save() used to). Peak memory is the peak of Python
+allocations during the save, measured with tracemalloc after parsing, so it shows
+what saving adds on top of the parsed document.
+
+Not run automatically; for manual checking of save performance.
+
+Usage:
+    PYTHONPATH=/mnt/skills/docx python -m scripts.utilities_benchmark
+    PYTHONPATH=/mnt/skills/docx python -m scripts.utilities_benchmark --size-mb 10 --engine lxml
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import lxml.etree
+
+from .utilities import LxmlXMLEditor, XMLEditor
+
+WORDS = "alpha beta gamma delta epsilon zeta eta theta kappa lambda café naïve".split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark XMLEditor.save")
+    parser.add_argument(
+        "--size-mb", type=float, default=50, help="Size of the synthetic document.xml"
+    )
+    parser.add_argument(
+        "--engine", choices=["minidom", "lxml", "both"], default="both", help="Editor"
+    )
+    args = parser.parse_args()
+
+    editors = {"minidom": XMLEditor, "lxml": LxmlXMLEditor}
+    engines = list(editors) if args.engine == "both" else [args.engine]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        xml_path = Path(temp_dir) / "document.xml"
+        write_document(xml_path, int(args.size_mb * 1024 * 1024))
+        size_mb = xml_path.stat().st_size / 1024 / 1024
+        print(f"Synthetic document.xml: {size_mb:.1f} MB")
+
+        for engine in engines:
+            started = time.perf_counter()
+            editor = editors[engine](xml_path)
+            print(f"\n{engine}: parsed in {time.perf_counter() - started:.1f}s")
+            for label, save in (
+                ("in memory", lambda: save_in_memory(editor)),
+                ("save()", editor.save),
+            ):
+                seconds, peak = measure(save)
+                print(f"  {label:<10} {seconds:6.2f}s  peak +{peak / 1024 / 1024:7.1f} MB")
+            del editor
+
+
+def write_document(xml_path, size):
+    """Write a WordprocessingML document of about size bytes, in ascii encoding."""
+    rng = random.Random(0)
+    with open(xml_path, "w", encoding="ascii", errors="xmlcharrefreplace") as f:
+        f.write(
+            '<?xml version="1.0" encoding="ascii"?>\n'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+            ' xmlns:w14="http://schemas.microsoft.com/office/word/2010/wordml">\n'
+            "  <w:body>\n"
+        )
+        number = 0
+        while f.tell() < size:
+            runs = "".join(
+                f'\n      <w:r w:rsidR="00A1B2C3">\n'
+                f"        <w:rPr>\n          <w:b/>\n        </w:rPr>\n"
+                f'        <w:t xml:space="preserve">'
+                f"{' '.join(rng.choice(WORDS) for _ in range(6))} </w:t>\n"
+                f"      </w:r>"
+                for _ in range(4)
+            )
+            f.write(
+                f'    <w:p w14:paraId="{number + 0x10000000:08X}" w:rsidR="00A1B2C3">'
+                f"{runs}\n    </w:p>\n"
+            )
+            number += 1
+        f.write("  </w:body>\n</w:document>\n")
+
+
+def save_in_memory(editor):
+    """Save by serializing the whole document to bytes first."""
+    if isinstance(editor, LxmlXMLEditor):
+        content = lxml.etree.tostring(
+            editor._tree, encoding=editor.encoding, xml_declaration=True
+        )
+    else:
+        content = editor._dom.toxml(encoding=editor.encoding)
+    editor.xml_path.write_bytes(content)
+
+
+def measure(save):
+    """Return the run time of save() and its peak of Python allocations."""
+    started = time.perf_counter()
+    save()
+    seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        save()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+if __name__ == "__main__":
+    main()
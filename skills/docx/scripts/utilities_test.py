@@ -0,0 +1,169 @@
+import copy
+import unittest
+from unittest import mock
+
+import lxml.etree
+
+from .testing import EditorTestCase, both_engines
+from .utilities import LxmlXMLEditor, XMLEditor
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+@both_engines
+class TestGetNodeIndex(EditorTestCase):
+    BODY = """    <w:p w14:paraId="00000001">
+      <w:r>
+        <w:t>First paragraph</w:t>
+      </w:r>
+    </w:p>
+    <w:p w14:paraId="00000002">
+      <w:r>
+        <w:t>Second </w:t>
+      </w:r>
+      <w:r>
+        <w:t>paragraph</w:t>
+      </w:r>
+    </w:p>
+    <w:p w14:paraId="00000003">
+      <w:r>
+        <w:t>Third paragraph</w:t>
+      </w:r>
+    </w:p>
+"""
+    editor_classes = {"minidom": XMLEditor, "lxml": LxmlXMLEditor}
+
+    def append_paragraph(self, parent, para_id):
+        """Add a w:p directly to the DOM, bypassing the editor."""
+        if self.engine == "lxml":
+            para = lxml.etree.SubElement(parent, self.editor._qname("w:p"))
+            para.set(self.editor._qname("w14:paraId", attribute=True), para_id)
+        else:
+            para = self.editor.dom.createElement("w:p")
+            para.setAttribute("w14:paraId", para_id)
+            parent.appendChild(para)
+        return para
+
+    def clone_into_parent(self, node):
+        """Append a deep copy of node to its parent directly in the DOM."""
+        parent = self.editor.get_parent(node)
+        if self.engine == "lxml":
+            parent.append(copy.deepcopy(node))
+        else:
+            parent.appendChild(node.cloneNode(True))
+
+    def test_filters_use_index(self):
+        """Attribute, line and text filters all resolve the same node"""
+        by_attr = self.editor.get_node(tag="w:p", attrs={"w14:paraId": "00000002"})
+        by_line = self.editor.get_node(tag="w:p", line_number=9)
+        by_range = self.editor.get_node(tag="w:p", line_number=range(8, 12))
+        by_text = self.editor.get_node(tag="w:p", contains="Second paragraph")
+        self.assertIs(by_attr, by_line)
+        self.assertIs(by_attr, by_range)
+        self.assertIs(by_attr, by_text)
+
+    def test_returned_nodes_keep_the_index(self):
+        """Lookups after nodes were returned and edited do not walk the DOM"""
+        para = self.editor.get_node(tag="w:p", attrs={"w14:paraId": "00000001"})
+        self.editor.insert_after(para, '<w:p w14:paraId="00000004"/>')
+        scan = mock.patch.object(
+            self.editor._index, "scan", side_effect=AssertionError("DOM scanned")
+        )
+        with scan:
+            for _ in range(3):
+                self.assertIs(
+                    self.editor.get_node(tag="w:p", contains="First paragraph"), para
+                )
+                self.editor.get_node(tag="w:p", attrs={"w14:paraId": "00000004"})
+                self.editor.get_node(tag="w:p", line_number=9)
+
+    def test_multiple_matches_still_raise(self):
+        """Queries matching several nodes are rejected"""
+        with self.assertRaises(ValueError):
+            self.editor.get_node(tag="w:p", contains="paragraph")
+
+    def test_inserted_nodes_are_found(self):
+        """Nodes inserted through the editor are indexed incrementally"""
+        para = self.editor.get_node(tag="w:p", contains="First paragraph")
+        self.editor.insert_after(
+            para, '<w:p w14:paraId="00000004"><w:r><w:t>Inserted</w:t></w:r></w:p>'
+        )
+        node = self.editor.get_node(tag="w:p", attrs={"w14:paraId": "00000004"})
+        self.assertIs(node, self.editor.get_node(tag="w:p", contains="Inserted"))
+
+    def test_replaced_nodes_are_forgotten(self):
+        """Replaced nodes and their stale text are no longer returned"""
+        run = self.editor.get_node(tag="w:r", contains="Third paragraph")
+        self.editor.replace_node(run, "<w:r><w:t>Replaced text</w:t></w:r>")
+        with self.assertRaises(ValueError):
+            self.editor.get_node(tag="w:r", contains="Third paragraph")
+        para = self.editor.get_node(tag="w:p", contains="Replaced text")
+        self.assertEqual(self.editor.get_attribute(para, "w14:paraId"), "00000003")
+
+    def test_fragments_of_same_shape(self):
+        """Fragments differing only in attribute values get their own values"""
+        para = self.editor.get_node(tag="w:p", attrs={"w14:paraId": "00000001"})
+        fragment = '<w:p w14:paraId="{}"><w:r><w:t xml:space="preserve">{}</w:t></w:r></w:p>'
+        first = self.editor.insert_after(para, fragment.format("00000006", "Same "))
+        second = self.editor.insert_after(para, fragment.format("00000007", "Same "))
+        self.assertIsNot(first[0], second[0])
+        self.assertEqual(self.editor.get_attribute(first[0], "w14:paraId"), "00000006")
+        node = self.editor.get_node(tag="w:p", attrs={"w14:paraId": "00000007"})
+        self.assertIs(node, second[0])
+
+    def test_direct_dom_changes_are_detected(self):
+        """Nodes added directly to the DOM are still found"""
+        para = self.editor.get_node(tag="w:p", attrs={"w14:paraId": "00000001"})
+        new_para = self.append_paragraph(self.editor.get_parent(para), "00000005")
+        node = self.editor.get_node(tag="w:p", attrs={"w14:paraId": "00000005"})
+        self.assertIs(node, new_para)
+
+    def test_cloned_nodes_make_lookups_ambiguous(self):
+        """A node cloned directly into the DOM is seen by later lookups"""
+        para = self.editor.get_node(tag="w:p", attrs={"w14:paraId": "00000001"})
+        self.editor.get_node(tag="w:p", contains="First paragraph")  # index built
+        self.clone_into_parent(para)
+        with self.assertRaisesRegex(ValueError, "Multiple nodes found"):
+            self.editor.get_node(tag="w:p", attrs={"w14:paraId": "00000001"})
+        with self.assertRaisesRegex(ValueError, "Multiple nodes found"):
+            self.editor.get_node(tag="w:p", contains="First paragraph")
+
+    def test_dirty_tracking(self):
+        """Only changes (or possible direct changes) mark the editor dirty"""
+        self.assertFalse(self.editor.dirty)
+        para = self.editor.find_all("w:p")[0]
+        self.assertFalse(self.editor.dirty)
+        self.editor.insert_after(para, "<w:p/>")
+        self.assertTrue(self.editor.dirty)
+        self.editor.save()
+        self.assertFalse(self.editor.dirty)
+        self.editor.get_node(tag="w:p", attrs={"w14:paraId": "00000001"})
+        self.assertFalse(self.editor.dirty)
+
+    def test_direct_changes_to_returned_nodes_are_saved(self):
+        """Moving a node returned by get_node marks the editor dirty"""
+        para = self.editor.get_node(tag="w:p", attrs={"w14:paraId": "00000001"})
+        self.assertFalse(self.editor.dirty)
+        parent = self.editor.get_parent(para)
+        if self.engine == "lxml":
+            parent.append(para)
+        else:
+            parent.removeChild(para)
+            parent.appendChild(para)
+        self.assertTrue(self.editor.dirty)
+        self.editor.save()
+        self.assertFalse(self.editor.dirty)
+        content = self.xml_path.read_text(encoding="utf-8")
+        self.assertLess(content.index("Third paragraph"), content.index("First paragraph"))
+
+    def test_save_round_trip(self):
+        """Saved output keeps the prefixes and declaration of the original"""
+        para = self.editor.get_node(tag="w:p", line_number=9)
+        self.editor.insert_after(para, "<w:p><w:r><w:t>Added</w:t></w:r></w:p>")
+        self.editor.save()
+        content = self.xml_path.read_text(encoding="utf-8")
+        self.assertTrue(content.startswith('<?xml version="1.0" encoding="utf-8"?>'))
+        self.assertIn("<w:p><w:r><w:t>Added</w:t></w:r></w:p>", content)
+
+
+if __name__ == "__main__":
+    unittest.main()
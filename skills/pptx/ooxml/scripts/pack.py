@@ -3,29 +3,70 @@
 Tool to pack a directory into a .docx, .pptx, or .xlsx file with XML formatting undone.
 
 Example usage:
-    python pack.py <input_directory> <office_file> [--force]
+    python pack.py <input_directory> <office_file> [--force] [--jobs N]
+    python pack.py <input_directory> <office_file> --original <original_file>
 """
 
 import argparse
-import shutil
-import subprocess
+import contextlib
+import io
+import struct
 import sys
 import tempfile
-import defusedxml.minidom
 import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import defusedxml.minidom
+import lxml.etree
+
+try:
+    from .soffice import get_service  # imported as ooxml.scripts.pack
+except ImportError:
+    from soffice import get_service  # run as a script
+
 
 def main():
     parser = argparse.ArgumentParser(description="Pack a directory into an Office file")
     parser.add_argument("input_directory", help="Unpacked Office document directory")
     parser.add_argument("output_file", help="Output Office file (.docx/.pptx/.xlsx)")
     parser.add_argument("--force", action="store_true", help="Skip validation")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes condensing XML parts in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["lxml", "minidom"],
+        default="lxml",
+        help="XML condenser; both produce the same output (default: lxml)",
+    )
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        choices=range(10),
+        metavar="0-9",
+        help="Deflate level; lower is faster, higher is smaller (default: 6)",
+    )
+    parser.add_argument(
+        "--original",
+        help="Office file the directory was unpacked from; unchanged members "
+        "are copied from it without recompressing",
+    )
     args = parser.parse_args()
 
     try:
         success = pack_document(
-            args.input_directory, args.output_file, validate=not args.force
+            args.input_directory,
+            args.output_file,
+            validate=not args.force,
+            jobs=args.jobs,
+            engine=args.engine,
+            compression_level=args.compression_level,
+            original=args.original,
         )
 
         # Show warning if validation was skipped
@@ -42,13 +83,34 @@ def main():
         sys.exit(f"Error: {e}")
 
 
-def pack_document(input_dir, output_file, validate=False):
+def pack_document(
+    input_dir,
+    output_file,
+    validate=False,
+    jobs=1,
+    engine="lxml",
+    compression_level=None,
+    original=None,
+):
     """Pack a directory into an Office file (.docx/.pptx/.xlsx).
 
+    XML parts are condensed as they are read from input_dir and written straight
+    into the archive; input_dir is not modified. [Content_Types].xml is written
+    first and already compressed media (PNG, JPEG, ...) is stored, not deflated.
+
     Args:
         input_dir: Path to unpacked Office document directory
         output_file: Path to output Office file
         validate: If True, validates with soffice (default: False)
+        jobs: Number of processes condensing XML parts in parallel; 1 condenses
+            them in this process (default: 1)
+        engine: "lxml" streams each part through a whitespace stripper;
+            "minidom" parses each part into memory first. Both produce the
+            same bytes (default: "lxml")
+        compression_level: Deflate level from 0 to 9 (default: None, zlib's 6)
+        original: Optional Office file input_dir was unpacked from. Files whose
+            content, or condensed content, matches its member of the same name
+            are copied from it without decompressing or recompressing
 
     Returns:
         bool: True if successful, False if validation failed
@@ -60,29 +122,72 @@ def pack_document(input_dir, output_file, validate=False):
         raise ValueError(f"{input_dir} is not a directory")
     if output_file.suffix.lower() not in {".docx", ".pptx", ".xlsx"}:
         raise ValueError(f"{output_file} must be a .docx, .pptx, or .xlsx file")
+    if jobs < 1:
+        raise ValueError(f"jobs must be at least 1, got {jobs}")
+    if engine not in _CONDENSERS:
+        raise ValueError(f"Unknown engine {engine!r}; expected 'lxml' or 'minidom'")
+    if compression_level is not None and not 0 <= compression_level <= 9:
+        raise ValueError(f"compression_level must be 0-9, got {compression_level}")
+    if original is not None and not zipfile.is_zipfile(original):
+        raise ValueError(f"{original} is not a .docx, .pptx, or .xlsx file")
 
-    # Work in temporary directory to avoid modifying original
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_content_dir = Path(temp_dir) / "content"
-        shutil.copytree(input_dir, temp_content_dir)
-
-        # Process XML files to remove pretty-printing whitespace
-        for pattern in ["*.xml", "*.rels"]:
-            for xml_file in temp_content_dir.rglob(pattern):
-                condense_xml(xml_file)
-
-        # Create final Office file as zip archive
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zf:
-            for f in temp_content_dir.rglob("*"):
-                if f.is_file():
-                    zf.write(f, f.relative_to(temp_content_dir))
-
-        # Validate if requested
-        if validate:
-            if not validate_document(output_file):
-                output_file.unlink()  # Delete the corrupt file
-                return False
+    # [Content_Types].xml first, as Office and other consumers expect
+    members = [
+        (f, f.relative_to(input_dir).as_posix())
+        for f in input_dir.rglob("*")
+        if f.is_file()
+    ]
+    members.sort(key=lambda member: member[1] != "[Content_Types].xml")
+
+    # Create final Office file as zip archive
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with contextlib.ExitStack() as stack:
+        zf = stack.enter_context(
+            zipfile.ZipFile(
+                output_file, "w", zipfile.ZIP_DEFLATED, compresslevel=compression_level
+            )
+        )
+        source = stack.enter_context(zipfile.ZipFile(original)) if original else None
+
+        # Files identical to their original member need neither condensing nor
+        # compressing
+        reused = {}
+        for f, name in members:
+            info = _unchanged_member(source, name, path=f)
+            if info is not None:
+                reused[name] = info
+        xml_files = [
+            f
+            for f, name in members
+            if name not in reused and name.endswith((".xml", ".rels"))
+        ]
+
+        futures = {}
+        if jobs > 1 and len(xml_files) > 1:
+            executor = stack.enter_context(
+                ProcessPoolExecutor(max_workers=min(jobs, len(xml_files)))
+            )
+            # Largest parts first so one big part does not finish the pool alone
+            for f in sorted(xml_files, key=lambda f: f.stat().st_size, reverse=True):
+                futures[f] = executor.submit(_CONDENSERS[engine], f)
+        xml_files = set(xml_files)
+
+        for f, name in members:
+            info = reused.get(name)
+            data = None
+            if f in xml_files:
+                data = futures[f].result() if futures else _CONDENSERS[engine](f)
+                info = _unchanged_member(source, name, data=data)
+            if info is not None:
+                copy_raw_member(zf, source, info)
+            else:
+                _write_member(zf, f, name, data)
+
+    # Validate if requested
+    if validate:
+        if not validate_document(output_file):
+            output_file.unlink()  # Delete the corrupt file
+            return False
 
     return True
 
@@ -98,31 +203,15 @@ def validate_document(doc_path):
         case ".xlsx":
             filter_name = "html:HTML (StarCalc)"
 
+    # Conversions go to the pooled LibreOffice shared within this process
     with tempfile.TemporaryDirectory() as temp_dir:
         try:
-            result = subprocess.run(
-                [
-                    "soffice",
-                    "--headless",
-                    "--convert-to",
-                    filter_name,
-                    "--outdir",
-                    temp_dir,
-                    str(doc_path),
-                ],
-                capture_output=True,
-                timeout=10,
-                text=True,
-            )
-            if not (Path(temp_dir) / f"{doc_path.stem}.html").exists():
-                error_msg = result.stderr.strip() or "Document validation failed"
-                print(f"Validation error: {error_msg}", file=sys.stderr)
-                return False
+            get_service().convert(doc_path, temp_dir, filter_name)
             return True
         except FileNotFoundError:
             print("Warning: soffice not found. Skipping validation.", file=sys.stderr)
             return True
-        except subprocess.TimeoutExpired:
+        except TimeoutError:
             print("Validation error: Timeout during conversion", file=sys.stderr)
             return False
         except Exception as e:
@@ -132,6 +221,130 @@ def validate_document(doc_path):
 
 def condense_xml(xml_file):
     """Strip unnecessary whitespace and remove comments."""
+    condensed = _condense_minidom(xml_file)
+
+    # Write back the condensed XML
+    with open(xml_file, "wb") as f:
+        f.write(condensed)
+
+
+def copy_raw_member(zf, source, info):
+    """Copy a member's compressed bytes from source without recompressing.
+
+    zipfile has no public API for this, so the local header and data are written
+    the way ZipFile.write does, and the member is registered for the central
+    directory written on close. If zipfile lacks the internals this relies on,
+    the member is read and compressed again instead. info itself is not modified.
+
+    Args:
+        zf: ZipFile open for writing
+        source: ZipFile open for reading that contains info
+        info: ZipInfo of the member of source to copy
+
+    Raises:
+        ValueError: If the member's local header or data in source is corrupt
+    """
+    member = zipfile.ZipInfo(info.filename, info.date_time)
+    member.compress_type = info.compress_type
+    member.external_attr = info.external_attr
+    if not _can_copy_raw(zf, source):
+        zf.writestr(member, source.read(info), compresslevel=zf.compresslevel)
+        return
+
+    source.fp.seek(info.header_offset)
+    header = source.fp.read(zipfile.sizeFileHeader)
+    if header[:4] != zipfile.stringFileHeader:
+        raise ValueError(f"Bad local header for {info.filename} in {source.filename}")
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    source.fp.seek(name_length + extra_length, io.SEEK_CUR)
+
+    member.CRC = info.CRC
+    member.compress_size = info.compress_size
+    member.file_size = info.file_size
+    # Sizes and CRC are in the local header, so no data descriptor follows
+    member.flag_bits = info.flag_bits & ~_DATA_DESCRIPTOR
+    member.header_offset = zf.fp.tell()
+    zip64 = max(info.file_size, info.compress_size) > zipfile.ZIP64_LIMIT
+    zf.fp.write(member.FileHeader(zip64))
+
+    remaining = info.compress_size
+    while remaining:
+        chunk = source.fp.read(min(remaining, 1 << 20))
+        if not chunk:
+            raise ValueError(f"Truncated member {info.filename} in {source.filename}")
+        zf.fp.write(chunk)
+        remaining -= len(chunk)
+
+    zf.filelist.append(member)
+    zf.NameToInfo[member.filename] = member
+    zf.start_dir = zf.fp.tell()
+    zf._didModify = True
+
+
+# ==================== Private: Condensing ====================
+
+
+def _write_member(zf, path, name, data=None):
+    """Add a file to the archive, with data in place of its content if given.
+
+    Already compressed media is stored; deflating it again costs time and
+    gains nothing.
+    """
+    if path.suffix.lower() in _STORED_SUFFIXES:
+        compress_type = zipfile.ZIP_STORED
+    else:
+        compress_type = zf.compression
+    if data is None:
+        zf.write(path, name, compress_type=compress_type)
+    else:
+        # A ZipInfo passed to writestr does not pick up the archive's level
+        info = zipfile.ZipInfo.from_file(path, name)
+        zf.writestr(
+            info, data, compress_type=compress_type, compresslevel=zf.compresslevel
+        )
+
+
+def _can_copy_raw(zf, source):
+    """Return whether zipfile has the internals copy_raw_member writes through."""
+    return (
+        all(hasattr(zf, name) for name in _RAW_COPY_ATTRIBUTES)
+        and hasattr(source, "fp")
+        and hasattr(zipfile, "sizeFileHeader")
+        and hasattr(zipfile, "stringFileHeader")
+        and hasattr(zipfile.ZipInfo, "FileHeader")
+    )
+
+
+def _unchanged_member(source, name, path=None, data=None):
+    """Return the ZipInfo of source's member if it has the same content.
+
+    The content is that of path, or data if given, and is compared by size and
+    CRC-32, which is much cheaper than compressing it.
+    """
+    if source is None:
+        return None
+    try:
+        info = source.getinfo(name)
+    except KeyError:
+        return None
+    if info.flag_bits & _ENCRYPTED:
+        return None
+
+    if data is not None:
+        if len(data) != info.file_size:
+            return None
+        crc = zlib.crc32(data)
+    else:
+        if path.stat().st_size != info.file_size:
+            return None
+        crc = 0
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                crc = zlib.crc32(chunk, crc)
+    return info if crc == info.CRC else None
+
+
+def _condense_minidom(xml_file):
     with open(xml_file, "r", encoding="utf-8") as f:
         dom = defusedxml.minidom.parse(f)
 
@@ -150,9 +363,139 @@ def condense_xml(xml_file):
             ) or child.nodeType == child.COMMENT_NODE:
                 element.removeChild(child)
 
-    # Write back the condensed XML
-    with open(xml_file, "wb") as f:
-        f.write(dom.toxml(encoding="UTF-8"))
+    return dom.toxml(encoding="UTF-8")
+
+
+def _condense_lxml(xml_file):
+    """Condense like _condense_minidom while parsing, without building a DOM.
+
+    The text before a node is complete once the node's event arrives, so text is
+    written one event late, and finished siblings are dropped from the tree right
+    away so memory does not grow with the part. CDATA sections are written as
+    escaped text.
+    """
+    condensed = io.BytesIO()
+    out = ['<?xml version="1.0" encoding="UTF-8"?>']
+    # Open elements as [element, qualified name, has child nodes, keeps whitespace]
+    stack = []
+    # In-scope {namespace: prefix} for attributes, one dict per open element
+    scopes = [{_XML_NAMESPACE: "xml"}]
+    declarations = []
+
+    def add_text(parent, text):
+        # Whitespace-only text is dropped except in *:t elements
+        if text and (parent[3] or not text.isspace()):
+            open_element(parent)
+            out.append(_escape(text))
+
+    def open_element(parent):
+        if not parent[2]:
+            out.append(">")
+            parent[2] = True
+
+    for event, node in lxml.etree.iterparse(
+        str(xml_file),
+        events=("start-ns", "start", "end", "comment", "pi"),
+        resolve_entities=False,
+        no_network=True,
+        load_dtd=False,
+    ):
+        if event == "start-ns":
+            declarations.append(node)
+            continue
+
+        if event == "end":
+            element = stack.pop()
+            scopes.pop()
+            elem = element[0]
+            add_text(element, elem[-1].tail if len(elem) else elem.text)
+            out.append(f"</{element[1]}>" if element[2] else "/>")
+            elem.clear(keep_tail=True)
+            if len(out) > 4096:
+                condensed.write("".join(out).encode("utf-8"))
+                out.clear()
+            continue
+
+        # A start tag, comment or processing instruction is a new child node
+        # of the innermost open element; write the text before it first
+        parent = stack[-1] if stack else None
+        if parent is not None:
+            previous = node.getprevious()
+            if previous is None:
+                add_text(parent, parent[0].text)
+            else:
+                add_text(parent, previous.tail)
+                while node.getprevious() is not None:
+                    del parent[0][0]
+
+        if parent is not None:
+            # Comments are dropped except in *:t elements and outside the root
+            if event == "comment" and not parent[3]:
+                continue
+            open_element(parent)
+        if event == "comment":
+            out.append(f"<!--{node.text}-->")
+            continue
+        if event == "pi":
+            out.append(f"<?{node.target} {node.text or ''}?>")
+            continue
+
+        tag = node.tag
+        name = tag[tag.index("}") + 1 :] if tag[0] == "{" else tag
+        if node.prefix:
+            name = f"{node.prefix}:{name}"
+        out.append(f"<{name}")
+
+        prefixes = scopes[-1]
+        if declarations:
+            prefixes = dict(prefixes)
+            for prefix, namespace in declarations:
+                if prefix:
+                    prefixes[namespace] = prefix
+                    out.append(f' xmlns:{prefix}="{_escape(namespace)}"')
+                else:
+                    out.append(f' xmlns="{_escape(namespace)}"')
+            declarations = []
+        scopes.append(prefixes)
+
+        for attr, value in node.items():
+            if attr[0] == "{":
+                namespace, attr = attr[1:].split("}", 1)
+                attr = f"{prefixes[namespace]}:{attr}"
+            out.append(f' {attr}="{_escape(value)}"')
+        stack.append([node, name, False, name.endswith(":t")])
+
+    condensed.write("".join(out).encode("utf-8"))
+    return condensed.getvalue()
+
+
+def _escape(data):
+    # Same escaping as minidom's writer, including quotes in text
+    if "&" in data or "<" in data or ">" in data or '"' in data:
+        data = (
+            data.replace("&", "&amp;")
+            .replace("<", "&lt;")
+            .replace('"', "&quot;")
+            .replace(">", "&gt;")
+        )
+    return data
+
+
+_CONDENSERS = {"lxml": _condense_lxml, "minidom": _condense_minidom}
+_XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+# Media that is already compressed; EMF, WMF and TIFF usually are not and
+# still deflate well
+_STORED_SUFFIXES = {
+    # Images
+    *(".png", ".jpg", ".jpeg", ".gif", ".wdp", ".jxr", ".webp", ".emz", ".wmz"),
+    # Audio, video and archives
+    *(".mp3", ".m4a", ".wma", ".mp4", ".m4v", ".mov", ".wmv", ".avi", ".zip"),
+}
+_ENCRYPTED = 0x01
+_DATA_DESCRIPTOR = 0x08
+# ZipFile attributes copy_raw_member writes through, where zipfile has them
+_RAW_COPY_ATTRIBUTES = ("fp", "filelist", "NameToInfo", "start_dir", "_didModify")
 
 
 if __name__ == "__main__":
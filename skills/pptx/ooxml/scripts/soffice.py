@@ -0,0 +1,541 @@
+"""
+Pooled headless LibreOffice for document conversions.
+
+Starting soffice dominates the cost of a conversion, so OfficeService keeps
+headless LibreOffice workers and hands conversions to them: callers queue for a
+free worker, a failed conversion is retried on a restarted worker, and workers
+are recycled after a number of conversions.
+
+With LibreOffice's Python UNO bridge (the uno module) available, each worker is a
+soffice process listening on a local socket, and documents are converted over UNO
+without starting soffice again. Without it, each worker runs soffice --convert-to
+with a profile of its own, which lets conversions run in parallel.
+
+Worker profiles are kept between runs, so later processes skip LibreOffice's
+profile setup; each worker locks its profile while it uses it. The service shared
+by the scripts has SOFFICE_WORKERS workers (default: 1).
+
+Identical copies live in docx/ooxml/scripts and pptx/ooxml/scripts; keep them in
+sync. pptx/scripts/soffice.py and xlsx/soffice.py load one of them (that of their
+own skill, or of the docx skill for xlsx) instead of copying it.
+
+Usage:
+    from soffice import get_service
+
+    pdf_path = get_service().convert("deck.pptx", "out", "pdf")
+    get_service().recalculate("model.xlsx")
+
+    with OfficeService(workers=4) as service:
+        ...
+"""
+
+import atexit
+import getpass
+import itertools
+import os
+import queue
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+try:
+    import uno
+except ImportError:
+    uno = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Seconds to wait for a listening soffice to accept UNO connections
+STARTUP_TIMEOUT = 60
+
+_RECALC_MACRO = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE script:module PUBLIC "-//OpenOffice.org//DTD OfficeDocument 1.0//EN" "module.dtd">
+<script:module xmlns:script="http://openoffice.org/2000/script" script:name="Module1" script:language="StarBasic">
+    Sub RecalculateAndSave()
+      ThisComponent.calculateAll()
+      ThisComponent.store()
+      ThisComponent.close(True)
+    End Sub
+</script:module>"""
+_RECALC_MACRO_URL = (
+    "vnd.sun.star.script:Standard.Module1.RecalculateAndSave"
+    "?language=Basic&location=application"
+)
+
+# Export filters used when a conversion does not name one, by document service
+_DEFAULT_FILTERS = {
+    "pdf": {
+        "com.sun.star.presentation.PresentationDocument": "impress_pdf_Export",
+        "com.sun.star.sheet.SpreadsheetDocument": "calc_pdf_Export",
+        "com.sun.star.drawing.DrawingDocument": "draw_pdf_Export",
+        "com.sun.star.text.TextDocument": "writer_pdf_Export",
+    },
+    "html": {
+        "com.sun.star.presentation.PresentationDocument": "impress_html_Export",
+        "com.sun.star.sheet.SpreadsheetDocument": "HTML (StarCalc)",
+        "com.sun.star.text.TextDocument": "HTML (StarWriter)",
+    },
+}
+
+_service = None
+_service_lock = threading.Lock()
+
+
+class OfficeService:
+    """A pool of headless LibreOffice workers that conversions queue for."""
+
+    def __init__(
+        self,
+        workers=1,
+        timeout=60,
+        retries=1,
+        max_conversions=100,
+        use_uno=None,
+        profile_dir=None,
+    ):
+        """
+        Create the pool; soffice processes start when first needed.
+
+        Args:
+            workers: Number of conversions that can run at the same time
+            timeout: Default seconds a single conversion may take
+            retries: How often a failed conversion is retried on a restarted worker
+            max_conversions: Conversions after which a worker is restarted, to
+                release memory LibreOffice accumulates
+            use_uno: Use UNO listener workers (default: if the uno module is
+                available); False runs soffice --convert-to per conversion
+            profile_dir: Directory for the workers' LibreOffice profiles
+                (default: soffice-profiles-<user> in the temp directory)
+
+        Raises:
+            ValueError: If an argument is out of range or UNO is requested but
+                the uno module is not available
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        if retries < 0 or max_conversions < 1:
+            raise ValueError("retries must be >= 0 and max_conversions >= 1")
+        if use_uno is None:
+            use_uno = uno is not None
+        elif use_uno and uno is None:
+            raise ValueError("UNO workers need LibreOffice's Python uno module")
+
+        self.timeout = timeout
+        self.retries = retries
+        self.max_conversions = max_conversions
+        self._closed = False
+        if profile_dir is None:
+            user = getpass.getuser()
+            profile_dir = Path(tempfile.gettempdir()) / f"soffice-profiles-{user}"
+        worker_class = _UnoWorker if use_uno else _CliWorker
+        self._workers = [
+            worker_class(*_claim_profile(Path(profile_dir))) for _ in range(workers)
+        ]
+        self._idle = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def convert(self, input_path, output_dir, convert_to, timeout=None):
+        """
+        Convert a document, as soffice --convert-to does.
+
+        Args:
+            input_path: Document to convert
+            output_dir: Directory for the converted file
+            convert_to: Target as for --convert-to: an extension with an optional
+                export filter, such as "pdf" or "html:impress_html_Export"
+            timeout: Seconds the conversion may take (default: the service's)
+
+        Returns:
+            Path: The converted file, output_dir / f"{input stem}.{extension}"
+
+        Raises:
+            FileNotFoundError: If soffice is not installed
+            ValueError: If no export filter is named and none is known for the
+                document type; such conversions are not retried
+            TimeoutError: If the conversion did not finish in time
+            RuntimeError: If LibreOffice could not convert the document
+        """
+        input_path = Path(input_path).resolve()
+        output_dir = Path(output_dir).resolve()
+        extension = convert_to.partition(":")[0]
+        output_path = output_dir / f"{input_path.stem}.{extension}"
+
+        def job(worker, timeout):
+            worker.convert(input_path, output_dir, output_path, convert_to, timeout)
+            if not output_path.exists():
+                raise RuntimeError(f"Conversion of {input_path.name} produced no output")
+            return output_path
+
+        return self._run(job, timeout)
+
+    def recalculate(self, path, timeout=None):
+        """
+        Recalculate all formulas of a spreadsheet and save it in place.
+
+        Args:
+            path: Spreadsheet to recalculate
+            timeout: Seconds the recalculation may take (default: the service's)
+
+        Raises:
+            FileNotFoundError: If soffice is not installed
+            TimeoutError: If the recalculation did not finish in time
+            RuntimeError: If LibreOffice could not recalculate the spreadsheet
+        """
+        path = Path(path).resolve()
+        self._run(lambda worker, timeout: worker.recalculate(path, timeout), timeout)
+
+    def close(self):
+        """Stop all workers and release their profiles."""
+        if self._closed:
+            return
+        self._closed = True
+        for worker in self._workers:
+            worker.stop()
+            if worker.profile_lock is not None:
+                worker.profile_lock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ==================== Private: Scheduling ====================
+
+    def _run(self, job, timeout):
+        """Run job(worker, timeout) on a free worker, retrying on failure."""
+        if self._closed:
+            raise ValueError("OfficeService is closed")
+        if timeout is None:
+            timeout = self.timeout
+        for attempt in range(self.retries + 1):
+            # Conversions queue here until a worker is free
+            worker = self._idle.get()
+            try:
+                result = job(worker, timeout)
+            except FileNotFoundError:
+                raise
+            except (RuntimeError, TimeoutError):
+                # Start over with a fresh process and profile state
+                worker.stop()
+                if attempt == self.retries:
+                    raise
+            else:
+                worker.conversions += 1
+                if worker.conversions >= self.max_conversions:
+                    worker.stop()
+                return result
+            finally:
+                self._idle.put(worker)
+
+
+def get_service(workers=None):
+    """Return the process-wide OfficeService, created on first use and closed at exit.
+
+    pack.py, thumbnail.py and recalc.py share it, so conversions within one
+    process reuse the same workers.
+
+    Args:
+        workers: Number of workers if the service is created by this call
+            (default: the SOFFICE_WORKERS environment variable, or 1)
+
+    Raises:
+        ValueError: If SOFFICE_WORKERS is not a number, or workers is below 1
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            if workers is None:
+                value = os.environ.get("SOFFICE_WORKERS", "1")
+                try:
+                    workers = int(value)
+                except ValueError:
+                    raise ValueError(
+                        f"SOFFICE_WORKERS must be a number, got {value!r}"
+                    ) from None
+            _service = OfficeService(workers=workers)
+            atexit.register(_service.close)
+        return _service
+
+
+def _forget_service():
+    # A forked child must not use or stop its parent's workers
+    global _service, _service_lock
+    _service = None
+    _service_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_service)
+
+
+# ==================== Private: Workers ====================
+
+
+class _CliWorker:
+    """Runs soffice once per conversion with a profile kept between conversions."""
+
+    def __init__(self, profile_dir, profile_lock):
+        self.profile_dir = profile_dir
+        self.profile_lock = profile_lock
+        self.conversions = 0
+
+    def convert(self, input_path, output_dir, output_path, convert_to, timeout):
+        output_path.unlink(missing_ok=True)
+        result = self._soffice(
+            ["--convert-to", convert_to, "--outdir", str(output_dir), str(input_path)],
+            timeout,
+        )
+        if not output_path.exists():
+            raise RuntimeError(result.stderr.strip() or "Document conversion failed")
+
+    def recalculate(self, path, timeout):
+        self._install_macro()
+        before = _file_state(path)
+        try:
+            result = self._soffice([_RECALC_MACRO_URL, str(path)], timeout)
+        except TimeoutError:
+            # soffice may keep running after the macro has saved the file, so
+            # reaching the timeout is only an error if the file was not saved
+            if _file_state(path) != before:
+                return
+            raise TimeoutError(
+                f"soffice did not save {path.name} within {timeout}s"
+            ) from None
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or "Recalculation failed")
+
+    def stop(self):
+        # Nothing keeps running between conversions
+        self.conversions = 0
+
+    def _install_macro(self):
+        macro_dir = self.profile_dir / "user" / "basic" / "Standard"
+        macro_file = macro_dir / "Module1.xba"
+        if macro_file.exists() and "RecalculateAndSave" in macro_file.read_text():
+            return
+        if not macro_dir.exists():
+            # Let soffice create the profile with its Standard library first
+            self._soffice(["--terminate_after_init"], STARTUP_TIMEOUT)
+            macro_dir.mkdir(parents=True, exist_ok=True)
+        macro_file.write_text(_RECALC_MACRO)
+
+    def _soffice(self, args, timeout):
+        """Run soffice with this worker's profile, killing it on timeout."""
+        process = subprocess.Popen(
+            [
+                "soffice",
+                f"-env:UserInstallation={self.profile_dir.as_uri()}",
+                "--headless",
+                "--norestore",
+                *args,
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True,
+        )
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            # soffice hands off to soffice.bin, so stop the whole process group
+            _kill_group(process)
+            process.communicate()
+            raise TimeoutError(f"soffice did not finish within {timeout}s")
+        return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
+
+
+class _UnoWorker:
+    """A soffice process listening on a local socket, driven over UNO."""
+
+    def __init__(self, profile_dir, profile_lock):
+        self.profile_dir = profile_dir
+        self.profile_lock = profile_lock
+        self.conversions = 0
+        self._process = None
+        self._desktop = None
+        self._timed_out = False
+
+    def convert(self, input_path, output_dir, output_path, convert_to, timeout):
+        extension, _, filter_name = convert_to.partition(":")
+        output_path.unlink(missing_ok=True)
+
+        def work():
+            doc = self._load(input_path)
+            try:
+                name = filter_name or _default_filter(doc, extension)
+                doc.storeToURL(
+                    uno.systemPathToFileUrl(str(output_path)),
+                    _properties(FilterName=name, Overwrite=True),
+                )
+            finally:
+                doc.close(True)
+
+        self._call(work, timeout)
+
+    def recalculate(self, path, timeout):
+        def work():
+            doc = self._load(path)
+            try:
+                doc.calculateAll()
+                doc.store()
+            finally:
+                doc.close(True)
+
+        self._call(work, timeout)
+
+    def stop(self):
+        if self._desktop is not None:
+            try:
+                self._desktop.terminate()
+            except Exception:
+                pass
+            self._desktop = None
+        if self._process is not None:
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                _kill_group(self._process)
+                self._process.wait()
+            self._process = None
+        self.conversions = 0
+
+    def _call(self, work, timeout):
+        """Run work() on the listening soffice, killing it if it takes too long."""
+        self._start()
+        self._timed_out = False
+        timer = threading.Timer(timeout, self._kill)
+        timer.start()
+        try:
+            work()
+        except Exception as e:
+            if self._timed_out:
+                raise TimeoutError(f"soffice did not finish within {timeout}s") from e
+            if isinstance(e, ValueError):
+                # A bad argument, such as a missing export filter; the worker is fine
+                raise
+            raise RuntimeError(f"LibreOffice failed: {e}") from e
+        finally:
+            timer.cancel()
+
+    def _kill(self):
+        self._timed_out = True
+        if self._process is not None:
+            _kill_group(self._process)
+
+    def _start(self):
+        if self._process is not None and self._process.poll() is None:
+            return
+        self.stop()
+        port = _free_port()
+        connection = f"socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"
+        self._process = subprocess.Popen(
+            [
+                "soffice",
+                f"-env:UserInstallation={self.profile_dir.as_uri()}",
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--nodefault",
+                "--norestore",
+                "--nolockcheck",
+                f"--accept={connection}",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local
+        )
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while True:
+            try:
+                context = resolver.resolve(f"uno:{connection}")
+                break
+            except Exception:
+                if self._process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError("soffice did not accept UNO connections")
+                time.sleep(0.25)
+        self._desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+
+    def _load(self, path):
+        doc = self._desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(str(path)), "_blank", 0, _properties(Hidden=True)
+        )
+        if doc is None:
+            raise RuntimeError(f"LibreOffice could not open {path.name}")
+        return doc
+
+
+def _claim_profile(root):
+    """Return the first profile directory under root that no process uses, locked.
+
+    Returns:
+        tuple: (profile directory, open lock file or None if locks are not
+        supported, in which case a new directory is used)
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        return Path(tempfile.mkdtemp(prefix="worker", dir=root)), None
+    for slot in itertools.count():
+        lock = open(root / f"worker{slot}.lock", "w")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            continue
+        return root / f"worker{slot}", lock
+
+
+def _default_filter(doc, extension):
+    for service, filter_name in _DEFAULT_FILTERS.get(extension, {}).items():
+        if doc.supportsService(service):
+            return filter_name
+    raise ValueError(f"Name an export filter for {extension}, as in '{extension}:Filter'")
+
+
+def _properties(**values):
+    from com.sun.star.beans import PropertyValue
+
+    properties = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name, prop.Value = name, value
+        properties.append(prop)
+    return tuple(properties)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _file_state(path):
+    """Return (size, modification time) of a file, or None if it is missing."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _kill_group(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        process.kill()
@@ -2,11 +2,32 @@
 Base validator with common validation logic for document files.
 """
 
+import copy
+import io
+import os
 import re
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import lxml.etree
 
+# Directory of the bundled XSD schemas
+SCHEMAS_DIR = Path(__file__).parent.parent.parent / "schemas"
+
+# Compiled schemas shared by all validators in this process, keyed by schema
+# path; a schema that fails to compile is stored as its error
+_schema_cache = {}
+
+# Guards _schema_cache, and validation with a cached schema since each
+# XMLSchema keeps the error log of its last run
+_schema_lock = threading.RLock()
+
+# Validator built once per worker process by _init_xsd_worker
+_worker_validator = None
+
 
 class BaseSchemaValidator:
     """Base validator with common validation logic for document files."""
@@ -103,13 +124,37 @@ class BaseSchemaValidator:
         "http://www.w3.org/XML/1998/namespace",
     }
 
-    def __init__(self, unpacked_dir, original_file, verbose=False):
+    # Template placeholders removed from text content before XSD validation
+    TEMPLATE_TAG_PATTERN = re.compile(r"\{\{[^}]*\}\}")
+
+    def __init__(
+        self, unpacked_dir, original_file, verbose=False, jobs=1, cache=None
+    ):
+        """
+        Args:
+            unpacked_dir: Path to the unpacked document
+            original_file: Path to the original document, the baseline for XSD errors
+            verbose: Enable verbose output (default: False)
+            jobs: Number of processes validating parts against XSD schemas
+                (default: 1)
+            cache: Optional dict of per-part check results. Passing the same dict
+                to the validators of later runs on the same unpacked document and
+                original only re-checks the parts whose content changed.
+
+        Raises:
+            ValueError: If jobs is less than 1
+        """
+        if jobs < 1:
+            raise ValueError(f"jobs must be at least 1, got {jobs}")
+
         self.unpacked_dir = Path(unpacked_dir).resolve()
         self.original_file = Path(original_file)
         self.verbose = verbose
+        # Number of processes validating parts against XSD schemas
+        self.jobs = jobs
 
         # Set schemas directory
-        self.schemas_dir = Path(__file__).parent.parent.parent / "schemas"
+        self.schemas_dir = SCHEMAS_DIR
 
         # Get all XML and .rels files
         patterns = ["*.xml", "*.rels"]
@@ -120,28 +165,101 @@ class BaseSchemaValidator:
         if not self.xml_files:
             print(f"Warning: No XML files found in {self.unpacked_dir}")
 
+        # Parsed trees shared by all checks: path -> ((mtime_ns, size), tree or error)
+        self._trees = {}
+
+        # Content of each file as (size, CRC-32): path -> ((mtime_ns, size), key)
+        self._keys = {}
+
+        # Results of per-part checks: (class, check, path) -> (content keys, result)
+        self._cache = {} if cache is None else cache
+
+        # Original archive, opened on first use by _get_original_file_errors, the
+        # XSD errors of its parts and their content keys, by part name
+        self._original_zip = None
+        self._original_errors = {}
+        self._original_keys = None
+
     def validate(self):
         """Run all validation checks and return True if all pass."""
         raise NotImplementedError("Subclasses must implement the validate method")
 
+    def _parse(self, xml_file):
+        """Parse an XML file once and share the tree between all checks.
+
+        The tree is reused until the file changes on disk, so checks must not
+        modify it; checks that need a changed tree work on a copy. Syntax errors
+        are remembered and raised again, like lxml.etree.parse would.
+
+        Args:
+            xml_file: Path to the XML file
+
+        Returns:
+            lxml.etree._ElementTree: The parsed tree (read-only)
+
+        Raises:
+            lxml.etree.XMLSyntaxError: If the file is not well-formed
+        """
+        xml_file = Path(xml_file)
+        stat = xml_file.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._trees.get(xml_file)
+        if cached is None or cached[0] != stamp:
+            data = xml_file.read_bytes()
+            self._keys[xml_file] = (stamp, (len(data), zlib.crc32(data)))
+            try:
+                result = lxml.etree.parse(io.BytesIO(data), base_url=str(xml_file))
+            except lxml.etree.XMLSyntaxError as e:
+                result = e
+            cached = self._trees[xml_file] = (stamp, result)
+
+        if isinstance(cached[1], lxml.etree.XMLSyntaxError):
+            raise cached[1]
+        return cached[1]
+
+    def _content_key(self, xml_file):
+        """Return the content of a file as (size, CRC-32), comparable to a zip entry.
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        xml_file = Path(xml_file)
+        stat = xml_file.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._keys.get(xml_file)
+        if cached is None or cached[0] != stamp:
+            data = xml_file.read_bytes()
+            cached = self._keys[xml_file] = (stamp, (len(data), zlib.crc32(data)))
+        return cached[1]
+
+    def _cached(self, check, xml_file, compute, depends_on=()):
+        """Return compute(xml_file), reusing the result of an earlier run of check.
+
+        The result is reused while xml_file and the files in depends_on have the
+        same content as when it was computed, so compute must only read those
+        files. Exceptions raised by compute are not cached.
+        """
+        try:
+            key = tuple(self._content_key(f) for f in (xml_file, *depends_on))
+        except OSError:
+            return compute(xml_file)
+
+        cache_key = (type(self), check, xml_file)
+        entry = self._cache.get(cache_key)
+        if entry is None or entry[0] != key:
+            entry = self._cache[cache_key] = (key, compute(xml_file))
+        return entry[1]
+
     def validate_xml(self):
         """Validate that all XML files are well-formed."""
         errors = []
 
         for xml_file in self.xml_files:
-            try:
-                # Try to parse the XML file
-                lxml.etree.parse(str(xml_file))
-            except lxml.etree.XMLSyntaxError as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                    f"Line {e.lineno}: {e.msg}"
-                )
-            except Exception as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                    f"Unexpected error: {str(e)}"
-                )
+            error = self._cached("xml", xml_file, self._xml_error)
+            if error:
+                errors.append(error)
 
         if errors:
             print(f"FAILED - Found {len(errors)} XML violations:")
@@ -153,26 +271,31 @@ class BaseSchemaValidator:
                 print("PASSED - All XML files are well-formed")
             return True
 
+    def _xml_error(self, xml_file):
+        """Return the well-formedness error of one file, or None."""
+        try:
+            # Try to parse the XML file
+            self._parse(xml_file)
+        except lxml.etree.XMLSyntaxError as e:
+            return (
+                f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                f"Line {e.lineno}: {e.msg}"
+            )
+        except Exception as e:
+            return (
+                f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                f"Unexpected error: {str(e)}"
+            )
+        return None
+
     def validate_namespaces(self):
         """Validate that namespace prefixes in Ignorable attributes are declared."""
         errors = []
 
         for xml_file in self.xml_files:
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                declared = set(root.nsmap.keys()) - {None}  # Exclude default namespace
-
-                for attr_val in [
-                    v for k, v in root.attrib.items() if k.endswith("Ignorable")
-                ]:
-                    undeclared = set(attr_val.split()) - declared
-                    errors.extend(
-                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                        f"Namespace '{ns}' in Ignorable but not declared"
-                        for ns in undeclared
-                    )
-            except lxml.etree.XMLSyntaxError:
-                continue
+            errors.extend(
+                self._cached("namespaces", xml_file, self._namespace_errors)
+            )
 
         if errors:
             print(f"FAILED - {len(errors)} namespace issues:")
@@ -183,86 +306,49 @@ class BaseSchemaValidator:
             print("PASSED - All namespace prefixes properly declared")
         return True
 
+    def _namespace_errors(self, xml_file):
+        """Return the undeclared Ignorable namespace prefixes of one file as errors."""
+        errors = []
+        try:
+            root = self._parse(xml_file).getroot()
+            declared = set(root.nsmap.keys()) - {None}  # Exclude default namespace
+
+            for attr_val in [
+                v for k, v in root.attrib.items() if k.endswith("Ignorable")
+            ]:
+                undeclared = set(attr_val.split()) - declared
+                errors.extend(
+                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                    f"Namespace '{ns}' in Ignorable but not declared"
+                    for ns in undeclared
+                )
+        except lxml.etree.XMLSyntaxError:
+            pass
+        return errors
+
     def validate_unique_ids(self):
         """Validate that specific IDs are unique according to OOXML requirements."""
         errors = []
         global_ids = {}  # Track globally unique IDs across all files
 
         for xml_file in self.xml_files:
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                file_ids = {}  # Track IDs that must be unique within this file
+            relative_path = xml_file.relative_to(self.unpacked_dir)
+            for entry in self._cached("unique_ids", xml_file, self._unique_id_entries):
+                if isinstance(entry, str):
+                    errors.append(entry)
+                    continue
 
-                # Remove all mc:AlternateContent elements from the tree
-                mc_elements = root.xpath(
-                    ".//mc:AlternateContent", namespaces={"mc": self.MC_NAMESPACE}
-                )
-                for elem in mc_elements:
-                    elem.getparent().remove(elem)
-
-                # Now check IDs in the cleaned tree
-                for elem in root.iter():
-                    # Get the element name without namespace
-                    tag = (
-                        elem.tag.split("}")[-1].lower()
-                        if "}" in elem.tag
-                        else elem.tag.lower()
+                # Check global uniqueness
+                id_value, line, tag = entry
+                if id_value in global_ids:
+                    prev_file, prev_line, prev_tag = global_ids[id_value]
+                    errors.append(
+                        f"  {relative_path}: "
+                        f"Line {line}: Global ID '{id_value}' in <{tag}> "
+                        f"already used in {prev_file} at line {prev_line} in <{prev_tag}>"
                     )
-
-                    # Check if this element type has ID uniqueness requirements
-                    if tag in self.UNIQUE_ID_REQUIREMENTS:
-                        attr_name, scope = self.UNIQUE_ID_REQUIREMENTS[tag]
-
-                        # Look for the specified attribute
-                        id_value = None
-                        for attr, value in elem.attrib.items():
-                            attr_local = (
-                                attr.split("}")[-1].lower()
-                                if "}" in attr
-                                else attr.lower()
-                            )
-                            if attr_local == attr_name:
-                                id_value = value
-                                break
-
-                        if id_value is not None:
-                            if scope == "global":
-                                # Check global uniqueness
-                                if id_value in global_ids:
-                                    prev_file, prev_line, prev_tag = global_ids[
-                                        id_value
-                                    ]
-                                    errors.append(
-                                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                        f"Line {elem.sourceline}: Global ID '{id_value}' in <{tag}> "
-                                        f"already used in {prev_file} at line {prev_line} in <{prev_tag}>"
-                                    )
-                                else:
-                                    global_ids[id_value] = (
-                                        xml_file.relative_to(self.unpacked_dir),
-                                        elem.sourceline,
-                                        tag,
-                                    )
-                            elif scope == "file":
-                                # Check file-level uniqueness
-                                key = (tag, attr_name)
-                                if key not in file_ids:
-                                    file_ids[key] = {}
-
-                                if id_value in file_ids[key]:
-                                    prev_line = file_ids[key][id_value]
-                                    errors.append(
-                                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                        f"Line {elem.sourceline}: Duplicate {attr_name}='{id_value}' in <{tag}> "
-                                        f"(first occurrence at line {prev_line})"
-                                    )
-                                else:
-                                    file_ids[key][id_value] = elem.sourceline
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
-                )
+                else:
+                    global_ids[id_value] = (relative_path, line, tag)
 
         if errors:
             print(f"FAILED - Found {len(errors)} ID uniqueness violations:")
@@ -274,6 +360,73 @@ class BaseSchemaValidator:
                 print("PASSED - All required IDs are unique")
             return True
 
+    def _unique_id_entries(self, xml_file):
+        """Check the IDs of one file that must be unique.
+
+        Returns:
+            list: In document order, error messages for IDs duplicated within the
+                file and (id_value, line, tag) tuples for IDs that must be unique
+                across all files
+        """
+        entries = []
+        try:
+            root = self._parse(xml_file).getroot()
+            file_ids = {}  # Track IDs that must be unique within this file
+
+            # Check IDs outside mc:AlternateContent elements, skipping them
+            # instead of removing them from the shared tree
+            alternate_content = f"{{{self.MC_NAMESPACE}}}AlternateContent"
+            walker = lxml.etree.iterwalk(root, events=("start",))
+            for _, elem in walker:
+                if elem.tag == alternate_content and elem is not root:
+                    walker.skip_subtree()
+                    continue
+
+                # Get the element name without namespace
+                tag = (
+                    elem.tag.split("}")[-1].lower()
+                    if "}" in elem.tag
+                    else elem.tag.lower()
+                )
+
+                # Check if this element type has ID uniqueness requirements
+                if tag in self.UNIQUE_ID_REQUIREMENTS:
+                    attr_name, scope = self.UNIQUE_ID_REQUIREMENTS[tag]
+
+                    # Look for the specified attribute
+                    id_value = None
+                    for attr, value in elem.attrib.items():
+                        attr_local = (
+                            attr.split("}")[-1].lower() if "}" in attr else attr.lower()
+                        )
+                        if attr_local == attr_name:
+                            id_value = value
+                            break
+
+                    if id_value is not None:
+                        if scope == "global":
+                            # Checked across files by validate_unique_ids
+                            entries.append((id_value, elem.sourceline, tag))
+                        elif scope == "file":
+                            # Check file-level uniqueness
+                            key = (tag, attr_name)
+                            if key not in file_ids:
+                                file_ids[key] = {}
+
+                            if id_value in file_ids[key]:
+                                prev_line = file_ids[key][id_value]
+                                entries.append(
+                                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                                    f"Line {elem.sourceline}: Duplicate {attr_name}='{id_value}' in <{tag}> "
+                                    f"(first occurrence at line {prev_line})"
+                                )
+                            else:
+                                file_ids[key][id_value] = elem.sourceline
+
+        except (lxml.etree.XMLSyntaxError, Exception) as e:
+            entries.append(f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}")
+        return entries
+
     def validate_file_references(self):
         """
         Validate that all .rels files properly reference files and that all files are referenced.
@@ -310,7 +463,7 @@ class BaseSchemaValidator:
         for rels_file in rels_files:
             try:
                 # Parse relationships file
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                rels_root = self._parse(rels_file).getroot()
 
                 # Get the directory where this .rels file is located
                 rels_dir = rels_file.parent
@@ -390,8 +543,6 @@ class BaseSchemaValidator:
         Validate that all r:id attributes in XML files reference existing IDs
         in their corresponding .rels files, and optionally validate relationship types.
         """
-        import lxml.etree
-
         errors = []
 
         # Process each XML file that might contain r:id references
@@ -409,68 +560,14 @@ class BaseSchemaValidator:
             if not rels_file.exists():
                 continue
 
-            try:
-                # Parse the .rels file to get valid relationship IDs and their types
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
-                rid_to_type = {}
-
-                for rel in rels_root.findall(
-                    f".//{{{self.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
-                ):
-                    rid = rel.get("Id")
-                    rel_type = rel.get("Type", "")
-                    if rid:
-                        # Check for duplicate rIds
-                        if rid in rid_to_type:
-                            rels_rel_path = rels_file.relative_to(self.unpacked_dir)
-                            errors.append(
-                                f"  {rels_rel_path}: Line {rel.sourceline}: "
-                                f"Duplicate relationship ID '{rid}' (IDs must be unique)"
-                            )
-                        # Extract just the type name from the full URL
-                        type_name = (
-                            rel_type.split("/")[-1] if "/" in rel_type else rel_type
-                        )
-                        rid_to_type[rid] = type_name
-
-                # Parse the XML file to find all r:id references
-                xml_root = lxml.etree.parse(str(xml_file)).getroot()
-
-                # Find all elements with r:id attributes
-                for elem in xml_root.iter():
-                    # Check for r:id attribute (relationship ID)
-                    rid_attr = elem.get(f"{{{self.OFFICE_RELATIONSHIPS_NAMESPACE}}}id")
-                    if rid_attr:
-                        xml_rel_path = xml_file.relative_to(self.unpacked_dir)
-                        elem_name = (
-                            elem.tag.split("}")[-1] if "}" in elem.tag else elem.tag
-                        )
-
-                        # Check if the ID exists
-                        if rid_attr not in rid_to_type:
-                            errors.append(
-                                f"  {xml_rel_path}: Line {elem.sourceline}: "
-                                f"<{elem_name}> references non-existent relationship '{rid_attr}' "
-                                f"(valid IDs: {', '.join(sorted(rid_to_type.keys())[:5])}{'...' if len(rid_to_type) > 5 else ''})"
-                            )
-                        # Check if we have type expectations for this element
-                        elif self.ELEMENT_RELATIONSHIP_TYPES:
-                            expected_type = self._get_expected_relationship_type(
-                                elem_name
-                            )
-                            if expected_type:
-                                actual_type = rid_to_type[rid_attr]
-                                # Check if the actual type matches or contains the expected type
-                                if expected_type not in actual_type.lower():
-                                    errors.append(
-                                        f"  {xml_rel_path}: Line {elem.sourceline}: "
-                                        f"<{elem_name}> references '{rid_attr}' which points to '{actual_type}' "
-                                        f"but should point to a '{expected_type}' relationship"
-                                    )
-
-            except Exception as e:
-                xml_rel_path = xml_file.relative_to(self.unpacked_dir)
-                errors.append(f"  Error processing {xml_rel_path}: {e}")
+            errors.extend(
+                self._cached(
+                    "relationship_ids",
+                    xml_file,
+                    self._relationship_id_errors,
+                    depends_on=(rels_file,),
+                )
+            )
 
         if errors:
             print(f"FAILED - Found {len(errors)} relationship ID reference errors:")
@@ -483,6 +580,76 @@ class BaseSchemaValidator:
                 print("PASSED - All relationship ID references are valid")
             return True
 
+    def _relationship_id_errors(self, xml_file):
+        """Return the r:id errors of one file checked against its .rels file."""
+        errors = []
+        rels_file = xml_file.parent / "_rels" / f"{xml_file.name}.rels"
+
+        try:
+            # Parse the .rels file to get valid relationship IDs and their types
+            rels_root = self._parse(rels_file).getroot()
+            rid_to_type = {}
+
+            for rel in rels_root.findall(
+                f".//{{{self.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
+            ):
+                rid = rel.get("Id")
+                rel_type = rel.get("Type", "")
+                if rid:
+                    # Check for duplicate rIds
+                    if rid in rid_to_type:
+                        rels_rel_path = rels_file.relative_to(self.unpacked_dir)
+                        errors.append(
+                            f"  {rels_rel_path}: Line {rel.sourceline}: "
+                            f"Duplicate relationship ID '{rid}' (IDs must be unique)"
+                        )
+                    # Extract just the type name from the full URL
+                    type_name = (
+                        rel_type.split("/")[-1] if "/" in rel_type else rel_type
+                    )
+                    rid_to_type[rid] = type_name
+
+            # Parse the XML file to find all r:id references
+            xml_root = self._parse(xml_file).getroot()
+
+            # Find all elements with r:id attributes
+            for elem in xml_root.iter():
+                # Check for r:id attribute (relationship ID)
+                rid_attr = elem.get(f"{{{self.OFFICE_RELATIONSHIPS_NAMESPACE}}}id")
+                if rid_attr:
+                    xml_rel_path = xml_file.relative_to(self.unpacked_dir)
+                    elem_name = (
+                        elem.tag.split("}")[-1] if "}" in elem.tag else elem.tag
+                    )
+
+                    # Check if the ID exists
+                    if rid_attr not in rid_to_type:
+                        errors.append(
+                            f"  {xml_rel_path}: Line {elem.sourceline}: "
+                            f"<{elem_name}> references non-existent relationship '{rid_attr}' "
+                            f"(valid IDs: {', '.join(sorted(rid_to_type.keys())[:5])}{'...' if len(rid_to_type) > 5 else ''})"
+                        )
+                    # Check if we have type expectations for this element
+                    elif self.ELEMENT_RELATIONSHIP_TYPES:
+                        expected_type = self._get_expected_relationship_type(
+                            elem_name
+                        )
+                        if expected_type:
+                            actual_type = rid_to_type[rid_attr]
+                            # Check if the actual type matches or contains the expected type
+                            if expected_type not in actual_type.lower():
+                                errors.append(
+                                    f"  {xml_rel_path}: Line {elem.sourceline}: "
+                                    f"<{elem_name}> references '{rid_attr}' which points to '{actual_type}' "
+                                    f"but should point to a '{expected_type}' relationship"
+                                )
+
+        except Exception as e:
+            xml_rel_path = xml_file.relative_to(self.unpacked_dir)
+            errors.append(f"  Error processing {xml_rel_path}: {e}")
+
+        return errors
+
     def _get_expected_relationship_type(self, element_name):
         """
         Get the expected relationship type for an element.
@@ -531,7 +698,7 @@ class BaseSchemaValidator:
 
         try:
             # Parse and get all declared parts and extensions
-            root = lxml.etree.parse(str(content_types_file)).getroot()
+            root = self._parse(content_types_file).getroot()
             declared_parts = set()
             declared_extensions = set()
 
@@ -593,7 +760,7 @@ class BaseSchemaValidator:
                     continue
 
                 try:
-                    root_tag = lxml.etree.parse(str(xml_file)).getroot().tag
+                    root_tag = self._cached("root_tag", xml_file, self._root_tag)
                     root_name = root_tag.split("}")[-1] if "}" in root_tag else root_tag
 
                     if root_name in declarable_roots and path_str not in declared_parts:
@@ -638,6 +805,10 @@ class BaseSchemaValidator:
                 )
             return True
 
+    def _root_tag(self, xml_file):
+        """Return the tag of the root element of one file."""
+        return self._parse(xml_file).getroot().tag
+
     def validate_file_against_xsd(self, xml_file, verbose=False):
         """Validate a single XML file against XSD schema, comparing with original.
 
@@ -692,11 +863,13 @@ class BaseSchemaValidator:
         valid_count = 0
         skipped_count = 0
 
-        for xml_file in self.xml_files:
+        try:
+            results = self._validate_files_against_xsd()
+        finally:
+            self._close_original()
+
+        for xml_file, (is_valid, new_file_errors) in zip(self.xml_files, results):
             relative_path = str(xml_file.relative_to(self.unpacked_dir))
-            is_valid, new_file_errors = self.validate_file_against_xsd(
-                xml_file, verbose=False
-            )
 
             if is_valid is None:
                 skipped_count += 1
@@ -738,6 +911,72 @@ class BaseSchemaValidator:
                 print("\nPASSED - No new XSD validation errors introduced")
             return True
 
+    def _validate_files_against_xsd(self):
+        """Run validate_file_against_xsd on every part, in the order of self.xml_files.
+
+        Results cached by an earlier run are reused for unchanged parts, and parts
+        identical to their original are not validated: they cannot have errors
+        that the original does not have.
+        """
+        results = [None] * len(self.xml_files)
+        keys = {}
+        pending = []
+        for i, xml_file in enumerate(self.xml_files):
+            try:
+                keys[i] = key = self._content_key(xml_file)
+            except OSError:
+                pending.append(i)
+                continue
+
+            entry = self._cache.get((type(self), "xsd", xml_file))
+            if entry is not None and entry[0] == key:
+                results[i] = entry[1]
+            elif key == self._original_key(xml_file):
+                skipped = self._get_schema_path(xml_file) is None
+                results[i] = (None if skipped else True, set())
+            else:
+                pending.append(i)
+
+        pending_files = [self.xml_files[i] for i in pending]
+        if self.jobs > 1:
+            computed = self._validate_files_in_parallel(pending_files)
+        else:
+            computed = [
+                self.validate_file_against_xsd(xml_file, verbose=False)
+                for xml_file in pending_files
+            ]
+
+        for i, result in zip(pending, computed):
+            results[i] = result
+            if i in keys:
+                self._cache[(type(self), "xsd", self.xml_files[i])] = (keys[i], result)
+        return results
+
+    def _validate_files_in_parallel(self, xml_files):
+        """Run validate_file_against_xsd on xml_files in a pool of processes.
+
+        Each worker builds its own validator, so it keeps its own compiled
+        schemas and original archive. Results are in the order of xml_files.
+        """
+        results = [(None, set())] * len(xml_files)
+        # Only parts with a schema need a worker, largest first
+        indexes = [i for i, f in enumerate(xml_files) if self._get_schema_path(f)]
+        indexes.sort(key=lambda i: xml_files[i].stat().st_size, reverse=True)
+        if not indexes:
+            return results
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.jobs, len(indexes)),
+            initializer=_init_xsd_worker,
+            initargs=(type(self), self.unpacked_dir, self.original_file),
+        ) as executor:
+            futures = {
+                i: executor.submit(_validate_xsd_worker, xml_files[i]) for i in indexes
+            }
+            for i, future in futures.items():
+                results[i] = future.result()
+        return results
+
     def _get_schema_path(self, xml_file):
         """Determine the appropriate schema path for an XML file."""
         # Check exact filename match
@@ -762,101 +1001,88 @@ class BaseSchemaValidator:
 
         return None
 
-    def _clean_ignorable_namespaces(self, xml_doc):
-        """Remove attributes and elements not in allowed namespaces."""
-        # Create a clean copy
-        xml_string = lxml.etree.tostring(xml_doc, encoding="unicode")
-        xml_copy = lxml.etree.fromstring(xml_string)
-
-        # Remove attributes not in allowed namespaces
-        for elem in xml_copy.iter():
-            attrs_to_remove = []
-
-            for attr in elem.attrib:
-                # Check if attribute is from a namespace other than allowed ones
-                if "{" in attr:
-                    ns = attr.split("}")[0][1:]
-                    if ns not in self.OOXML_NAMESPACES:
-                        attrs_to_remove.append(attr)
+    def _prepare_for_xsd(self, root, clean_namespaces):
+        """Strip what the XSD schemas cannot validate, in place and in one pass.
 
-            # Remove collected attributes
-            for attr in attrs_to_remove:
-                del elem.attrib[attr]
+        Template tags ({{ ... }}) are removed from text outside w:t elements and
+        mc:Ignorable is removed from the root. With clean_namespaces, attributes
+        and elements outside OOXML_NAMESPACES are removed as well.
 
-        # Remove elements not in allowed namespaces
-        self._remove_ignorable_elements(xml_copy)
-
-        return lxml.etree.ElementTree(xml_copy)
+        Args:
+            root: Root element of a tree owned by the caller
+            clean_namespaces: Whether to remove non-OOXML attributes and elements
+        """
+        root.attrib.pop(f"{{{self.MC_NAMESPACE}}}Ignorable", None)
 
-    def _remove_ignorable_elements(self, root):
-        """Recursively remove all elements not in allowed namespaces."""
         elements_to_remove = []
-
-        # Find elements to remove
-        for elem in list(root):
-            # Skip non-element nodes (comments, processing instructions, etc.)
-            if not hasattr(elem, "tag") or callable(elem.tag):
-                continue
-
-            tag_str = str(elem.tag)
-            if tag_str.startswith("{"):
-                ns = tag_str.split("}")[0][1:]
-                if ns not in self.OOXML_NAMESPACES:
+        walker = lxml.etree.iterwalk(root, events=("start",))
+        for _, elem in walker:
+            tag = elem.tag
+            if clean_namespaces:
+                # Remove whole elements not in allowed namespaces
+                if (
+                    elem is not root
+                    and tag.startswith("{")
+                    and tag[1:].split("}")[0] not in self.OOXML_NAMESPACES
+                ):
                     elements_to_remove.append(elem)
+                    walker.skip_subtree()
                     continue
 
-            # Recursively clean child elements
-            self._remove_ignorable_elements(elem)
-
-        # Remove collected elements
-        for elem in elements_to_remove:
-            root.remove(elem)
+                # Remove attributes not in allowed namespaces
+                for attr in [
+                    attr
+                    for attr in elem.attrib
+                    if attr.startswith("{")
+                    and attr[1:].split("}")[0] not in self.OOXML_NAMESPACES
+                ]:
+                    del elem.attrib[attr]
 
-    def _preprocess_for_mc_ignorable(self, xml_doc):
-        """Preprocess XML to handle mc:Ignorable attribute properly."""
-        # Remove mc:Ignorable attributes before validation
-        root = xml_doc.getroot()
+            # Remove template tags, leaving the text of w:t elements alone
+            if not (tag.endswith("}t") or tag == "t"):
+                if elem.text and "{{" in elem.text:
+                    elem.text = self.TEMPLATE_TAG_PATTERN.sub("", elem.text)
+                if elem.tail and "{{" in elem.tail:
+                    elem.tail = self.TEMPLATE_TAG_PATTERN.sub("", elem.tail)
 
-        # Remove mc:Ignorable attribute from root
-        if f"{{{self.MC_NAMESPACE}}}Ignorable" in root.attrib:
-            del root.attrib[f"{{{self.MC_NAMESPACE}}}Ignorable"]
+        for elem in elements_to_remove:
+            elem.getparent().remove(elem)
 
-        return xml_doc
+    def _validate_single_file_xsd(self, xml_file, base_path, xml_bytes=None):
+        """Validate a single XML file against XSD schema. Returns (is_valid, errors_set).
 
-    def _validate_single_file_xsd(self, xml_file, base_path):
-        """Validate a single XML file against XSD schema. Returns (is_valid, errors_set)."""
+        xml_bytes is the content of the file when it is not read from xml_file,
+        such as a part read from the original archive.
+        """
         schema_path = self._get_schema_path(xml_file)
         if not schema_path:
             return None, None  # Skip file
 
         try:
-            # Load schema
-            with open(schema_path, "rb") as xsd_file:
-                parser = lxml.etree.XMLParser()
-                xsd_doc = lxml.etree.parse(
-                    xsd_file, parser=parser, base_url=str(schema_path)
-                )
-                schema = lxml.etree.XMLSchema(xsd_doc)
-
-            # Load and preprocess XML
-            with open(xml_file, "r") as f:
-                xml_doc = lxml.etree.parse(f)
-
-            xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
-            xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
+            # Load schema, compiled once per process
+            schema = load_schema(schema_path)
+
+            # Load XML. The shared tree of an unpacked part is copied, since
+            # preprocessing modifies the tree in place
+            if xml_bytes is not None:
+                xml_doc = lxml.etree.parse(io.BytesIO(xml_bytes))
+            elif base_path == self.unpacked_dir:
+                xml_doc = copy.deepcopy(self._parse(xml_file))
+            else:
+                xml_doc = lxml.etree.parse(str(xml_file))
 
-            # Clean ignorable namespaces if needed
+            # Clean ignorable namespaces only in the main content folders
             relative_path = xml_file.relative_to(base_path)
-            if (
-                relative_path.parts
-                and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS
-            ):
-                xml_doc = self._clean_ignorable_namespaces(xml_doc)
+            self._prepare_for_xsd(
+                xml_doc.getroot(),
+                clean_namespaces=bool(relative_path.parts)
+                and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS,
+            )
 
             # Validate
-            if schema.validate(xml_doc):
-                return True, set()
-            else:
+            with _schema_lock:
+                if schema.validate(xml_doc):
+                    return True, set()
                 errors = set()
                 for error in schema.error_log:
                     # Store normalized error message (without line numbers for comparison)
@@ -869,82 +1095,139 @@ class BaseSchemaValidator:
     def _get_original_file_errors(self, xml_file):
         """Get XSD validation errors from a single file in the original document.
 
+        The part is read from the original archive in memory, and its errors are
+        remembered for the rest of the validator run.
+
         Args:
             xml_file: Path to the XML file in unpacked_dir to check
 
         Returns:
             set: Set of error messages from the original file
         """
-        import tempfile
-        import zipfile
-
         # Resolve both paths to handle symlinks (e.g., /var vs /private/var on macOS)
         xml_file = Path(xml_file).resolve()
         unpacked_dir = self.unpacked_dir.resolve()
         relative_path = xml_file.relative_to(unpacked_dir)
+        name = relative_path.as_posix()
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # Extract original file
-            with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                zip_ref.extractall(temp_path)
+        if name not in self._original_errors:
+            if self._original_zip is None:
+                self._original_zip = zipfile.ZipFile(self.original_file, "r")
 
-            # Find corresponding file in original
-            original_xml_file = temp_path / relative_path
-
-            if not original_xml_file.exists():
+            try:
+                data = self._original_zip.read(name)
+            except KeyError:
                 # File didn't exist in original, so no original errors
+                self._original_errors[name] = set()
                 return set()
 
             # Validate the specific file in original
-            is_valid, errors = self._validate_single_file_xsd(
-                original_xml_file, temp_path
+            _, errors = self._validate_single_file_xsd(
+                unpacked_dir / relative_path, unpacked_dir, data
             )
-            return errors if errors else set()
+            self._original_errors[name] = errors if errors else set()
 
-    def _remove_template_tags_from_text_nodes(self, xml_doc):
-        """Remove template tags from XML text nodes and collect warnings.
+        return self._original_errors[name]
 
-        Template tags follow the pattern {{ ... }} and are used as placeholders
-        for content replacement. They should be removed from text content before
-        XSD validation while preserving XML structure.
+    def _original_key(self, xml_file):
+        """Return the content of a part in the original archive as (size, CRC-32).
 
-        Returns:
-            tuple: (cleaned_xml_doc, warnings_list)
+        Returns None if the part is not in the original or it cannot be read.
         """
-        warnings = []
-        template_pattern = re.compile(r"\{\{[^}]*\}\}")
-
-        # Create a copy of the document to avoid modifying the original
-        xml_string = lxml.etree.tostring(xml_doc, encoding="unicode")
-        xml_copy = lxml.etree.fromstring(xml_string)
-
-        def process_text_content(text, content_type):
-            if not text:
-                return text
-            matches = list(template_pattern.finditer(text))
-            if matches:
-                for match in matches:
-                    warnings.append(
-                        f"Found template tag in {content_type}: {match.group()}"
+        if self._original_keys is None:
+            try:
+                with zipfile.ZipFile(self.original_file, "r") as zip_ref:
+                    self._original_keys = {
+                        info.filename: (info.file_size, info.CRC)
+                        for info in zip_ref.infolist()
+                    }
+            except (OSError, zipfile.BadZipFile):
+                self._original_keys = {}
+
+        name = xml_file.relative_to(self.unpacked_dir).as_posix()
+        return self._original_keys.get(name)
+
+    def _close_original(self):
+        """Close the original archive opened by _get_original_file_errors."""
+        if self._original_zip is not None:
+            self._original_zip.close()
+            self._original_zip = None
+
+
+def _init_xsd_worker(validator_class, unpacked_dir, original_file):
+    """Build the validator used by one XSD worker process."""
+    global _worker_validator
+    _worker_validator = validator_class(unpacked_dir, original_file)
+
+
+def _validate_xsd_worker(xml_file):
+    return _worker_validator.validate_file_against_xsd(xml_file, verbose=False)
+
+
+def load_schema(schema_path):
+    """Return the compiled XSD schema at schema_path, compiling it once per process.
+
+    Compiling the larger OOXML schemas takes much longer than validating a
+    part, so every validator in the process shares one compiled schema per
+    path. A schema that fails to compile raises the same error on every call.
+
+    Args:
+        schema_path: Path to the .xsd file
+
+    Returns:
+        lxml.etree.XMLSchema: The compiled schema
+
+    Raises:
+        lxml.etree.XMLSchemaParseError: If the schema cannot be compiled
+    """
+    schema_path = Path(schema_path).resolve()
+    with _schema_lock:
+        schema = _schema_cache.get(schema_path)
+        if schema is None:
+            try:
+                with open(schema_path, "rb") as xsd_file:
+                    parser = lxml.etree.XMLParser()
+                    xsd_doc = lxml.etree.parse(
+                        xsd_file, parser=parser, base_url=str(schema_path)
                     )
-                return template_pattern.sub("", text)
-            return text
+                    schema = lxml.etree.XMLSchema(xsd_doc)
+            except (OSError, lxml.etree.LxmlError) as e:
+                schema = e
+            _schema_cache[schema_path] = schema
 
-        # Process all text nodes in the document
-        for elem in xml_copy.iter():
-            # Skip processing if this is a w:t element
-            if not hasattr(elem, "tag") or callable(elem.tag):
-                continue
-            tag_str = str(elem.tag)
-            if tag_str.endswith("}t") or tag_str == "t":
-                continue
+    if isinstance(schema, Exception):
+        raise schema
+    return schema
+
+
+def warm_schema_cache(schema_paths=None):
+    """Compile schemas ahead of validation, e.g. when a long-lived process starts.
+
+    Set OOXML_PRECOMPILE_SCHEMAS=1 to do this when the module is imported.
+
+    Args:
+        schema_paths: Paths of the .xsd files to compile (default: every
+            schema in BaseSchemaValidator.SCHEMA_MAPPINGS)
+
+    Returns:
+        int: Number of schemas that compiled
+    """
+    if schema_paths is None:
+        schema_names = set(BaseSchemaValidator.SCHEMA_MAPPINGS.values())
+        schema_paths = [SCHEMAS_DIR / name for name in sorted(schema_names)]
+
+    compiled = 0
+    for schema_path in schema_paths:
+        try:
+            load_schema(schema_path)
+            compiled += 1
+        except (OSError, lxml.etree.LxmlError):
+            pass
+    return compiled
 
-            elem.text = process_text_content(elem.text, "text content")
-            elem.tail = process_text_content(elem.tail, "tail content")
 
-        return lxml.etree.ElementTree(xml_copy), warnings
+if os.environ.get("OOXML_PRECOMPILE_SCHEMAS") == "1":
+    warm_schema_cache()
 
 
 if __name__ == "__main__":
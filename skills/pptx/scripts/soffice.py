@@ -0,0 +1,18 @@
+"""
+Pooled headless LibreOffice for document conversions.
+
+The implementation is ../ooxml/scripts/soffice.py, which pack.py uses as well;
+this module loads it so that the scripts here can `from soffice import
+get_service` and share one service with pack.py.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+_SHARED = Path(__file__).resolve().parent.parent / "ooxml" / "scripts" / "soffice.py"
+
+_spec = importlib.util.spec_from_file_location(__name__, _SHARED)
+_module = importlib.util.module_from_spec(_spec)
+sys.modules[__name__] = _module
+_spec.loader.exec_module(_module)
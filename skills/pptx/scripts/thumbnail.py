@@ -49,6 +49,7 @@ from pathlib import Path
 from inventory import extract_text_inventory
 from PIL import Image, ImageDraw, ImageFont
 from pptx import Presentation
+from soffice import get_service
 
 # Constants
 THUMBNAIL_WIDTH = 300  # Fixed thumbnail width in pixels
@@ -214,23 +215,12 @@ def convert_to_images(pptx_path, temp_dir, dpi):
 
     pdf_path = temp_dir / f"{pptx_path.stem}.pdf"
 
-    # Convert to PDF
+    # Convert to PDF with the pooled LibreOffice shared within this process
     print("Converting to PDF...")
-    result = subprocess.run(
-        [
-            "soffice",
-            "--headless",
-            "--convert-to",
-            "pdf",
-            "--outdir",
-            str(temp_dir),
-            str(pptx_path),
-        ],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0 or not pdf_path.exists():
-        raise RuntimeError("PDF conversion failed")
+    try:
+        get_service().convert(pptx_path, temp_dir, "pdf")
+    except (OSError, RuntimeError) as e:
+        raise RuntimeError(f"PDF conversion failed: {e}") from e
 
     # Convert PDF to images
     print(f"Converting to images at {dpi} DPI...")
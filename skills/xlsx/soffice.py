@@ -0,0 +1,24 @@
+"""
+Pooled headless LibreOffice for recalculation.
+
+The implementation is docx/ooxml/scripts/soffice.py of the docx skill next to this
+one; this module loads it so that recalc.py can `from soffice import get_service`.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+_SHARED = (
+    Path(__file__).resolve().parent.parent / "docx" / "ooxml" / "scripts" / "soffice.py"
+)
+
+if not _SHARED.exists():
+    raise ImportError(
+        f"soffice needs the docx skill next to the xlsx skill: {_SHARED} not found"
+    )
+
+_spec = importlib.util.spec_from_file_location(__name__, _SHARED)
+_module = importlib.util.module_from_spec(_spec)
+sys.modules[__name__] = _module
+_spec.loader.exec_module(_module)